@@ -0,0 +1,39 @@
+"""
+compilacion aot de los kernels de indicadores.
+
+genera el modulo nativo `indicator_kernels` (.so / .pyd) junto a este
+archivo usando numba.pycc, de modo que el backend no paga el costo de
+compilacion jit en la primera peticion y no necesita numba en runtime.
+
+uso (desde la raiz del repositorio, con numba instalado):
+
+    python -m ai_module.src.processors._indicator_kernels_build
+
+si el modulo compilado no existe, technical_indicators usa los kernels
+jit de _kernels.py.
+"""
+import os
+
+from numba.pycc import CC
+
+from ._kernels import (
+    MACD_SIGNATURES,
+    MEAN_STD_SIGNATURES,
+    RSI_SIGNATURES,
+    macd_kernel,
+    mean_std_kernel,
+    rsi_wilder_kernel,
+)
+
+
+cc = CC("indicator_kernels")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# pycc exporta una sola firma por nombre: la variante float64
+cc.export("rsi_wilder_kernel", RSI_SIGNATURES[0])(rsi_wilder_kernel.py_func)
+cc.export("macd_kernel", MACD_SIGNATURES[0])(macd_kernel.py_func)
+cc.export("mean_std_kernel", MEAN_STD_SIGNATURES[0])(mean_std_kernel.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -0,0 +1,237 @@
+"""
+kernels numericos para indicadores tecnicos.
+
+funciones de bajo nivel que recorren el array de precios (orden cronologico)
+en un solo paso. se compilan con numba cuando esta disponible.
+
+todos los kernels reciben ndarrays y retornan escalares, de modo
+que TechnicalIndicators solo se encarga de validar entradas y armar el
+diccionario de salida. la excepcion es batch_kernel, que escribe los
+indicadores de varios activos en una matriz de salida.
+
+los kernels son puramente numericos: no validan ni capturan excepciones
+(eso queda en TechnicalIndicators) y usan error_model="numpy", asi una
+division por cero da inf/nan en lugar de lanzar, y numba no agrega
+comprobaciones en cada division.
+"""
+import numpy as np
+
+from ._njit import njit, prange
+
+# firmas explicitas: numba compila cada kernel al importar el modulo (y con
+# cache=True lo reutiliza entre procesos) en lugar de hacerlo en la primera
+# peticion. float32 cubre las historias largas (ver FLOAT32_MIN_LENGTH)
+MACD_SIGNATURES = [
+    "UniTuple(f8, 3)(f8[::1], f8, f8, f8)",
+    "UniTuple(f8, 3)(f4[::1], f8, f8, f8)",
+]
+RSI_SIGNATURES = ["f8(f8[::1], i8)", "f8(f4[::1], i8)"]
+MEAN_STD_SIGNATURES = ["UniTuple(f8, 2)(f8[::1])", "UniTuple(f8, 2)(f4[::1])"]
+BATCH_SIGNATURES = ["void(f8[:, ::1], i8[::1], i8, i8, i8, i8, i8, f8[:, ::1])"]
+
+# scipy es opcional: solo se usa en macd_lfilter (fallback sin numba)
+try:
+    from scipy.signal import lfilter
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+@njit(MACD_SIGNATURES, cache=True, fastmath=True, error_model="numpy")
+def macd_kernel(x, a_fast, a_slow, a_sig):
+    """
+    calcula macd, signal e histogram en una sola pasada.
+
+    aplica la recurrencia ema (e = a*x + (1-a)*e) para la ema rapida,
+    la lenta y la linea de señal a la vez. equivale a
+    ewm(span=..., adjust=False).mean() de pandas tomando el ultimo valor.
+
+    args:
+        x: precios de cierre en orden cronologico
+        a_fast: factor de suavizado de la ema rapida (2 / (fast_period + 1))
+        a_slow: factor de suavizado de la ema lenta
+        a_sig: factor de suavizado de la linea de señal
+
+    returns:
+        tupla (macd, signal, histogram) del ultimo punto
+    """
+    ef = x[0]
+    es = x[0]
+    macd = 0.0
+    sig = 0.0
+    for i in range(1, x.shape[0]):
+        ef = a_fast * x[i] + (1.0 - a_fast) * ef
+        es = a_slow * x[i] + (1.0 - a_slow) * es
+        macd = ef - es
+        sig = a_sig * macd + (1.0 - a_sig) * sig
+    return macd, sig, macd - sig
+
+
+@njit("f8(f8, f8)", cache=True, error_model="numpy")
+def rsi_from_averages(avg_gain, avg_loss):
+    """
+    convierte las medias de ganancias y perdidas en rsi.
+
+    sin perdidas el rs es infinito (rsi 100); sin movimiento el rsi es
+    neutral (50).
+    """
+    if avg_loss == 0.0:
+        return 100.0 if avg_gain > 0.0 else 50.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+@njit(RSI_SIGNATURES, cache=True, fastmath=True, error_model="numpy")
+def rsi_wilder_kernel(diff, period):
+    """
+    calcula el rsi de wilder en una sola pasada.
+
+    la semilla es la media simple de las primeras `period` ganancias y
+    perdidas; a partir de ahi se aplica el suavizado de wilder
+    (avg = (avg * (p - 1) + actual) / p).
+
+    args:
+        diff: cambios de precio en orden cronologico (al menos period)
+        period: periodo del rsi
+
+    returns:
+        valor de rsi (0-100) del ultimo punto
+    """
+    # max(d, 0) en lugar de if/else: sin saltos, llvm lo vectoriza
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(period):
+        avg_gain += max(diff[i], 0.0)
+        avg_loss += max(-diff[i], 0.0)
+    avg_gain /= period
+    avg_loss /= period
+
+    for i in range(period, diff.shape[0]):
+        avg_gain = (avg_gain * (period - 1) + max(diff[i], 0.0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-diff[i], 0.0)) / period
+
+    return rsi_from_averages(avg_gain, avg_loss)
+
+
+def rsi_wilder_numpy(diff, period):
+    """
+    version vectorizada con numpy de rsi_wilder_kernel.
+
+    se usa cuando los kernels no estan compilados. el suavizado de wilder
+    es una ema con alpha = 1 / period, asi que la media final se obtiene
+    como suma ponderada de la semilla y de las ganancias/perdidas
+    posteriores, sin bucle de python.
+
+    args:
+        diff: cambios de precio en orden cronologico (al menos period)
+        period: periodo del rsi
+
+    returns:
+        valor de rsi (0-100) del ultimo punto
+    """
+    gain = np.maximum(diff, 0.0)
+    loss = np.maximum(-diff, 0.0)
+
+    decay = 1.0 - 1.0 / period
+    m = diff.shape[0] - period
+    # pesos decay^(m-1) ... decay^0 para las ganancias/perdidas tras la semilla
+    weights = decay ** np.arange(m - 1, -1, -1, dtype=np.float64)
+
+    avg_gain = decay ** m * gain[:period].mean() + np.dot(weights, gain[period:]) / period
+    avg_loss = decay ** m * loss[:period].mean() + np.dot(weights, loss[period:]) / period
+
+    return rsi_from_averages(float(avg_gain), float(avg_loss))
+
+
+@njit(MEAN_STD_SIGNATURES, cache=True, fastmath=True, error_model="numpy")
+def mean_std_kernel(x):
+    """
+    calcula media y desviacion estandar muestral en una sola pasada.
+
+    usa el algoritmo de welford, numericamente estable y sin arrays
+    temporales. la desviacion usa ddof=1, igual que rolling().std().
+
+    args:
+        x: ventana de precios (al menos 2 elementos)
+
+    returns:
+        tupla (media, desviacion estandar)
+    """
+    mean = 0.0
+    m2 = 0.0
+    n = x.shape[0]
+    for i in range(n):
+        delta = x[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (x[i] - mean)
+    return mean, (m2 / (n - 1)) ** 0.5
+
+
+@njit(BATCH_SIGNATURES, cache=True, parallel=True, error_model="numpy")
+def batch_kernel(prices_kn, lengths, rsi_period, fast_period, slow_period, signal_period, vol_period, out):
+    """
+    calcula rsi, macd y volatilidad para varios activos en paralelo.
+
+    cada fila de prices_kn es un activo en orden cronologico, alineado a la
+    derecha (el relleno queda al inicio). las filas son independientes, asi
+    que prange las reparte entre los nucleos disponibles.
+
+    args:
+        prices_kn: matriz (k, n) de precios de cierre
+        lengths: numero de precios validos de cada fila
+        rsi_period: periodo del rsi
+        fast_period: periodo ema rapida del macd
+        slow_period: periodo ema lenta del macd
+        signal_period: periodo linea señal del macd
+        vol_period: periodo minimo para la volatilidad
+        out: matriz (k, 5) de salida con columnas
+            rsi, macd, signal, histogram, volatilidad (nan si faltan datos)
+    """
+    n = prices_kn.shape[1]
+    a_fast = 2.0 / (fast_period + 1)
+    a_slow = 2.0 / (slow_period + 1)
+    a_sig = 2.0 / (signal_period + 1)
+
+    for k in prange(prices_kn.shape[0]):
+        m = lengths[k]
+        x = prices_kn[k, n - m:]
+        out[k, :] = np.nan
+
+        if m >= rsi_period + 1:
+            out[k, 0] = rsi_wilder_kernel(np.diff(x), rsi_period)
+
+        if m >= slow_period + signal_period:
+            macd, sig, hist = macd_kernel(x, a_fast, a_slow, a_sig)
+            out[k, 1] = macd
+            out[k, 2] = sig
+            out[k, 3] = hist
+
+        if m >= vol_period + 1:
+            logret = np.log(x[1:] / x[:-1])
+            out[k, 4] = mean_std_kernel(logret)[1] * np.sqrt(252.0) * 100.0
+
+
+def macd_lfilter(x, a_fast, a_slow, a_sig):
+    """
+    version de macd_kernel con scipy.signal.lfilter.
+
+    se usa cuando los kernels no estan compilados: cada ema es un filtro
+    iir de primer orden (y = a*x + (1-a)*y_prev) que lfilter recorre en un
+    bucle de c. zi fija el valor inicial para que y[0] = x[0], igual que
+    ewm(adjust=False).
+
+    args:
+        x: precios de cierre en orden cronologico
+        a_fast: factor de suavizado de la ema rapida
+        a_slow: factor de suavizado de la ema lenta
+        a_sig: factor de suavizado de la linea de señal
+
+    returns:
+        tupla (macd, signal, histogram) del ultimo punto
+    """
+    ema_fast = lfilter([a_fast], [1.0, a_fast - 1.0], x, zi=[x[0] * (1.0 - a_fast)])[0]
+    ema_slow = lfilter([a_slow], [1.0, a_slow - 1.0], x, zi=[x[0] * (1.0 - a_slow)])[0]
+    macd_line = ema_fast - ema_slow
+    # macd_line[0] es 0, asi que la señal arranca en 0 sin estado inicial
+    signal_line = lfilter([a_sig], [1.0, a_sig - 1.0], macd_line)
+
+    return macd_line[-1], signal_line[-1], macd_line[-1] - signal_line[-1]
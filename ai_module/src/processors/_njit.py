@@ -0,0 +1,28 @@
+"""
+decorador njit (y prange) con fallback.
+
+numba es una dependencia opcional: si esta instalada, los kernels de
+indicadores se compilan a codigo nativo; si no, el decorador no hace nada
+y los kernels se ejecutan como python normal (mas lento pero correcto).
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    # sin numba los bucles paralelos se ejecutan en serie
+    prange = range
+
+    def njit(*args, **kwargs):
+        """no-op: soporta tanto @njit como @njit(cache=True, ...)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+__all__ = ["njit", "prange", "NUMBA_AVAILABLE"]
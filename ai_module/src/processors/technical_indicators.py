@@ -11,30 +11,127 @@ calcula indicadores tecnicos comunes usados en analisis financiero:
 estos indicadores se usan para generar analisis con ia.
 """
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, NamedTuple
 from decimal import Decimal
-import pandas as pd
 import numpy as np
 
+# kernels compilados aot si existen (ver _indicator_kernels_build.py),
+# si no, los kernels jit (o python puro cuando numba no esta instalado)
+try:
+    from .indicator_kernels import macd_kernel, mean_std_kernel, rsi_wilder_kernel
+    AOT_KERNELS = True
+except ImportError:
+    from ._kernels import macd_kernel, mean_std_kernel, rsi_wilder_kernel
+    AOT_KERNELS = False
+
+# el kernel batch usa prange, que numba.pycc no soporta: siempre jit
+from ._kernels import batch_kernel
+from ._kernels import SCIPY_AVAILABLE, macd_lfilter, rsi_wilder_numpy
+from ._njit import NUMBA_AVAILABLE
+
+# true si los kernels corren como codigo nativo (aot o jit)
+COMPILED_KERNELS = AOT_KERNELS or NUMBA_AVAILABLE
+
+# ta-lib (opcional) solo se usa cuando no hay kernels compilados (ni numba
+# ni modulo aot), para no ejecutar el rsi como bucle de python puro
+try:
+    import talib
+    TALIB_AVAILABLE = True
+except ImportError:
+    TALIB_AVAILABLE = False
+
+USE_TALIB = TALIB_AVAILABLE and not COMPILED_KERNELS
+
 
 logger = logging.getLogger(__name__)
 
 
+class PreparedPrices(NamedTuple):
+    """arrays derivados de la serie de precios, calculados una sola vez."""
+    chrono: np.ndarray  # precios del mas antiguo al mas reciente
+    diff: np.ndarray  # cambios de precio (len - 1)
+    logret: np.ndarray  # retornos logaritmicos (len - 1)
+
+
 class TechnicalIndicators:
     """
     procesador de indicadores tecnicos.
     
     calcula indicadores tecnicos a partir de datos historicos de precios.
-    usa pandas y numpy para calculos eficientes.
+    usa numpy (y kernels compilados con numba) para calculos eficientes.
+    
+    los metodos publicos reciben la lista de precios (mas reciente primero)
+    y delegan en metodos privados que trabajan sobre PreparedPrices.
+    asi calculate_all_indicators construye el array cronologico, los
+    cambios y los retornos una sola vez y los comparte entre indicadores.
     """
     
+    # a partir de este largo la serie se procesa en float32: la mitad de
+    # memoria por elemento y la precision sobra para mostrar indicadores.
+    # los kernels aot solo aceptan float64, asi que aplica con los jit
+    FLOAT32_MIN_LENGTH = 500
+    
+    @staticmethod
+    def _to_chrono(prices: List[float]) -> np.ndarray:
+        """
+        convierte la lista de precios en un ndarray cronologico.
+        
+        args:
+            prices: lista de precios de cierre (mas reciente primero)
+            
+        returns:
+            array contiguo ordenado del mas antiguo al mas reciente
+            (float32 para historias largas, float64 en otro caso)
+        """
+        dtype = np.float64
+        if not AOT_KERNELS and len(prices) >= TechnicalIndicators.FLOAT32_MIN_LENGTH:
+            dtype = np.float32
+        
+        return np.ascontiguousarray(np.asarray(prices, dtype=dtype)[::-1])
+    
+    @staticmethod
+    def _prepare(prices: List[float]) -> PreparedPrices:
+        """
+        calcula los arrays compartidos por todos los indicadores.
+        
+        args:
+            prices: lista de precios de cierre (mas reciente primero)
+            
+        returns:
+            PreparedPrices con el array cronologico, cambios y retornos log
+        """
+        chrono = TechnicalIndicators._to_chrono(prices)
+        diff = np.diff(chrono)
+        
+        # un precio en cero produce inf/nan; volatility lo detecta despues
+        with np.errstate(divide="ignore", invalid="ignore"):
+            logret = np.log(chrono[1:] / chrono[:-1])
+        return PreparedPrices(chrono, diff, logret)
+    
+    @staticmethod
+    def prepare_prices(prices: List[float]) -> PreparedPrices:
+        """
+        prepara los arrays de una serie para reutilizarlos entre llamadas.
+        
+        el resultado se puede pasar a calculate_all_indicators (prepared=...)
+        para no repetir la conversion cuando la serie no cambio.
+        
+        args:
+            prices: lista de precios de cierre (mas reciente primero)
+            
+        returns:
+            PreparedPrices de la serie
+        """
+        return TechnicalIndicators._prepare(prices)
+    
     @staticmethod
     def calculate_rsi(prices: List[float], period: int = 14) -> Optional[float]:
         """
         calcula relative strength index (rsi).
         
         el rsi mide la magnitud de cambios de precio recientes para evaluar
-        condiciones de sobrecompra o sobreventa.
+        condiciones de sobrecompra o sobreventa. usa el suavizado de wilder
+        (media movil suavizada) en lugar de una media simple.
         
         interpretacion:
         - rsi > 70: sobrecomprado (posible correccion)
@@ -48,33 +145,30 @@ class TechnicalIndicators:
         returns:
             valor de rsi (0-100) o none si no hay suficientes datos
         """
-        if len(prices) < period + 1:
-            logger.warning(f"insuficientes datos para calcular rsi (necesita {period + 1}, tiene {len(prices)})")
+        return TechnicalIndicators._rsi(TechnicalIndicators._prepare(prices), period)
+    
+    @staticmethod
+    def _rsi(data: PreparedPrices, period: int = 14) -> Optional[float]:
+        """calcula rsi sobre precios preparados (ver calculate_rsi)."""
+        if period < 1:
+            logger.warning(f"periodo invalido para rsi: {period}")
+            return None
+        
+        if len(data.chrono) < period + 1:
+            logger.warning(f"insuficientes datos para calcular rsi (necesita {period + 1}, tiene {len(data.chrono)})")
             return None
         
         try:
-            # convertir a pandas series (invertir orden para tener cronologico)
-            prices_series = pd.Series(prices[::-1])
-            
-            # calcular cambios de precio
-            delta = prices_series.diff()
-            
-            # separar ganancias y perdidas
-            gain = delta.where(delta > 0, 0)
-            loss = -delta.where(delta < 0, 0)
+            if USE_TALIB:
+                # talib.RSI usa el mismo suavizado de wilder; espera float64
+                return float(talib.RSI(data.chrono.astype(np.float64, copy=False), timeperiod=period)[-1])
             
-            # calcular medias moviles de ganancias y perdidas
-            avg_gain = gain.rolling(window=period).mean()
-            avg_loss = loss.rolling(window=period).mean()
+            if not COMPILED_KERNELS:
+                # sin numba el bucle seria python puro: version vectorizada
+                return float(rsi_wilder_numpy(data.diff, period))
             
-            # calcular rs (relative strength)
-            rs = avg_gain / avg_loss
-            
-            # calcular rsi
-            rsi = 100 - (100 / (1 + rs))
-            
-            # retornar valor mas reciente
-            return float(rsi.iloc[-1])
+            # suavizado de wilder en una sola pasada sobre el array
+            return float(rsi_wilder_kernel(data.diff, period))
             
         except Exception as e:
             logger.error(f"error calculando rsi: {e}")
@@ -106,31 +200,39 @@ class TechnicalIndicators:
         returns:
             diccionario con macd, signal y histogram o none
         """
-        if len(prices) < slow_period + signal_period:
+        return TechnicalIndicators._macd(
+            TechnicalIndicators._prepare(prices), fast_period, slow_period, signal_period
+        )
+    
+    @staticmethod
+    def _macd(
+        data: PreparedPrices,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9
+    ) -> Optional[Dict[str, float]]:
+        """calcula macd sobre precios preparados (ver calculate_macd)."""
+        if len(data.chrono) < slow_period + signal_period:
             logger.warning(f"insuficientes datos para calcular macd")
             return None
         
         try:
-            # convertir a pandas series (invertir orden)
-            prices_series = pd.Series(prices[::-1])
-            
-            # calcular emas
-            ema_fast = prices_series.ewm(span=fast_period, adjust=False).mean()
-            ema_slow = prices_series.ewm(span=slow_period, adjust=False).mean()
+            # factores de suavizado equivalentes a ewm(span=n, adjust=False)
+            a_fast = 2.0 / (fast_period + 1)
+            a_slow = 2.0 / (slow_period + 1)
+            a_sig = 2.0 / (signal_period + 1)
             
-            # calcular macd line
-            macd_line = ema_fast - ema_slow
-            
-            # calcular signal line (ema del macd)
-            signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
-            
-            # calcular histogram (diferencia entre macd y signal)
-            histogram = macd_line - signal_line
+            if not COMPILED_KERNELS and SCIPY_AVAILABLE:
+                # sin numba, las emas como filtros iir en c (scipy)
+                macd_line, signal_line, histogram = macd_lfilter(data.chrono, a_fast, a_slow, a_sig)
+            else:
+                # ema rapida, lenta y linea de señal en una sola pasada
+                macd_line, signal_line, histogram = macd_kernel(data.chrono, a_fast, a_slow, a_sig)
             
             return {
-                "macd": float(macd_line.iloc[-1]),
-                "signal": float(signal_line.iloc[-1]),
-                "histogram": float(histogram.iloc[-1])
+                "macd": float(macd_line),
+                "signal": float(signal_line),
+                "histogram": float(histogram)
             }
             
         except Exception as e:
@@ -160,13 +262,17 @@ class TechnicalIndicators:
         returns:
             diccionario {periodo: valor_ma}
         """
-        prices_series = pd.Series(prices[::-1])
-        
+        return TechnicalIndicators._moving_averages(TechnicalIndicators._prepare(prices), periods)
+    
+    @staticmethod
+    def _moving_averages(data: PreparedPrices, periods: List[int] = [20, 50, 200]) -> Dict[int, float]:
+        """calcula medias moviles sobre precios preparados (ver calculate_moving_averages)."""
+        chrono = data.chrono
         mas = {}
         for period in periods:
-            if len(prices) >= period:
-                ma = prices_series.rolling(window=period).mean()
-                mas[period] = float(ma.iloc[-1])
+            if len(chrono) >= period:
+                # solo necesitamos la ultima ventana, no la serie rolling completa
+                mas[period] = float(np.mean(chrono[-period:]))
             else:
                 logger.warning(f"insuficientes datos para ma{period}")
         
@@ -187,26 +293,24 @@ class TechnicalIndicators:
         returns:
             volatilidad anualizada (%) o none
         """
-        if len(prices) < period + 1:
+        return TechnicalIndicators._volatility(TechnicalIndicators._prepare(prices), period)
+    
+    @staticmethod
+    def _volatility(data: PreparedPrices, period: int = 30) -> Optional[float]:
+        """calcula volatilidad sobre precios preparados (ver calculate_volatility)."""
+        if len(data.chrono) < period + 1:
             return None
         
-        try:
-            prices_series = pd.Series(prices[::-1])
-            
-            # calcular retornos logaritmicos
-            returns = np.log(prices_series / prices_series.shift(1))
-            
-            # calcular desviacion estandar de retornos
-            volatility = returns.std()
-            
-            # anualizar (asumiendo 252 dias de trading)
-            annualized_volatility = volatility * np.sqrt(252) * 100
-            
-            return float(annualized_volatility)
-            
-        except Exception as e:
-            logger.error(f"error calculando volatilidad: {e}")
+        # desviacion estandar muestral de los retornos, anualizada (252 dias de trading)
+        with np.errstate(invalid="ignore"):
+            # acumulador float64 aunque los retornos vengan en float32
+            annualized_volatility = float(data.logret.std(ddof=1, dtype=np.float64) * np.sqrt(252) * 100)
+        
+        if not np.isfinite(annualized_volatility):
+            logger.warning("volatilidad no finita (precios en cero o invalidos)")
             return None
+        
+        return annualized_volatility
     
     @staticmethod
     def calculate_bollinger_bands(
@@ -233,26 +337,34 @@ class TechnicalIndicators:
         returns:
             diccionario con upper, middle, lower o none
         """
-        if len(prices) < period:
+        return TechnicalIndicators._bollinger_bands(TechnicalIndicators._prepare(prices), period, std_dev)
+    
+    @staticmethod
+    def _bollinger_bands(
+        data: PreparedPrices,
+        period: int = 20,
+        std_dev: float = 2.0
+    ) -> Optional[Dict[str, float]]:
+        """calcula bandas de bollinger sobre precios preparados (ver calculate_bollinger_bands)."""
+        # la desviacion muestral necesita al menos 2 precios en la ventana
+        if period < 2 or len(data.chrono) < period:
             return None
         
         try:
-            prices_series = pd.Series(prices[::-1])
-            
-            # calcular media movil (banda media)
-            middle_band = prices_series.rolling(window=period).mean()
-            
-            # calcular desviacion estandar
-            std = prices_series.rolling(window=period).std()
+            # solo la ultima ventana define las bandas actuales; media (banda
+            # media) y desviacion estandar muestral en una sola pasada
+            middle_band, std = mean_std_kernel(data.chrono[-period:])
+            middle_band = float(middle_band)
+            std = float(std)
             
             # calcular bandas superior e inferior
             upper_band = middle_band + (std * std_dev)
             lower_band = middle_band - (std * std_dev)
             
             return {
-                "upper": float(upper_band.iloc[-1]),
-                "middle": float(middle_band.iloc[-1]),
-                "lower": float(lower_band.iloc[-1])
+                "upper": upper_band,
+                "middle": middle_band,
+                "lower": lower_band
             }
             
         except Exception as e:
@@ -260,7 +372,11 @@ class TechnicalIndicators:
             return None
     
     @staticmethod
-    def analyze_trend(prices: List[float], period: int = 20) -> str:
+    def analyze_trend(
+        prices: List[float],
+        period: int = 20,
+        ma_value: Optional[float] = None
+    ) -> str:
         """
         analiza la tendencia general del precio.
         
@@ -269,20 +385,29 @@ class TechnicalIndicators:
         args:
             prices: lista de precios de cierre (mas reciente primero)
             period: periodo para analisis (default 20)
+            ma_value: media movil del periodo ya calculada (opcional, evita recalcularla)
             
         returns:
             "alcista", "bajista" o "lateral"
         """
-        if len(prices) < period:
+        return TechnicalIndicators._trend(TechnicalIndicators._prepare(prices), period, ma_value)
+    
+    @staticmethod
+    def _trend(data: PreparedPrices, period: int = 20, ma_value: Optional[float] = None) -> str:
+        """analiza la tendencia sobre precios preparados (ver analyze_trend)."""
+        if len(data.chrono) < period:
             return "desconocido"
         
-        current_price = prices[0]
-        ma = TechnicalIndicators.calculate_moving_averages(prices, [period])
-        
-        if not ma:
-            return "desconocido"
+        current_price = float(data.chrono[-1])
         
-        ma_value = ma[period]
+        # reutilizar la media ya calculada si el llamador la tiene
+        if ma_value is None:
+            ma = TechnicalIndicators._moving_averages(data, [period])
+            
+            if not ma:
+                return "desconocido"
+            
+            ma_value = ma[period]
         
         # calcular diferencia porcentual
         diff_percent = ((current_price - ma_value) / ma_value) * 100
@@ -296,7 +421,8 @@ class TechnicalIndicators:
     
     @staticmethod
     def calculate_all_indicators(
-        prices: List[float]
+        prices: List[float],
+        prepared: Optional[PreparedPrices] = None
     ) -> Dict[str, Any]:
         """
         calcula todos los indicadores disponibles.
@@ -306,22 +432,90 @@ class TechnicalIndicators:
         
         args:
             prices: lista de precios de cierre (mas reciente primero)
+            prepared: arrays ya preparados para estos precios (opcional)
             
         returns:
             diccionario con todos los indicadores calculados
         """
+        # construir los arrays derivados una sola vez y compartirlos
+        data = prepared if prepared is not None else TechnicalIndicators._prepare(prices)
+        moving_averages = TechnicalIndicators._moving_averages(data)
+        
+        # precio actual y cambio a 30 dias desde el array (el tamaño se
+        # comprueba una sola vez). el precio actual se toma de la lista para
+        # no mostrar el valor redondeado cuando el array es float32
+        chrono = data.chrono
+        size = chrono.shape[0]
+        current_price = prices[0] if size else None
+        price_change_30d = None
+        if size >= 30:
+            price_change_30d = (float(chrono[-1]) / float(chrono[-30]) - 1.0) * 100.0
+        
         indicators = {
-            "rsi": TechnicalIndicators.calculate_rsi(prices),
-            "macd": TechnicalIndicators.calculate_macd(prices),
-            "moving_averages": TechnicalIndicators.calculate_moving_averages(prices),
-            "volatility": TechnicalIndicators.calculate_volatility(prices),
-            "bollinger_bands": TechnicalIndicators.calculate_bollinger_bands(prices),
-            "trend": TechnicalIndicators.analyze_trend(prices),
-            "current_price": prices[0] if prices else None,
-            "price_change_30d": ((prices[0] / prices[29]) - 1) * 100 if len(prices) >= 30 else None
+            "rsi": TechnicalIndicators._rsi(data),
+            "macd": TechnicalIndicators._macd(data),
+            "moving_averages": moving_averages,
+            "volatility": TechnicalIndicators._volatility(data),
+            "bollinger_bands": TechnicalIndicators._bollinger_bands(data),
+            "trend": TechnicalIndicators._trend(data, 20, moving_averages.get(20)),
+            "current_price": current_price,
+            "price_change_30d": price_change_30d
         }
         
         return indicators
+    
+    @staticmethod
+    def calculate_all_indicators_batch(
+        prices_list: List[List[float]],
+        rsi_period: int = 14,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+        vol_period: int = 30
+    ) -> Dict[str, np.ndarray]:
+        """
+        calcula rsi, macd y volatilidad para varios activos a la vez.
+        
+        arma una matriz (k, n) con los precios de todos los activos y la
+        procesa en un kernel paralelo (un activo por nucleo). util para
+        portfolios, donde los activos son independientes entre si.
+        
+        args:
+            prices_list: lista de series de precios (cada una mas reciente primero)
+            rsi_period: periodo del rsi (default 14)
+            fast_period: periodo ema rapida (default 12)
+            slow_period: periodo ema lenta (default 26)
+            signal_period: periodo linea señal (default 9)
+            vol_period: periodo de volatilidad (default 30)
+            
+        returns:
+            diccionario de arrays (fila i = activo i): rsi (k,), macd (k, 3)
+            con macd, signal e histogram, y volatility (k,). nan donde no
+            hay suficientes datos. los valores quedan como arrays hasta
+            serializar la respuesta, sin crear un float de python por valor
+        """
+        k = len(prices_list)
+        out = np.empty((k, 5), dtype=np.float64)
+        if k == 0:
+            return {"rsi": out[:, 0], "macd": out[:, 1:4], "volatility": out[:, 4]}
+        
+        lengths = np.array([len(prices) for prices in prices_list], dtype=np.int64)
+        n = int(lengths.max())
+        
+        # cada fila en orden cronologico, alineada a la derecha y rellena con nan
+        prices_kn = np.full((k, n), np.nan, dtype=np.float64)
+        for i, prices in enumerate(prices_list):
+            if lengths[i]:
+                prices_kn[i, n - lengths[i]:] = TechnicalIndicators._to_chrono(prices)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            batch_kernel(
+                prices_kn, lengths, rsi_period, fast_period, slow_period,
+                signal_period, vol_period, out
+            )
+        
+        # vistas sobre la matriz de salida, sin copiar
+        return {"rsi": out[:, 0], "macd": out[:, 1:4], "volatility": out[:, 4]}
 
 
 # ejemplo de uso:
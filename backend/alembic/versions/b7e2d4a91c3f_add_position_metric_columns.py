@@ -0,0 +1,46 @@
+"""Add generated metric columns to portfolio_assets
+
+Revision ID: b7e2d4a91c3f
+Revises: 520f848c19c9
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4a91c3f'
+down_revision: Union[str, Sequence[str], None] = '520f848c19c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # columnas generadas (postgres 12+): se recalculan al escribir la fila
+    op.add_column('portfolio_assets', sa.Column(
+        'position_value', sa.Numeric(precision=20, scale=2),
+        sa.Computed('quantity * current_price', persisted=True), nullable=True
+    ))
+    op.add_column('portfolio_assets', sa.Column(
+        'gain_loss', sa.Numeric(precision=20, scale=2),
+        sa.Computed('quantity * (current_price - average_price)', persisted=True), nullable=True
+    ))
+    op.add_column('portfolio_assets', sa.Column(
+        'gain_loss_percent', sa.Numeric(precision=12, scale=4),
+        sa.Computed(
+            'CASE WHEN average_price > 0 '
+            'THEN (current_price - average_price) / average_price * 100 ELSE 0 END',
+            persisted=True
+        ), nullable=True
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('portfolio_assets', 'gain_loss_percent')
+    op.drop_column('portfolio_assets', 'gain_loss')
+    op.drop_column('portfolio_assets', 'position_value')
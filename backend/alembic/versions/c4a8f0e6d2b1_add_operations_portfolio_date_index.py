@@ -0,0 +1,31 @@
+"""Add composite index on operations (portfolio_id, operation_date DESC, asset_symbol)
+
+Revision ID: c4a8f0e6d2b1
+Revises: b7e2d4a91c3f
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8f0e6d2b1'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d4a91c3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'idx_ops_portfolio_date_symbol', 'operations',
+        ['portfolio_id', sa.text('operation_date DESC'), 'asset_symbol'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_ops_portfolio_date_symbol', table_name='operations')
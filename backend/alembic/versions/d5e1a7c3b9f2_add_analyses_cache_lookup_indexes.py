@@ -0,0 +1,38 @@
+"""Add partial indexes for the analyses cache lookup
+
+Revision ID: d5e1a7c3b9f2
+Revises: c4a8f0e6d2b1
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e1a7c3b9f2'
+down_revision: Union[str, Sequence[str], None] = 'c4a8f0e6d2b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'idx_analyses_asset_lookup', 'analyses',
+        ['asset_symbol', 'expires_at'], unique=False,
+        postgresql_where=sa.text("analysis_type = 'ASSET'")
+    )
+    op.create_index(
+        'idx_analyses_portfolio_lookup', 'analyses',
+        ['portfolio_id', 'expires_at'], unique=False,
+        postgresql_where=sa.text("analysis_type = 'PORTFOLIO'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_analyses_portfolio_lookup', table_name='analyses')
+    op.drop_index('idx_analyses_asset_lookup', table_name='analyses')
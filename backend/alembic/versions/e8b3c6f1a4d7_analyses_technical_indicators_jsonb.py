@@ -0,0 +1,41 @@
+"""Store analyses.technical_indicators as JSONB
+
+Revision ID: e8b3c6f1a4d7
+Revises: d5e1a7c3b9f2
+Create Date: 2026-10-16 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3c6f1a4d7'
+down_revision: Union[str, Sequence[str], None] = 'd5e1a7c3b9f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'analyses', 'technical_indicators',
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='technical_indicators::jsonb'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'analyses', 'technical_indicators',
+        existing_type=postgresql.JSONB(),
+        type_=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using='technical_indicators::json'
+    )
@@ -0,0 +1,93 @@
+"""Store analysis type/status as VARCHAR + CHECK instead of PostgreSQL enums
+
+Revision ID: f2c9d4b8e6a1
+Revises: e8b3c6f1a4d7
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c9d4b8e6a1'
+down_revision: Union[str, Sequence[str], None] = 'e8b3c6f1a4d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+analysis_type_enum = sa.Enum('PORTFOLIO', 'ASSET', name='analysistype')
+analysis_status_enum = sa.Enum('PENDING', 'COMPLETED', 'FAILED', name='analysisstatus')
+
+# (tabla, columna, tipo enum original, nombre del check)
+COLUMNS = [
+    ('analyses', 'analysis_type', analysis_type_enum, 'ck_analyses_type'),
+    ('analysis_requests', 'analysis_type', analysis_type_enum, 'ck_analysis_requests_type'),
+    ('analysis_requests', 'status', analysis_status_enum, 'ck_analysis_requests_status'),
+]
+
+# los indices parciales de d5e1a7c3b9f2 filtran por analysis_type: su
+# predicado queda ligado al tipo enum, asi que se recrean alrededor del cambio
+PARTIAL_INDEXES = [
+    ('idx_analyses_asset_lookup', 'asset_symbol', 'ASSET'),
+    ('idx_analyses_portfolio_lookup', 'portfolio_id', 'PORTFOLIO'),
+]
+
+
+def _drop_partial_indexes() -> None:
+    for name, _, _ in PARTIAL_INDEXES:
+        op.drop_index(name, table_name='analyses')
+
+
+def _create_partial_indexes() -> None:
+    for name, column, analysis_type in PARTIAL_INDEXES:
+        op.create_index(
+            name, 'analyses',
+            [column, 'expires_at'], unique=False,
+            postgresql_where=sa.text(f"analysis_type = '{analysis_type}'")
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _drop_partial_indexes()
+    
+    for table, column, enum_type, check_name in COLUMNS:
+        op.alter_column(
+            table, column,
+            existing_type=enum_type,
+            type_=sa.String(length=16),
+            existing_nullable=False,
+            postgresql_using=f'{column}::text'
+        )
+        values = ", ".join(f"'{value}'" for value in enum_type.enums)
+        op.create_check_constraint(check_name, table, f"{column} IN ({values})")
+    
+    bind = op.get_bind()
+    analysis_type_enum.drop(bind, checkfirst=True)
+    analysis_status_enum.drop(bind, checkfirst=True)
+    
+    _create_partial_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_partial_indexes()
+    
+    bind = op.get_bind()
+    analysis_type_enum.create(bind, checkfirst=True)
+    analysis_status_enum.create(bind, checkfirst=True)
+    
+    for table, column, enum_type, check_name in COLUMNS:
+        op.drop_constraint(check_name, table, type_='check')
+        op.alter_column(
+            table, column,
+            existing_type=sa.String(length=16),
+            type_=enum_type,
+            existing_nullable=False,
+            postgresql_using=f'{column}::{enum_type.name}'
+        )
+    
+    _create_partial_indexes()
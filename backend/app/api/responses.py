@@ -0,0 +1,35 @@
+"""
+clases de respuesta compartidas por los routers.
+
+ORJSONResponse serializa con orjson (en c) en lugar de json de la libreria
+estandar. orjson ya soporta uuid, datetime y enums; los Decimal se
+convierten a string, igual que hace pydantic, para no perder precision.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse as _BaseORJSONResponse
+
+
+def _default(obj: Any) -> Any:
+    """convierte los tipos que orjson no soporta de forma nativa."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"tipo no serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(_BaseORJSONResponse):
+    """
+    respuesta json serializada con orjson, con soporte para Decimal.
+    
+    permite retornar dicts construidos desde filas sql sin pasar por
+    modelos pydantic (el contenido no se valida contra response_model).
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
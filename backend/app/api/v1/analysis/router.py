@@ -2,18 +2,19 @@
 router para endpoints de analisis con ia.
 
 proporciona endpoints para:
-- generar analisis de activos
+- generar analisis de activos (completo o en streaming)
 - generar analisis de portfolios
 - obtener historial de analisis
 - invalidar cache
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from uuid import UUID
 
-from app.middleware.dependencies import get_db, get_current_active_user
-from app.models.user import User
+from app.middleware.dependencies import CommonDeps
+from app.repositories.portfolio import PortfolioRepository
 from app.services.analysis_service import AnalysisService
 from app.schemas.analysis import (
     AnalysisRequest,
@@ -25,12 +26,24 @@ from app.schemas.analysis import (
 router = APIRouter(prefix="/analysis", tags=["Analysis"])
 
 
+def _build_analysis_response(analysis) -> AnalysisResponse:
+    """
+    construye la respuesta de un analisis a partir del modelo orm.
+    
+    args:
+        analysis: modelo analysis
+        
+    returns:
+        AnalysisResponse con el disclaimer estandar
+    """
+    return AnalysisResponse.model_validate(analysis)
+
+
 @router.post("/asset/{symbol}", response_model=AnalysisResponse)
-def generate_asset_analysis(
+async def generate_asset_analysis(
+    deps: CommonDeps,
     symbol: str,
-    force_regenerate: bool = False,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    force_regenerate: bool = False
 ):
     """
     genera analisis con ia de un activo especifico.
@@ -58,9 +71,10 @@ def generate_asset_analysis(
         404: si no hay datos suficientes del activo
         500: si falla la generacion (api key invalida, rate limit, etc)
     """
+    db, current_user = deps
     service = AnalysisService(db)
     
-    analysis = service.generate_asset_analysis(
+    analysis = await service.generate_asset_analysis(
         user_id=current_user.id,
         symbol=symbol,
         force_regenerate=force_regenerate
@@ -77,26 +91,60 @@ def generate_asset_analysis(
         )
     
     # FIX: removido cached=analysis.cached (el campo no existe en el modelo Analysis)
-    # FIX: agregado disclaimer requerido por el schema AnalysisResponse
-    return AnalysisResponse(
-        id=analysis.id,
-        portfolio_id=analysis.portfolio_id,
-        asset_symbol=analysis.asset_symbol,
-        analysis_type=analysis.analysis_type,
-        analysis_text=analysis.analysis_text,
-        technical_indicators=analysis.technical_indicators,
-        generated_at=analysis.generated_at,
-        expires_at=analysis.expires_at,
-        disclaimer="Este análisis es generado por IA y no constituye asesoramiento financiero."
+    return _build_analysis_response(analysis)
+
+
+@router.post("/asset/{symbol}/stream")
+async def stream_asset_analysis(
+    deps: CommonDeps,
+    symbol: str,
+    force_regenerate: bool = False
+):
+    """
+    genera analisis con ia de un activo, enviando el texto a medida que se genera.
+    
+    mismo analisis que POST /analysis/asset/{symbol}, pero la respuesta es
+    text/plain en streaming: el primer fragmento llega en cientos de ms en
+    lugar de esperar la generacion completa. si hay un analisis cacheado se
+    envia de una vez. el analisis se guarda al terminar el stream.
+    
+    args:
+        symbol: simbolo del activo (ej: AAPL, MSFT)
+        force_regenerate: forzar regeneracion ignorando cache
+        
+    returns:
+        texto del analisis en streaming
+        
+    raises:
+        500: si falla la preparacion (api key, datos historicos insuficientes)
+    """
+    db, current_user = deps
+    service = AnalysisService(db)
+    
+    chunks = await service.stream_asset_analysis(
+        user_id=current_user.id,
+        symbol=symbol,
+        force_regenerate=force_regenerate
     )
+    
+    if chunks is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=(
+                f"no se pudo generar analisis para {symbol}. "
+                "verifica que openai api key este configurada y que haya "
+                "suficientes datos historicos del activo"
+            )
+        )
+    
+    return StreamingResponse(chunks, media_type="text/plain")
 
 
 @router.post("/portfolio/{portfolio_id}", response_model=AnalysisResponse)
-def generate_portfolio_analysis(
+async def generate_portfolio_analysis(
+    deps: CommonDeps,
     portfolio_id: UUID,
-    force_regenerate: bool = False,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    force_regenerate: bool = False
 ):
     """
     genera analisis con ia de un portfolio completo.
@@ -123,11 +171,10 @@ def generate_portfolio_analysis(
         404: si el portfolio no existe o no pertenece al usuario
         500: si falla la generacion
     """
-    # verificar ownership del portfolio
-    from app.repositories.portfolio import PortfolioRepository
-    
+    db, current_user = deps
+    # verificar ownership del portfolio (consulta sync, en el threadpool)
     portfolio_repo = PortfolioRepository(db)
-    portfolio = portfolio_repo.get_by_id(portfolio_id)
+    portfolio = await run_in_threadpool(portfolio_repo.get_by_id, portfolio_id)
     
     if not portfolio:
         raise HTTPException(
@@ -144,7 +191,7 @@ def generate_portfolio_analysis(
     # generar analisis
     service = AnalysisService(db)
     
-    analysis = service.generate_portfolio_analysis(
+    analysis = await service.generate_portfolio_analysis(
         user_id=current_user.id,
         portfolio_id=portfolio_id,
         force_regenerate=force_regenerate
@@ -160,26 +207,15 @@ def generate_portfolio_analysis(
             )
         )
     
-    return AnalysisResponse(
-        id=analysis.id,
-        portfolio_id=analysis.portfolio_id,
-        asset_symbol=analysis.asset_symbol,
-        analysis_type=analysis.analysis_type,
-        analysis_text=analysis.analysis_text,
-        technical_indicators=analysis.technical_indicators,
-        generated_at=analysis.generated_at,
-        expires_at=analysis.expires_at,
-        disclaimer="Este análisis es generado por IA y no constituye asesoramiento financiero."
-    )
+    return _build_analysis_response(analysis)
 
 
 @router.get("/history", response_model=List[AnalysisResponse])
 def get_analysis_history(
+    deps: CommonDeps,
     portfolio_id: Optional[UUID] = None,
     asset_symbol: Optional[str] = None,
-    limit: int = 10,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    limit: int = 10
 ):
     """
     obtiene historial de analisis generados.
@@ -194,6 +230,7 @@ def get_analysis_history(
     returns:
         lista de analisis ordenados por fecha descendente
     """
+    db, current_user = deps
     if limit > 50:
         limit = 50
     
@@ -206,27 +243,15 @@ def get_analysis_history(
         limit=limit
     )
     
-    return [
-        AnalysisResponse(
-            id=analysis.id,
-            portfolio_id=analysis.portfolio_id,
-            asset_symbol=analysis.asset_symbol,
-            analysis_type=analysis.analysis_type,
-            analysis_text=analysis.analysis_text,
-            technical_indicators=analysis.technical_indicators,
-            generated_at=analysis.generated_at,
-            expires_at=analysis.expires_at,
-            disclaimer="Este análisis es generado por IA y no constituye asesoramiento financiero."
-        )
-        for analysis in analyses
-    ]
+    # las filas orm se validan una sola vez contra response_model
+    # (from_attributes); construir AnalysisResponse aqui duplicaria la validacion
+    return analyses
 
 
 @router.delete("/cache/portfolio/{portfolio_id}", status_code=status.HTTP_204_NO_CONTENT)
 def invalidate_portfolio_cache(
     portfolio_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    deps: CommonDeps
 ):
     """
     invalida cache de analisis de un portfolio.
@@ -237,9 +262,8 @@ def invalidate_portfolio_cache(
     args:
         portfolio_id: id del portfolio
     """
+    db, current_user = deps
     # verificar ownership
-    from app.repositories.portfolio import PortfolioRepository
-    
     portfolio_repo = PortfolioRepository(db)
     portfolio = portfolio_repo.get_by_id(portfolio_id)
     
@@ -263,8 +287,7 @@ def invalidate_portfolio_cache(
 @router.delete("/cache/asset/{symbol}", status_code=status.HTTP_204_NO_CONTENT)
 def invalidate_asset_cache(
     symbol: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    deps: CommonDeps
 ):
     """
     invalida cache de analisis de un activo.
@@ -275,5 +298,6 @@ def invalidate_asset_cache(
     args:
         symbol: simbolo del activo
     """
+    db, current_user = deps
     service = AnalysisService(db)
     service.invalidate_cache(asset_symbol=symbol.upper())
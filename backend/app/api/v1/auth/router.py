@@ -12,7 +12,7 @@ todos los endpoints retornan respuestas json estandarizadas.
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.middleware.dependencies import get_db, get_current_active_user
+from app.middleware.dependencies import get_db, CommonDeps
 from app.services.auth_service import AuthService
 from app.schemas.auth import (
     UserRegister, 
@@ -21,7 +21,6 @@ from app.schemas.auth import (
     RefreshTokenRequest
 )
 from app.schemas.user import UserResponse
-from app.models.user import User
 from app.core.config import settings
 
 
@@ -60,7 +59,7 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     """
     autentica un usuario y genera tokens jwt.
     
@@ -76,7 +75,7 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
     """
     auth_service = AuthService(db)
     
-    result = auth_service.login(
+    result = await auth_service.login(
         email=credentials.email,
         password=credentials.password
     )
@@ -133,8 +132,7 @@ def refresh_token(token_request: RefreshTokenRequest, db: Session = Depends(get_
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
 def logout(
     token_request: RefreshTokenRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     cierra la sesion invalidando el refresh token.
@@ -142,6 +140,7 @@ def logout(
     requiere estar autenticado (access token en header).
     el refresh token se elimina de la base de datos.
     """
+    db, current_user = deps
     auth_service = AuthService(db)
     auth_service.logout(token_request.refresh_token)
     return None
@@ -149,8 +148,7 @@ def logout(
 
 @router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
 def logout_all(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     cierra todas las sesiones del usuario.
@@ -158,6 +156,7 @@ def logout_all(
     util cuando el usuario quiere cerrar sesion en todos sus dispositivos
     o cuando cambia su password.
     """
+    db, current_user = deps
     auth_service = AuthService(db)
     auth_service.logout_all(current_user.id)
     return None
@@ -3,21 +3,28 @@ endpoints de datos de mercado.
 
 proporciona:
 - GET /assets/search: buscar activos por simbolo o nombre
+- GET /assets/batch: obtener informacion de varios activos en una consulta
 - GET /assets/{symbol}: obtener informacion de un activo
 - GET /prices/{symbol}/current: obtener precio actual
 - GET /prices/{symbol}/historical: obtener precios historicos
 
 estos endpoints son publicos y no requieren autenticacion.
 datos obtenidos desde alpha vantage api con cache en base de datos local.
+
+los endpoints que pueden consultar alpha vantage son async: la peticion http
+se espera en el event loop en lugar de ocupar un worker del threadpool, y las
+consultas a bd se mandan al threadpool con run_in_threadpool.
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from decimal import Decimal
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.middleware.dependencies import get_db, get_optional_user
+from app.core.cache import cache_response
+from app.middleware.dependencies import get_db, get_optional_user, get_asset_cache
 from app.repositories.asset import AssetRepository
 from app.services.market_service import MarketDataService
 from app.schemas.market import (
@@ -28,21 +35,32 @@ from app.schemas.market import (
     PricePoint
 )
 from app.models.user import User
-from app.models.asset import AssetType
+from app.models.asset import Asset, AssetType, norm_symbol
 
 
 router = APIRouter(prefix="/market", tags=["Mercado"])
 
+# maximo de simbolos por peticion en /assets/batch
+MAX_BATCH_SYMBOLS = 100
+
+# cache en cliente/cdn de los historicos. no se usa "max-age=86400, immutable":
+# /prices/{symbol}/historical solo acepta `days` (los ultimos n dias hasta hoy),
+# asi que el rango siempre incluye el dia en curso, que puede actualizarse, y la
+# misma url devuelve otra serie al dia siguiente. immutable solo tendria sentido
+# con un rango cerrado (fecha de fin anterior a hoy), que este endpoint no ofrece
+HISTORICAL_CACHE_CONTROL = "public, max-age=3600"
+
 
 # ------------ // ------------
 # ENDPOINTS DE ACTIVOS
 # ------------ // ------------
 
 @router.get("/assets/search", response_model=List[AssetSearchResult])
-def search_assets(
+async def search_assets(
     q: str = Query(..., min_length=1, max_length=50, description="Término de búsqueda"),
     limit: int = Query(20, ge=1, le=100, description="Máximo de resultados"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    asset_cache: Dict[str, Asset] = Depends(get_asset_cache)
 ):
     """
     busca activos por simbolo o nombre.
@@ -56,8 +74,8 @@ def search_assets(
     **returns:**
     - lista de activos que coinciden con la busqueda
     """
-    market_service = MarketDataService(db)
-    results = market_service.search_assets(q)
+    market_service = MarketDataService(db, asset_cache)
+    results = await market_service.search_assets(q)
     
     # limitar resultados
     results = results[:limit]
@@ -73,14 +91,66 @@ def search_assets(
     ]
 
 
+@router.get("/assets/batch", response_model=Dict[str, Optional[AssetInfo]])
+def get_assets_batch(
+    symbols: str = Query(..., min_length=1, description="Símbolos separados por comas (ej: AAPL,MSFT)"),
+    db: Session = Depends(get_db),
+    asset_cache: Dict[str, Asset] = Depends(get_asset_cache)
+):
+    """
+    obtiene informacion de varios activos en una sola consulta.
+    
+    pensado para tablas de posiciones: reemplaza N llamadas a
+    /assets/{symbol} por una sola (WHERE symbol IN ...).
+    
+    **parametros:**
+    - symbols: simbolos separados por comas (maximo 100)
+    
+    **returns:**
+    - diccionario simbolo -> informacion del activo (null si no existe en el catalogo local)
+    
+    **ejemplo:**
+    ```
+    GET /api/v1/market/assets/batch?symbols=AAPL,MSFT,BTC
+    ```
+    """
+    # normalizar y quitar duplicados conservando el orden
+    requested = list(dict.fromkeys(
+        norm_symbol(s.strip()) for s in symbols.split(",") if s.strip()
+    ))
+    
+    if not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="debes indicar al menos un simbolo"
+        )
+    if len(requested) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"maximo {MAX_BATCH_SYMBOLS} simbolos por peticion"
+        )
+    
+    asset_repo = AssetRepository(db, asset_cache)
+    assets = asset_repo.get_many_by_symbols(requested)
+    
+    return {
+        symbol: AssetInfo.model_validate(assets[symbol]) if symbol in assets else None
+        for symbol in requested
+    }
+
+
 @router.get("/assets/{symbol}", response_model=AssetInfo)
+@cache_response("asset_info", expire=3600, cache_control="public, max-age=3600")
 def get_asset_info(
     symbol: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    asset_cache: Dict[str, Asset] = Depends(get_asset_cache)
 ):
     """
     obtiene informacion detallada de un activo por su simbolo.
     
+    la respuesta se cachea por 1 hora (redis o memoria, ver app.core.cache).
+    
     retorna:
     - simbolo y nombre
     - tipo de activo (STOCK, ETF, CRYPTO)
@@ -92,8 +162,8 @@ def get_asset_info(
     GET /api/v1/market/assets/AAPL
     ```
     """
-    asset_repo = AssetRepository(db)
-    asset = asset_repo.get_by_symbol(symbol.upper())
+    asset_repo = AssetRepository(db, asset_cache)
+    asset = asset_repo.get_by_symbol(norm_symbol(symbol))
     
     if not asset:
         raise HTTPException(
@@ -116,24 +186,26 @@ def get_asset_info(
 # ------------ // ------------
 
 @router.get("/prices/{symbol}/current", response_model=CurrentPriceResponse)
-def get_current_price(
+@cache_response("current_price", expire=300, cache_control="public, max-age=300")
+async def get_current_price(
     symbol: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    asset_cache: Dict[str, Asset] = Depends(get_asset_cache)
 ):
     """
     obtiene el precio actual de un activo.
     
     consulta alpha vantage para precio en tiempo real.
-    resultado se cachea por 5 minutos.
+    resultado se cachea por 5 minutos (redis o memoria, ver app.core.cache).
     
     **ejemplo:**
     ```
     GET /api/v1/market/prices/AAPL/current
     ```
     """
-    market_service = MarketDataService(db)
+    market_service = MarketDataService(db, asset_cache)
     
-    price = market_service.get_current_price(symbol)
+    price = await market_service.get_current_price(symbol)
     
     if not price:
         raise HTTPException(
@@ -142,7 +214,7 @@ def get_current_price(
         )
     
     return CurrentPriceResponse(
-        symbol=symbol.upper(),
+        symbol=norm_symbol(symbol),
         price=price,
         timestamp=datetime.utcnow(),
         currency="USD"
@@ -150,10 +222,11 @@ def get_current_price(
 
 
 @router.get("/prices/{symbol}/historical", response_model=HistoricalPriceResponse)
-def get_historical_prices(
+async def get_historical_prices(
     symbol: str,
     days: int = Query(30, ge=1, le=100, description="Número de días de histórico"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    asset_cache: Dict[str, Asset] = Depends(get_asset_cache)
 ):
     """
     obtiene precios historicos de un activo.
@@ -170,18 +243,19 @@ def get_historical_prices(
     GET /api/v1/market/prices/AAPL/historical?days=30
     ```
     """
-    market_service = MarketDataService(db)
-    asset_repo = AssetRepository(db)
+    # el repositorio y el servicio comparten el cache: el activo se consulta una sola vez
+    market_service = MarketDataService(db, asset_cache)
+    asset_repo = AssetRepository(db, asset_cache)
     
     # verificar que el activo existe
-    asset = asset_repo.get_by_symbol(symbol.upper())
+    asset = await run_in_threadpool(asset_repo.get_by_symbol, norm_symbol(symbol))
     if not asset:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"activo '{symbol}' no encontrado"
         )
     
-    price_history = market_service.get_historical_prices(symbol, days)
+    price_history = await market_service.get_historical_prices(symbol, days)
     
     if not price_history:
         raise HTTPException(
@@ -190,23 +264,36 @@ def get_historical_prices(
         )
     
     # construir lista de price points
+    # fromisoformat (en c) en lugar de strptime, que interpreta el formato en cada fila.
+    # los precios llegan como float: str() evita arrastrar el error binario al Decimal.
+    # los datos vienen de nuestra bd con los tipos ya correctos, asi que se usa
+    # model_construct (sin validacion por campo)
     price_points = [
-        PricePoint(
-            timestamp=datetime.strptime(p["date"], "%Y-%m-%d"),
+        PricePoint.model_construct(
+            timestamp=datetime.fromisoformat(p["date"]),
             open_price=Decimal(str(p["open"])),
             high_price=Decimal(str(p["high"])),
             low_price=Decimal(str(p["low"])),
             close_price=Decimal(str(p["close"])),
-            volume=p["volume"]
+            volume=Decimal(str(p["volume"]))
         )
         for p in price_history
     ]
     
-    return HistoricalPriceResponse(
-        symbol=symbol.upper(),
+    response = HistoricalPriceResponse.model_construct(
+        symbol=norm_symbol(symbol),
         currency="USD",
         prices=price_points
     )
+    
+    # retornar el modelo haria que fastapi lo validara de nuevo contra response_model;
+    # se serializa directamente a json. los historicos se guardan en bd y cambian
+    # como mucho una vez al dia, asi que el cliente puede cachearlos (ETag en HTTPCacheMiddleware)
+    return Response(
+        content=response.model_dump_json(),
+        media_type="application/json",
+        headers={"Cache-Control": HISTORICAL_CACHE_CONTROL}
+    )
 
 
 # ------------ // ------------
@@ -240,17 +327,16 @@ def create_asset(
     asset_repo = AssetRepository(db)
     
     # verificar que no existe
-    existing = asset_repo.get_by_symbol(symbol.upper())
+    existing = asset_repo.get_by_symbol(norm_symbol(symbol))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"el activo '{symbol}' ya existe"
         )
     
-    # crear activo
-    from app.models.asset import Asset
-    asset = Asset(
-        symbol=symbol.upper(),
+    # crear activo (INSERT ... RETURNING, sin refresh posterior)
+    asset = asset_repo.insert_returning(
+        symbol=norm_symbol(symbol),
         name=name,
         asset_type=asset_type,
         currency=currency.upper(),
@@ -258,10 +344,6 @@ def create_asset(
         description=description
     )
     
-    db.add(asset)
-    db.commit()
-    db.refresh(asset)
-    
     return AssetInfo(
         symbol=asset.symbol,
         name=asset.name,
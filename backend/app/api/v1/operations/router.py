@@ -14,10 +14,10 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import date
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status, Query
 
-from app.middleware.dependencies import get_db, get_current_active_user
+from app.api.responses import ORJSONResponse
+from app.middleware.dependencies import CommonDeps
 from app.services.portfolio_service import PortfolioService
 from app.services.operation_service import OperationService
 from app.schemas.operation import (
@@ -25,11 +25,10 @@ from app.schemas.operation import (
     OperationUpdate,
     OperationResponse
 )
-from app.models.user import User
 from app.models.operation import OperationType
 
 
-router = APIRouter(prefix="/operations", tags=["Operaciones"])
+router = APIRouter(prefix="/operations", tags=["Operaciones"], default_response_class=ORJSONResponse)
 
 
 def _verify_portfolio_ownership(portfolio_service: PortfolioService, 
@@ -49,6 +48,24 @@ def _verify_portfolio_ownership(portfolio_service: PortfolioService,
         )
 
 
+def _get_owned_operation(operation_service: OperationService,
+                         operation_id: UUID,
+                         user_id: UUID):
+    """obtiene la operacion verificando que su portfolio pertenece al usuario."""
+    operation, owned = operation_service.get_operation_for_user(operation_id, user_id)
+    if not operation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="operacion no encontrada"
+        )
+    if not owned:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="no tienes permiso para operar en este portfolio"
+        )
+    return operation
+
+
 def _build_operation_response(operation) -> OperationResponse:
     """construye response de operacion desde modelo orm."""
     return OperationResponse(
@@ -69,15 +86,14 @@ def _build_operation_response(operation) -> OperationResponse:
 
 @router.get("/", response_model=List[OperationResponse])
 def list_operations(
+    deps: CommonDeps,
     portfolio_id: UUID,
     asset_symbol: Optional[str] = Query(None, description="Filtrar por símbolo"),
     operation_type: Optional[OperationType] = Query(None, description="Filtrar por tipo (BUY/SELL)"),
     date_from: Optional[date] = Query(None, description="Fecha inicio (YYYY-MM-DD)"),
     date_to: Optional[date] = Query(None, description="Fecha fin (YYYY-MM-DD)"),
     skip: int = Query(0, ge=0, description="Registros a saltar"),
-    limit: int = Query(100, ge=1, le=500, description="Máximo de registros"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    limit: int = Query(100, ge=1, le=500, description="Máximo de registros")
 ):
     """
     lista operaciones de un portfolio con filtros opcionales.
@@ -92,16 +108,17 @@ def list_operations(
     - limit: maximo de registros (max 500)
     
     ordenado por fecha descendente (mas recientes primero).
+    
+    las filas se serializan directamente con orjson (sin construir un
+    OperationResponse por operacion).
     """
-    portfolio_service = PortfolioService(db)
+    db, current_user = deps
     operation_service = OperationService(db)
     
-    # verificar ownership
-    _verify_portfolio_ownership(portfolio_service, portfolio_id, current_user.id)
-    
-    # filtrar operaciones
-    operations = operation_service.filter_operations(
+    # filtrar operaciones (el join con portfolios ya verifica ownership)
+    operations = operation_service.filter_operations_authorized(
         portfolio_id=portfolio_id,
+        user_id=current_user.id,
         asset_symbol=asset_symbol,
         operation_type=operation_type,
         date_from=date_from,
@@ -110,14 +127,17 @@ def list_operations(
         limit=limit
     )
     
-    return [_build_operation_response(op) for op in operations]
+    # sin resultados: distinguir portfolio inexistente (404), ajeno (403) o vacio
+    if not operations:
+        _verify_portfolio_ownership(PortfolioService(db), portfolio_id, current_user.id)
+    
+    return ORJSONResponse(operations)
 
 
 @router.post("/", response_model=OperationResponse, status_code=status.HTTP_201_CREATED)
 def create_operation(
     operation_data: OperationCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     crea una nueva operacion de compra o venta.
@@ -135,6 +155,7 @@ def create_operation(
     - BUY: quantity × price + fees
     - SELL: quantity × price - fees
     """
+    db, current_user = deps
     portfolio_service = PortfolioService(db)
     
     # verificar ownership
@@ -161,8 +182,7 @@ def create_operation(
 @router.get("/stats/{portfolio_id}")
 def get_portfolio_statistics(
     portfolio_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     obtiene estadisticas de operaciones del portfolio.
@@ -175,6 +195,7 @@ def get_portfolio_statistics(
     - total_fees: comisiones pagadas
     - unique_assets: numero de activos distintos
     """
+    db, current_user = deps
     portfolio_service = PortfolioService(db)
     operation_service = OperationService(db)
     
@@ -183,42 +204,26 @@ def get_portfolio_statistics(
     
     stats = operation_service.get_portfolio_statistics(portfolio_id)
     
-    # convertir decimals a strings para json
-    return {
-        "total_operations": stats["total_operations"],
-        "total_buys": stats["total_buys"],
-        "total_sells": stats["total_sells"],
-        "total_invested": str(stats["total_invested"]),
-        "total_withdrawn": str(stats["total_withdrawn"]),
-        "total_fees": str(stats["total_fees"]),
-        "unique_assets": stats["unique_assets"]
-    }
+    # ORJSONResponse serializa los decimals como strings; retornarla directamente
+    # evita jsonable_encoder (que los convertiria a float)
+    return ORJSONResponse(stats)
 
 
 @router.get("/{operation_id}", response_model=OperationResponse)
 def get_operation(
     operation_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     obtiene detalle de una operacion especifica.
     
     valida que la operacion pertenezca a un portfolio del usuario.
     """
-    portfolio_service = PortfolioService(db)
+    db, current_user = deps
     operation_service = OperationService(db)
     
-    operation = operation_service.get_operation(operation_id)
-    
-    if not operation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="operacion no encontrada"
-        )
-    
-    # verificar ownership del portfolio
-    _verify_portfolio_ownership(portfolio_service, operation.portfolio_id, current_user.id)
+    # operacion y ownership en una sola consulta
+    operation = _get_owned_operation(operation_service, operation_id, current_user.id)
     
     return _build_operation_response(operation)
 
@@ -227,8 +232,7 @@ def get_operation(
 def update_operation(
     operation_id: UUID,
     update_data: OperationUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     actualiza una operacion existente.
@@ -240,19 +244,11 @@ def update_operation(
     los valores financieros (quantity, price, fees) son inmutables
     para mantener la integridad del historial.
     """
-    portfolio_service = PortfolioService(db)
+    db, current_user = deps
     operation_service = OperationService(db)
     
-    operation = operation_service.get_operation(operation_id)
-    
-    if not operation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="operacion no encontrada"
-        )
-    
-    # verificar ownership
-    _verify_portfolio_ownership(portfolio_service, operation.portfolio_id, current_user.id)
+    # operacion y ownership en una sola consulta
+    operation = _get_owned_operation(operation_service, operation_id, current_user.id)
     
     # actualizar solo notas (por ahora)
     if update_data.notes is not None:
@@ -12,10 +12,9 @@ todos los endpoints requieren autenticacion y validan ownership.
 """
 from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Response, status
 
-from app.middleware.dependencies import get_db, get_current_active_user
+from app.middleware.dependencies import CommonDeps
 from app.services.portfolio_service import PortfolioService
 from app.schemas.portfolio import (
     PortfolioCreate,
@@ -24,7 +23,6 @@ from app.schemas.portfolio import (
     PortfolioDetailResponse,
     PortfolioAssetResponse
 )
-from app.models.user import User
 from decimal import Decimal
 
 
@@ -48,29 +46,31 @@ def _build_portfolio_response(portfolio) -> PortfolioResponse:
     )
 
 
-def _build_portfolio_detail_response(portfolio) -> PortfolioDetailResponse:
-    """construye response detallada de portfolio con posiciones."""
-    assets = []
-    
-    for asset in portfolio.assets:
-        position_value = asset.quantity * asset.current_price
-        cost_basis = asset.quantity * asset.average_price
-        gain_loss = position_value - cost_basis
-        gain_loss_percent = (gain_loss / cost_basis * 100) if cost_basis > 0 else Decimal("0")
-        
-        assets.append(PortfolioAssetResponse(
-            id=asset.id,
-            asset_symbol=asset.asset_symbol,
-            quantity=asset.quantity,
-            average_price=asset.average_price,
-            current_price=asset.current_price,
-            position_value=position_value,
-            gain_loss=gain_loss,
-            gain_loss_percent=gain_loss_percent,
-            updated_at=asset.updated_at
-        ))
-    
-    return PortfolioDetailResponse(
+def _build_portfolio_detail_response(portfolio, positions) -> PortfolioDetailResponse:
+    """
+    construye response detallada de portfolio con posiciones.
+    
+    positions son filas con las metricas ya calculadas en sql
+    (ver PortfolioService.get_portfolio_positions_computed). todos los
+    valores vienen de la bd con sus tipos, asi que se usa model_construct
+    (sin validacion por campo).
+    """
+    assets = [
+        PortfolioAssetResponse.model_construct(
+            id=row.id,
+            asset_symbol=row.asset_symbol,
+            quantity=row.quantity,
+            average_price=row.average_price,
+            current_price=row.current_price,
+            position_value=row.position_value,
+            gain_loss=row.gain_loss,
+            gain_loss_percent=row.gain_loss_percent,
+            updated_at=row.updated_at
+        )
+        for row in positions
+    ]
+    
+    return PortfolioDetailResponse.model_construct(
         id=portfolio.id,
         user_id=portfolio.user_id,
         name=portfolio.name,
@@ -88,8 +88,7 @@ def _build_portfolio_detail_response(portfolio) -> PortfolioDetailResponse:
 
 @router.get("/", response_model=List[PortfolioResponse])
 def list_portfolios(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     lista todos los portfolios del usuario autenticado.
@@ -97,6 +96,7 @@ def list_portfolios(
     retorna lista de portfolios con metricas agregadas.
     no incluye posiciones individuales (usar GET /{id} para detalle).
     """
+    db, current_user = deps
     portfolio_service = PortfolioService(db)
     portfolios = portfolio_service.list_user_portfolios(current_user.id)
     
@@ -106,8 +106,7 @@ def list_portfolios(
 @router.post("/", response_model=PortfolioResponse, status_code=status.HTTP_201_CREATED)
 def create_portfolio(
     portfolio_data: PortfolioCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     crea un nuevo portfolio para el usuario autenticado.
@@ -119,6 +118,7 @@ def create_portfolio(
     **returns:**
     - portfolio creado con id asignado
     """
+    db, current_user = deps
     portfolio_service = PortfolioService(db)
     
     try:
@@ -139,8 +139,7 @@ def create_portfolio(
 @router.get("/{portfolio_id}", response_model=PortfolioDetailResponse)
 def get_portfolio(
     portfolio_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     obtiene un portfolio con todas sus posiciones.
@@ -154,6 +153,7 @@ def get_portfolio(
     - portfolio debe existir
     - portfolio debe pertenecer al usuario autenticado
     """
+    db, current_user = deps
     portfolio_service = PortfolioService(db)
     portfolio = portfolio_service.get_portfolio(portfolio_id)
     
@@ -170,15 +170,20 @@ def get_portfolio(
             detail="no tienes permiso para ver este portfolio"
         )
     
-    return _build_portfolio_detail_response(portfolio)
+    # metricas por posicion calculadas en la misma consulta que las trae
+    positions = portfolio_service.get_portfolio_positions_computed(portfolio_id)
+    
+    # retornar el modelo haria que fastapi lo validara de nuevo contra response_model;
+    # se serializa directamente a json
+    detail = _build_portfolio_detail_response(portfolio, positions)
+    return Response(content=detail.model_dump_json(), media_type="application/json")
 
 
 @router.put("/{portfolio_id}", response_model=PortfolioResponse)
 def update_portfolio(
     portfolio_id: UUID,
     update_data: PortfolioUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     actualiza un portfolio existente.
@@ -193,6 +198,7 @@ def update_portfolio(
     **validaciones:**
     - portfolio debe existir y pertenecer al usuario
     """
+    db, current_user = deps
     portfolio_service = PortfolioService(db)
     
     # verificar existencia y ownership
@@ -222,8 +228,7 @@ def update_portfolio(
 @router.delete("/{portfolio_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_portfolio(
     portfolio_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     elimina un portfolio y todas sus posiciones y operaciones.
@@ -233,6 +238,7 @@ def delete_portfolio(
     **validaciones:**
     - portfolio debe existir y pertenecer al usuario
     """
+    db, current_user = deps
     portfolio_service = PortfolioService(db)
     
     # verificar existencia y ownership
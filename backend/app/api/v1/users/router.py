@@ -8,32 +8,56 @@ proporciona:
 
 todos los endpoints requieren autenticacion.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Response, status
 
-from app.middleware.dependencies import get_db, get_current_active_user
-from app.services.user_service import UserService
+from app.core.cache import response_cache
+from app.middleware.dependencies import CommonDeps
+from app.services.user_service import PROFILE_CACHE_TTL, UserService, profile_cache_key
 from app.services.auth_service import AuthService
 from app.schemas.user import UserProfileResponse, UserUpdate, PasswordChange
-from app.models.user import User
 
 
 router = APIRouter(prefix="/users", tags=["Usuarios"])
 
 
+def _profile_response(user) -> Response:
+    """
+    serializa el perfil del usuario a json y lo guarda en cache.
+    
+    retornar el modelo haria que fastapi lo validara de nuevo contra
+    response_model; se serializa directamente. el json queda cacheado
+    para el siguiente GET /me (write-through tras un PUT).
+    
+    args:
+        user: usuario orm con el perfil cargado
+        
+    returns:
+        respuesta json con UserProfileResponse
+    """
+    body = UserProfileResponse.from_orm_user(user).model_dump_json()
+    response_cache.set(profile_cache_key(user.id), body, PROFILE_CACHE_TTL)
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/me", response_model=UserProfileResponse)
 def get_current_user_profile(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     obtiene el perfil completo del usuario autenticado.
     
     incluye informacion basica del usuario y sus preferencias de perfil.
+    la respuesta se cachea 5 minutos por usuario y se renueva al actualizar el perfil.
     
     **returns:**
     - datos del usuario con perfil completo
     """
+    db, current_user = deps
+    
+    cached = response_cache.get(profile_cache_key(current_user.id))
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
     user_service = UserService(db)
     user_with_profile = user_service.get_user_by_id(current_user.id)
     
@@ -43,39 +67,13 @@ def get_current_user_profile(
             detail="usuario no encontrado"
         )
     
-    # construir response con perfil
-    profile_data = {
-        "currency": "USD",
-        "timezone": "UTC",
-        "language": "en",
-        "preferences": {}
-    }
-    
-    if user_with_profile.profile:
-        profile_data = {
-            "currency": user_with_profile.profile.currency,
-            "timezone": user_with_profile.profile.timezone,
-            "language": user_with_profile.profile.language,
-            "preferences": user_with_profile.profile.preferences or {}
-        }
-    
-    return UserProfileResponse(
-        id=user_with_profile.id,
-        email=user_with_profile.email,
-        full_name=user_with_profile.full_name,
-        is_active=user_with_profile.is_active,
-        is_verified=user_with_profile.is_verified,
-        created_at=user_with_profile.created_at,
-        updated_at=user_with_profile.updated_at,
-        profile=profile_data
-    )
+    return _profile_response(user_with_profile)
 
 
 @router.put("/me", response_model=UserProfileResponse)
 def update_current_user(
     update_data: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     actualiza el perfil del usuario autenticado.
@@ -89,6 +87,7 @@ def update_current_user(
     - language: idioma (ISO 639-1)
     - preferences: preferencias adicionales (json)
     """
+    db, current_user = deps
     user_service = UserService(db)
     
     # separar campos de usuario y perfil
@@ -107,49 +106,17 @@ def update_current_user(
     if update_data.preferences is not None:
         profile_fields["preferences"] = update_data.preferences
     
-    # actualizar campos de usuario si hay
-    if user_fields:
-        user_service.update_user_info(current_user.id, **user_fields)
-    
-    # actualizar campos de perfil si hay
-    if profile_fields:
-        user_service.update_user_profile(current_user.id, **profile_fields)
-    
-    # obtener usuario actualizado
-    updated_user = user_service.get_user_by_id(current_user.id)
-    
-    profile_data = {
-        "currency": "USD",
-        "timezone": "UTC",
-        "language": "en",
-        "preferences": {}
-    }
-    
-    if updated_user.profile:
-        profile_data = {
-            "currency": updated_user.profile.currency,
-            "timezone": updated_user.profile.timezone,
-            "language": updated_user.profile.language,
-            "preferences": updated_user.profile.preferences or {}
-        }
-    
-    return UserProfileResponse(
-        id=updated_user.id,
-        email=updated_user.email,
-        full_name=updated_user.full_name,
-        is_active=updated_user.is_active,
-        is_verified=updated_user.is_verified,
-        created_at=updated_user.created_at,
-        updated_at=updated_user.updated_at,
-        profile=profile_data
-    )
+    # una sola transaccion sobre current_user; la respuesta se arma con el
+    # mismo objeto, sin volver a consultar el usuario
+    updated_user = user_service.apply_updates(current_user, user_fields, profile_fields)
+    
+    return _profile_response(updated_user)
 
 
 @router.put("/me/password", status_code=status.HTTP_204_NO_CONTENT)
-def change_password(
+async def change_password(
     password_data: PasswordChange,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    deps: CommonDeps
 ):
     """
     cambia la password del usuario autenticado.
@@ -161,9 +128,10 @@ def change_password(
     - password actual debe ser correcta
     - nueva password debe tener min 8 chars, una mayuscula, una minuscula y un numero
     """
+    db, current_user = deps
     auth_service = AuthService(db)
     
-    success = auth_service.change_password(
+    success = await auth_service.change_password(
         user_id=current_user.id,
         current_password=password_data.current_password,
         new_password=password_data.new_password
@@ -4,9 +4,20 @@ clientes para servicios externos.
 este paquete contiene los clientes para integraciones con APIs externas:
 - alpha_vantage: datos de mercado financiero
 - openai: analisis con inteligencia artificial
+- http_client: cliente httpx compartido por proceso
+- cache: cache de respuestas de las apis (redis o memoria)
 """
 
 from app.clients.alpha_vantage_client import AlphaVantageClient
+from app.clients.cache import ApiCache, api_cache
+from app.clients.http_client import close_http_client, get_http_client
 from app.clients.openai_client import OpenAIClient
 
-__all__ = ["AlphaVantageClient", "OpenAIClient"]
+__all__ = [
+    "AlphaVantageClient",
+    "ApiCache",
+    "OpenAIClient",
+    "api_cache",
+    "close_http_client",
+    "get_http_client",
+]
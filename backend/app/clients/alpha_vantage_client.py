@@ -6,20 +6,86 @@ proporciona metodos para obtener datos de mercado financiero:
 - datos historicos (time series daily)
 - busqueda de simbolos
 
+el cliente es asincrono (httpx.AsyncClient): mientras espera a la api
+no ocupa un worker del threadpool de fastapi. por defecto usa el cliente
+http compartido del proceso (ver http_client.py), asi que crear un
+AlphaVantageClient por request no abre conexiones nuevas.
+
+las respuestas parseadas se cachean (redis o memoria, ver cache.py) con un
+ttl por endpoint, para no gastar el rate limit en consultas repetidas. el
+ultimo quote/historico valido se guarda ademas como copia "stale" de larga
+duracion, que se sirve si alpha vantage falla o limita las peticiones.
+
+los precios se parsean a float a proposito: Decimal(str) es mucho mas lento
+y aqui se procesan cientos de filas por respuesta. la conversion a Decimal
+se hace solo al guardar en bd (ver MarketDataService), nunca en el cliente.
+
 documentacion oficial: https://www.alphavantage.co/documentation/
 """
+import asyncio
+import hashlib
 import logging
-from typing import Optional, Dict, List, Any
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Tuple
 from datetime import datetime, timedelta
-from decimal import Decimal
 
 import httpx
+import orjson
+from app.clients.cache import api_cache
+from app.clients.http_client import get_http_client
 from app.core.config import settings
 
 
 logger = logging.getLogger(__name__)
 
 
+# lru en memoria para search_symbol, delante del cache redis: las busquedas del
+# autocompletado se repiten mucho y asi las mas frecuentes no hacen ni el GET a redis.
+# solo se accede desde el event loop y sin await entre leer y escribir, asi que
+# no necesita lock
+SEARCH_LRU_MAXSIZE = 512
+_search_lru: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+
+
+def _search_lru_get(key: str) -> Optional[List[Dict[str, Any]]]:
+    """obtiene una busqueda del lru si existe y no expiro."""
+    entry = _search_lru.get(key)
+    if entry is None:
+        return None
+    expires_at, matches = entry
+    if expires_at <= time.monotonic():
+        del _search_lru[key]
+        return None
+    _search_lru.move_to_end(key)
+    return matches
+
+
+def _search_lru_set(key: str, matches: List[Dict[str, Any]], ttl: int) -> None:
+    """guarda una busqueda en el lru, descartando la menos usada si esta lleno."""
+    _search_lru[key] = (time.monotonic() + ttl, matches)
+    _search_lru.move_to_end(key)
+    if len(_search_lru) > SEARCH_LRU_MAXSIZE:
+        _search_lru.popitem(last=False)
+
+
+# historicos ya parseados por (simbolo, outputsize, hash del body). cuando vence
+# el cache y alpha vantage devuelve los mismos bytes (el diario solo cambia una
+# vez por sesion), se reutiliza la lista en lugar de volver a decodificar y
+# convertir cada fila. las listas son compartidas: no se deben mutar
+DAILY_PARSE_LRU_MAXSIZE = 64
+_daily_parse_lru: "OrderedDict[Tuple[str, str, bytes], List[Dict[str, Any]]]" = OrderedDict()
+
+
+def _body_digest(body: bytes) -> bytes:
+    """hash del body de una respuesta (blake2b de 16 bytes, stdlib)."""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class AlphaVantageRateLimit(Exception):
+    """alpha vantage rechazo la peticion por rate limit (campo "Note")."""
+
+
 class AlphaVantageClient:
     """
     cliente para interactuar con alpha vantage api.
@@ -35,75 +101,153 @@ class AlphaVantageClient:
     """
     
     BASE_URL = "https://www.alphavantage.co/query"
-    TIMEOUT = 10.0  # segundos
     
-    def __init__(self, api_key: Optional[str] = None):
+    # ttl del cache por endpoint (segundos): el quote cambia durante la sesion,
+    # el historico diario y la busqueda casi no cambian
+    QUOTE_TTL = 30
+    DAILY_TTL = 6 * 3600
+    SEARCH_TTL = 24 * 3600
+    
+    # vida de la copia stale usada como fallback cuando la api falla
+    STALE_TTL = 24 * 3600
+    
+    # consultas simultaneas maximas en get_quotes (free tier: 5 requests/minuto)
+    QUOTES_CONCURRENCY = 5
+    
+    # respuestas servidas desde la copia stale (por proceso, para observabilidad)
+    cache_fallback_hits = 0
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
         """
         inicializa el cliente.
         
         args:
             api_key: api key de alpha vantage (usa settings si no se proporciona)
+            client: cliente http a usar (por defecto el compartido del proceso);
+                quien lo pasa es responsable de cerrarlo
+            
+        raises:
+            ValueError: si no hay api key configurada
         """
         self.api_key = api_key or settings.alpha_vantage_api_key
-        self.client = httpx.Client(timeout=self.TIMEOUT)
-    
-    def __enter__(self):
-        """context manager support."""
-        return self
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """cierra el cliente al salir del context."""
-        self.client.close()
+        # se valida una vez al construir: _make_request ya no comprueba la key
+        if not self.api_key:
+            raise ValueError(
+                "alpha vantage api key no configurada. "
+                "configura ALPHA_VANTAGE_API_KEY en .env"
+            )
+        self.client = client or get_http_client()
     
-    def _make_request(self, params: Dict[str, str]) -> Dict[str, Any]:
+    async def _make_request(self, function: str, **extra: str) -> Dict[str, Any]:
         """
-        realiza una peticion a la api.
+        realiza una peticion a la api y parsea la respuesta.
         
         args:
-            params: parametros de la query
+            function: funcion de alpha vantage (ej: "GLOBAL_QUOTE")
+            **extra: resto de parametros de la query (symbol, keywords, ...)
             
         returns:
             respuesta json parseada
             
         raises:
-            ValueError: si no hay api key configurada
             httpx.HTTPError: si falla la peticion
+            AlphaVantageRateLimit: si se excedio el rate limit
             Exception: si la api retorna error
         """
-        if not self.api_key:
-            raise ValueError(
-                "alpha vantage api key no configurada. "
-                "configura ALPHA_VANTAGE_API_KEY en .env"
-            )
+        return self._decode(await self._fetch(function, **extra))
+    
+    async def _fetch(self, function: str, **extra: str) -> bytes:
+        """
+        hace la peticion http y retorna el body sin parsear.
         
-        # agregar api key a los parametros
-        params["apikey"] = self.api_key
+        los parametros se arman en un solo dict (funcion + api key + extras)
+        en lugar de crear uno en cada metodo y mutarlo aqui.
         
-        logger.info(f"alpha vantage request: {params.get('function')} - {params.get('symbol', 'N/A')}")
+        args:
+            function: funcion de alpha vantage (ej: "GLOBAL_QUOTE")
+            **extra: resto de parametros de la query
+            
+        returns:
+            bytes de la respuesta
+            
+        raises:
+            httpx.HTTPError: si falla la peticion
+        """
+        params = {"function": function, "apikey": self.api_key, **extra}
+        
+        # formato diferido: si INFO esta filtrado, logging no arma el mensaje
+        logger.info("alpha vantage request: %s - %s", function, extra.get("symbol", "N/A"))
         
         try:
-            response = self.client.get(self.BASE_URL, params=params)
+            response = await self.client.get(self.BASE_URL, params=params)
             response.raise_for_status()
-            data = response.json()
-            
-            # alpha vantage retorna errores en el json
-            if "Error Message" in data:
-                raise Exception(f"alpha vantage error: {data['Error Message']}")
-            
-            if "Note" in data:
-                # rate limit excedido
-                raise Exception(
-                    f"alpha vantage rate limit: {data['Note']}. "
-                    "free tier permite 25 requests/dia, 5/minuto"
-                )
-            
-            return data
+            return response.content
             
         except httpx.HTTPError as e:
-            logger.error(f"error en peticion alpha vantage: {e}")
+            logger.error("error en peticion alpha vantage: %s", e)
             raise
     
-    def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _decode(body: bytes) -> Dict[str, Any]:
+        """
+        parsea el body y convierte los errores de la api en excepciones.
+        
+        raises:
+            AlphaVantageRateLimit: si se excedio el rate limit
+            Exception: si la api retorna error
+        """
+        # orjson parsea los bytes directamente (sin decodificar a str primero);
+        # con outputsize=full el json trae miles de filas
+        data = orjson.loads(body)
+        
+        # alpha vantage retorna errores en el json
+        if "Error Message" in data:
+            raise Exception(f"alpha vantage error: {data['Error Message']}")
+        
+        if "Note" in data:
+            # rate limit excedido
+            raise AlphaVantageRateLimit(
+                f"alpha vantage rate limit: {data['Note']}. "
+                "free tier permite 25 requests/dia, 5/minuto"
+            )
+        
+        return data
+    
+    async def _store(self, cache_key: str, value: Any, ttl: int) -> None:
+        """guarda la respuesta en cache y su copia stale para fallback."""
+        await api_cache.set_json(cache_key, value, ttl=ttl)
+        await api_cache.set_json(f"{cache_key}:stale", value, ttl=self.STALE_TTL)
+    
+    async def _stale_fallback(self, cache_key: str, error: Exception) -> Optional[Any]:
+        """
+        obtiene la ultima respuesta valida cuando la api falla.
+        
+        args:
+            cache_key: clave de cache del endpoint
+            error: error de la peticion (para el log)
+            
+        returns:
+            copia stale (los dicts llevan "_stale": True) o None si no hay
+        """
+        stale = await api_cache.get_json(f"{cache_key}:stale")
+        if stale is None:
+            logger.error("alpha vantage fallo y no hay copia en cache para %s: %s", cache_key, error)
+            return None
+        
+        AlphaVantageClient.cache_fallback_hits += 1
+        logger.warning(
+            "alpha vantage fallo (%s); sirviendo copia stale de %s (cache_fallback_hits=%d)",
+            error, cache_key, AlphaVantageClient.cache_fallback_hits
+        )
+        if isinstance(stale, dict):
+            stale["_stale"] = True
+        return stale
+    
+    async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
         obtiene cotizacion actual de un activo.
         
@@ -131,24 +275,68 @@ class AlphaVantageClient:
                 "change_percent": "0.30%",
                 "timestamp": "2024-12-05"
             }
+            si la api falla se retorna el ultimo quote valido con "_stale": True
         """
-        try:
-            params = {
-                "function": "GLOBAL_QUOTE",
-                "symbol": symbol.upper()
-            }
+        cache_key = f"av:quote:{symbol.upper()}"
+        cached = await api_cache.get_json(cache_key)
+        if cached is not None:
+            return cached
+        
+        return await self._fetch_quote(symbol, cache_key)
+    
+    async def get_quotes(self, symbols: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        obtiene cotizaciones de varios activos en paralelo.
+        
+        los quotes en cache se resuelven sin esperar; solo las consultas a la
+        api pasan por un semaforo de QUOTES_CONCURRENCY, para no disparar el
+        rate limit con un portfolio grande.
+        
+        args:
+            symbols: simbolos de los activos
             
-            data = self._make_request(params)
+        returns:
+            diccionario simbolo -> quote (mismo formato que get_quote) o none
+        """
+        sem = asyncio.Semaphore(self.QUOTES_CONCURRENCY)
+        
+        async def one(symbol: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+            cache_key = f"av:quote:{symbol.upper()}"
+            cached = await api_cache.get_json(cache_key)
+            if cached is not None:
+                return symbol, cached
+            async with sem:
+                return symbol, await self._fetch_quote(symbol, cache_key)
+        
+        results = await asyncio.gather(*(one(s) for s in symbols))
+        return dict(results)
+    
+    async def _fetch_quote(self, symbol: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        consulta GLOBAL_QUOTE a la api y cachea el resultado (sin mirar el cache).
+        
+        args:
+            symbol: simbolo del activo
+            cache_key: clave de cache del quote
+            
+        returns:
+            quote parseado, copia stale si la api falla o none
+        """
+        try:
+            try:
+                data = await self._make_request("GLOBAL_QUOTE", symbol=symbol.upper())
+            except (httpx.HTTPError, AlphaVantageRateLimit) as e:
+                return await self._stale_fallback(cache_key, e)
             
             # verificar que haya datos
             if "Global Quote" not in data or not data["Global Quote"]:
-                logger.warning(f"no se encontraron datos para {symbol}")
+                logger.warning("no se encontraron datos para %s", symbol)
                 return None
             
             quote = data["Global Quote"]
             
             # parsear y normalizar datos
-            return {
+            result = {
                 "symbol": quote.get("01. symbol", symbol.upper()),
                 "price": float(quote.get("05. price", 0)),
                 "open": float(quote.get("02. open", 0)),
@@ -160,11 +348,14 @@ class AlphaVantageClient:
                 "timestamp": quote.get("07. latest trading day", datetime.now().strftime("%Y-%m-%d"))
             }
             
+            await self._store(cache_key, result, ttl=self.QUOTE_TTL)
+            return result
+            
         except Exception as e:
-            logger.error(f"error obteniendo quote para {symbol}: {e}")
+            logger.error("error obteniendo quote para %s: %s", symbol, e)
             return None
     
-    def get_daily_prices(
+    async def get_daily_prices(
         self, 
         symbol: str, 
         outputsize: str = "compact"
@@ -177,7 +368,10 @@ class AlphaVantageClient:
         
         args:
             symbol: simbolo del activo
-            outputsize: "compact" (100 ultimos dias) o "full" (20+ años)
+            outputsize: "compact" (100 ultimos dias) o "full" (20+ años).
+                la respuesta se parsea completa en memoria; con "full" son
+                varios MB, aceptable porque hoy ningun endpoint la pide
+                (los historicos se limitan a 100 dias)
             
         returns:
             lista de diccionarios con datos historicos ordenados por fecha desc
@@ -193,24 +387,42 @@ class AlphaVantageClient:
                 },
                 ...
             ]
+            si la api falla se retorna el ultimo historico valido
         """
+        cache_key = f"av:daily:{symbol.upper()}:{outputsize}"
+        cached = await api_cache.get_json(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            params = {
-                "function": "TIME_SERIES_DAILY",
-                "symbol": symbol.upper(),
-                "outputsize": outputsize
-            }
-            
-            data = self._make_request(params)
+            try:
+                body = await self._fetch(
+                    "TIME_SERIES_DAILY",
+                    symbol=symbol.upper(),
+                    outputsize=outputsize
+                )
+                # mismo body que una respuesta ya parseada: se salta el parseo
+                parse_key = (symbol.upper(), outputsize, _body_digest(body))
+                prices = _daily_parse_lru.get(parse_key)
+                if prices is not None:
+                    _daily_parse_lru.move_to_end(parse_key)
+                    await self._store(cache_key, prices, ttl=self.DAILY_TTL)
+                    return prices
+                data = self._decode(body)
+            except (httpx.HTTPError, AlphaVantageRateLimit) as e:
+                return await self._stale_fallback(cache_key, e)
             
             # verificar que haya datos
             if "Time Series (Daily)" not in data:
-                logger.warning(f"no se encontraron datos historicos para {symbol}")
+                logger.warning("no se encontraron datos historicos para %s", symbol)
                 return None
             
             time_series = data["Time Series (Daily)"]
             
-            # convertir a lista de dicts y ordenar por fecha descendente
+            # convertir a lista de dicts y ordenar por fecha descendente.
+            # el bucle es intencional: DataFrame.from_dict + astype + to_dict("records")
+            # es ~5x mas lento con outputsize=full (~5000 filas), porque armar el
+            # dataframe y volver a dicts cuesta mas que los float() por campo
             prices = []
             for date_str, values in time_series.items():
                 prices.append({
@@ -225,13 +437,18 @@ class AlphaVantageClient:
             # ordenar por fecha descendente (mas reciente primero)
             prices.sort(key=lambda x: x["date"], reverse=True)
             
+            _daily_parse_lru[parse_key] = prices
+            if len(_daily_parse_lru) > DAILY_PARSE_LRU_MAXSIZE:
+                _daily_parse_lru.popitem(last=False)
+            
+            await self._store(cache_key, prices, ttl=self.DAILY_TTL)
             return prices
             
         except Exception as e:
-            logger.error(f"error obteniendo datos historicos para {symbol}: {e}")
+            logger.error("error obteniendo datos historicos para %s: %s", symbol, e)
             return None
     
-    def search_symbol(self, keywords: str) -> Optional[List[Dict[str, Any]]]:
+    async def search_symbol(self, keywords: str) -> Optional[List[Dict[str, Any]]]:
         """
         busca simbolos por keywords.
         
@@ -255,17 +472,31 @@ class AlphaVantageClient:
                 ...
             ]
         """
+        cache_key = f"av:search:{keywords.lower().strip()}"
+        
+        # lru del proceso -> redis -> api
+        cached = _search_lru_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        cached = await api_cache.get_json(cache_key)
+        if cached is not None:
+            _search_lru_set(cache_key, cached, ttl=self.SEARCH_TTL)
+            return cached
+        
         try:
-            params = {
-                "function": "SYMBOL_SEARCH",
-                "keywords": keywords
-            }
-            
-            data = self._make_request(params)
+            data = await self._make_request("SYMBOL_SEARCH", keywords=keywords)
             
             # verificar que haya resultados
-            if "bestMatches" not in data or not data["bestMatches"]:
-                logger.info(f"no se encontraron resultados para '{keywords}'")
+            if "bestMatches" not in data:
+                logger.info("no se encontraron resultados para '%s'", keywords)
+                return []
+            
+            if not data["bestMatches"]:
+                # busqueda valida sin coincidencias: tambien se cachea
+                logger.info("no se encontraron resultados para '%s'", keywords)
+                await api_cache.set_json(cache_key, [], ttl=self.SEARCH_TTL)
+                _search_lru_set(cache_key, [], ttl=self.SEARCH_TTL)
                 return []
             
             # parsear resultados
@@ -279,31 +510,30 @@ class AlphaVantageClient:
                     "currency": match.get("8. currency", "USD")
                 })
             
+            await api_cache.set_json(cache_key, matches, ttl=self.SEARCH_TTL)
+            _search_lru_set(cache_key, matches, ttl=self.SEARCH_TTL)
             return matches
             
         except Exception as e:
-            logger.error(f"error buscando simbolos para '{keywords}': {e}")
+            logger.error("error buscando simbolos para '%s': %s", keywords, e)
             return []
-    
-    def close(self):
-        """cierra el cliente http."""
-        self.client.close()
 
 
 # ejemplo de uso:
 # 
-# with AlphaVantageClient() as client:
-#     # obtener precio actual
-#     quote = client.get_quote("AAPL")
-#     if quote:
-#         print(f"AAPL: ${quote['price']}")
-#     
-#     # obtener historico
-#     prices = client.get_daily_prices("AAPL", outputsize="compact")
-#     if prices:
-#         print(f"ultimos {len(prices)} dias de datos")
-#     
-#     # buscar simbolos
-#     results = client.search_symbol("apple")
-#     for result in results:
-#         print(f"{result['symbol']} - {result['name']}")
+# client = AlphaVantageClient()
+# 
+# # obtener precio actual
+# quote = await client.get_quote("AAPL")
+# if quote:
+#     print(f"AAPL: ${quote['price']}")
+# 
+# # obtener historico
+# prices = await client.get_daily_prices("AAPL", outputsize="compact")
+# if prices:
+#     print(f"ultimos {len(prices)} dias de datos")
+# 
+# # buscar simbolos
+# results = await client.search_symbol("apple")
+# for result in results:
+#     print(f"{result['symbol']} - {result['name']}")
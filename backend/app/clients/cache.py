@@ -0,0 +1,108 @@
+"""
+cache de respuestas de apis externas (cache-aside).
+
+guarda las respuestas ya parseadas de alpha vantage como json con un ttl
+por endpoint, asi el mismo simbolo consultado varias veces por minuto no
+vuelve a gastar una llamada del rate limit.
+
+- si REDIS_URL esta configurada se usa redis.asyncio (compartido entre workers)
+- si no, o si redis no esta instalado, se usa un dict en memoria del proceso
+
+si redis falla se registra el error y la peticion sigue contra la api,
+nunca falla por el cache.
+"""
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+
+class ApiCache:
+    """
+    almacen async clave -> json con expiracion.
+    
+    todas las corrutinas corren en el event loop, asi que el dict en
+    memoria no necesita lock.
+    """
+    
+    def __init__(self, redis_url: str = "", max_connections: int = 50):
+        self._redis = None
+        self._memory: Dict[str, Tuple[float, str]] = {}
+        
+        if redis_url and REDIS_AVAILABLE:
+            pool = aioredis.ConnectionPool.from_url(
+                redis_url,
+                max_connections=max_connections,
+                decode_responses=True
+            )
+            self._redis = aioredis.Redis(connection_pool=pool)
+        elif redis_url:
+            logger.warning("REDIS_URL configurada pero redis no esta instalado; usando cache en memoria")
+    
+    async def get_json(self, key: str) -> Optional[Any]:
+        """
+        obtiene el valor cacheado de una clave.
+        
+        args:
+            key: clave completa (ej: "av:quote:AAPL")
+            
+        returns:
+            valor deserializado o None si no existe, expiro o redis fallo
+        """
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(key)
+            except redis.RedisError as e:
+                logger.warning(f"error leyendo cache redis: {e}")
+                return None
+        else:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at <= time.monotonic():
+                del self._memory[key]
+                return None
+        
+        return json.loads(raw) if raw is not None else None
+    
+    async def set_json(self, key: str, value: Any, ttl: int) -> None:
+        """
+        guarda un valor con expiracion.
+        
+        args:
+            key: clave completa
+            value: valor serializable a json
+            ttl: segundos de vida
+        """
+        raw = json.dumps(value)
+        
+        if self._redis is not None:
+            try:
+                await self._redis.set(key, raw, ex=ttl)
+            except redis.RedisError as e:
+                logger.warning(f"error escribiendo cache redis: {e}")
+            return
+        
+        self._memory[key] = (time.monotonic() + ttl, raw)
+    
+    async def close(self) -> None:
+        """cierra las conexiones a redis (si las hay)."""
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+# instancia unica - compartida por todos los clientes de apis externas
+api_cache = ApiCache(settings.REDIS_URL)
@@ -0,0 +1,47 @@
+"""
+cliente http compartido para las apis externas.
+
+un unico httpx.AsyncClient por proceso: las conexiones (tcp + tls) a
+alpha vantage quedan en el pool y se reutilizan entre peticiones, en lugar
+de abrir un cliente nuevo en cada request.
+
+el cliente se crea en el startup de la aplicacion (o en el primer uso) y se
+cierra en el shutdown, ver main.py.
+"""
+from typing import Optional
+
+import httpx
+
+
+TIMEOUT = 10.0  # segundos
+
+# limites del pool: el default de httpx (100 conexiones, 20 keep-alive) se
+# queda corto cuando muchos requests consultan mercado a la vez
+LIMITS = httpx.Limits(
+    max_connections=1000,
+    max_keepalive_connections=100,
+    keepalive_expiry=30.0
+)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    obtiene el cliente http compartido (lo crea si no existe o fue cerrado).
+    
+    returns:
+        httpx.AsyncClient con http2 y el pool configurado
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=TIMEOUT, http2=True, limits=LIMITS)
+    return _client
+
+
+async def close_http_client() -> None:
+    """cierra el cliente compartido y sus conexiones abiertas."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -3,21 +3,175 @@ Cliente para OpenAI API.
 
 Proporciona metodos para generar analisis de mercado usando GPT-5 mini
 a traves de la API de Responses de OpenAI.
+
+El cliente es asincrono (AsyncOpenAI): mientras el modelo genera (5-30s) no
+ocupa un worker del threadpool. Hay un unico AsyncOpenAI por proceso sobre
+el httpx.AsyncClient compartido (ver http_client.py): crear un OpenAIClient
+por request no reconstruye el cliente del SDK ni abre conexiones nuevas.
+
+Las respuestas se cachean por hash del prompt (redis o memoria, ver
+cache.py): refrescar el dashboard con los mismos datos no vuelve a llamar
+al modelo.
 """
+import hashlib
 import logging
-from typing import Optional, Dict, Any, List
-from openai import OpenAI, OpenAIError
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Sequence
+
+import httpx
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAIError,
+    RateLimitError,
+)
+from openai.types.responses import Response
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+from app.clients.cache import api_cache
+from app.clients.http_client import get_http_client
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# El SDK parsea las respuestas con json de la stdlib. No se cambia por orjson:
+# habria que parchear httpx o internals del SDK, y para una respuesta de 5000
+# tokens (~28KB) json tarda ~50us frente a ~27us de orjson, nada al lado de
+# los segundos que tarda el modelo.
+_openai: Optional[AsyncOpenAI] = None
+
+# Timeout propio de las llamadas al modelo: sin el, el SDK hereda los 10s
+# del cliente http compartido, poco para una respuesta de varios segundos.
+# Los reintentos del SDK se desactivan: los hace tenacity (ver
+# OpenAIClient._create_response), con backoff y log de cada intento.
+OPENAI_TIMEOUT = httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=5.0)
+
+# Errores transitorios que vale la pena reintentar (429, 5xx, red/timeout)
+RETRYABLE_ERRORS = (
+    RateLimitError,
+    APITimeoutError,
+    APIConnectionError,
+    InternalServerError,
+)
+MAX_ATTEMPTS = 4
+
+
+def get_openai(api_key: str) -> AsyncOpenAI:
+    """
+    Obtiene el AsyncOpenAI compartido del proceso.
+    
+    Se recrea si cambia la API key o si el cliente http compartido se cerro
+    (shutdown de la aplicacion, ver main.py).
+    
+    Args:
+        api_key: clave de API de OpenAI
+        
+    Returns:
+        cliente AsyncOpenAI sobre el pool http compartido
+    """
+    global _openai
+    if _openai is None or _openai.api_key != api_key or _openai.is_closed():
+        _openai = AsyncOpenAI(
+            api_key=api_key,
+            http_client=get_http_client(),
+            timeout=OPENAI_TIMEOUT,
+            max_retries=0,
+        )
+    return _openai
+
+
+# Mensaje de sistema comun a todos los analisis. Se comparte entre requests
+# (no se copia): no modificarlo.
+SYSTEM_MESSAGE: Dict[str, str] = {
+    "role": "system",
+    "content": (
+        "Eres un analista financiero experto. Tus analisis son "
+        "objetivos, basados en datos tecnicos y siempre incluyen "
+        "disclaimers apropiados. No das consejos de inversion directos."
+    ),
+}
+
+# Plantillas de los prompts: se arman una vez al importar el modulo y cada
+# prompt se construye con format_map + "\n".join, sin concatenar strings.
+# Los footers empiezan con linea vacia: el join agrega el otro salto.
+ASSET_PROMPT_HEADER = """ANALISIS TECNICO: {symbol}
+
+DATOS DE MERCADO:
+- Precio actual: ${latest_price:.2f}
+- Variacion semanal: {price_change:+.2f}%
+
+INDICADORES TECNICOS:"""
+
+ASSET_PROMPT_FOOTER = """
+REQUERIMIENTOS DEL ANALISIS (200 palabras):
+
+1. MOMENTUM Y DIRECCION
+   - Evalua la fuerza direccional basandote en RSI y variacion de precio
+   - Identifica si el momentum es sostenible o muestra senales de agotamiento
+
+2. ESTRUCTURA TECNICA
+   - Interpreta la relacion MACD/Signal y su divergencia
+   - Analiza la coherencia entre indicadores (convergencia/divergencia)
+
+3. NIVELES CRITICOS
+   - Identifica zonas de soporte/resistencia tecnica implicitas
+   - Establece rangos de volatilidad esperada
+
+4. CONTEXTO DE RIESGO
+   - Evalua condiciones de sobrecompra/sobreventa
+   - Describe el perfil riesgo/retorno actual del activo
+
+Utiliza terminologia tecnica profesional: momentum, volatilidad implicita, niveles tecnicos,
+presion compradora/vendedora, consolidacion, breakout potencial, rango operativo."""
+
+PORTFOLIO_PROMPT_HEADER = """ANALISIS DE CARTERA
+
+METRICAS GENERALES:
+- Valor total bajo gestion: ${total_value:,.2f}
+- Performance acumulado: {gain_loss_percent:+.2f}%
+
+COMPOSICION TOP 10 POSICIONES:"""
+
+PORTFOLIO_PROMPT_FOOTER = """
+REQUERIMIENTOS DEL ANALISIS (250 palabras):
+
+1. EVALUACION DE CONCENTRACION
+   - Analiza la distribucion de capital y concentracion en top holdings
+   - Identifica concentracion sectorial o por clase de activo si es evidente
+   - Evalua el impacto de las posiciones principales en el riesgo agregado
+
+2. PERFIL DE RIESGO ESTRUCTURAL
+   - Describe el balance entre posiciones de alta y baja capitalizacion
+   - Identifica exposicion implicita a factores de riesgo (growth/value, sectorial)
+   - Evalua la correlacion esperada entre holdings principales
+
+3. EFICIENCIA DE DIVERSIFICACION
+   - Analiza si el numero de posiciones y su ponderacion optimiza la diversificacion
+   - Identifica posibles redundancias o gaps en la cobertura de sectores
+   - Evalua la relacion riesgo idiosincratico vs. riesgo sistematico
+
+4. INTERPRETACION DE PERFORMANCE
+   - Contextualiza el rendimiento acumulado en terminos de volatilidad esperada
+   - Identifica drivers principales del retorno (concentracion en ganadores/perdedores)
+   - Describe la consistencia del performance y posibles fuentes de alpha/beta
+
+Utiliza terminologia institucional: diversificacion, concentracion de riesgo, beta implicito,
+correlacion de activos, tracking error, drawdown potential, factor exposure, capital allocation efficiency."""
+
 
 class OpenAIClient:
     """
     Cliente para interactuar con OpenAI Responses API.
     
     Utiliza GPT-5 mini para generar analisis financieros de activos y portfolios.
-    Implementacion simple y robusta sin logica de reintentos.
+    Los errores transitorios (rate limit, timeout, 5xx) se reintentan con
+    backoff exponencial antes de dar el analisis por fallido.
     
     Attributes:
         DEFAULT_MODEL: modelo por defecto a utilizar
@@ -27,6 +181,9 @@ class OpenAIClient:
     DEFAULT_MODEL = "gpt-5-mini"
     MAX_COMPLETION_TOKENS = 5000
 
+    # vida del cache de analisis por prompt (segundos)
+    PROMPT_CACHE_TTL = 300
+
     def __init__(self, api_key: Optional[str] = None):
         """
         Inicializa el cliente de OpenAI.
@@ -38,15 +195,15 @@ class OpenAIClient:
 
         if not self.api_key:
             logger.warning("OpenAI API Key no configurada.")
-            self.client: Optional[OpenAI] = None
+            self.client: Optional[AsyncOpenAI] = None
         else:
-            self.client = OpenAI(api_key=self.api_key)
+            self.client = get_openai(self.api_key)
 
     def is_available(self) -> bool:
         """Verifica si el cliente esta disponible para usar."""
         return self.client is not None
 
-    def generate_analysis(
+    async def generate_analysis(
         self,
         prompt: str,
         model: Optional[str] = None,
@@ -70,28 +227,23 @@ class OpenAIClient:
         model = model or self.DEFAULT_MODEL
         max_tokens = max_completion_tokens or self.MAX_COMPLETION_TOKENS
 
+        cache_key = self._prompt_cache_key(prompt, model, max_tokens)
+        cached = await api_cache.get_json(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             logger.info(f"Solicitando analisis a {model}...")
-            response = self.client.responses.create(
-                model=model,
-                input=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "Eres un analista financiero experto. Tus analisis son "
-                            "objetivos, basados en datos tecnicos y siempre incluyen "
-                            "disclaimers apropiados. No das consejos de inversion directos."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    },
-                ],
-                max_output_tokens=max_tokens,
+            response = await self._create_response(
+                self._request_body(prompt, model, max_tokens)
             )
 
-            return self._extract_text_from_response(response)
+            self._log_cached_tokens(response)
+
+            text = self._extract_text_from_response(response)
+            if text:
+                await api_cache.set_json(cache_key, text, ttl=self.PROMPT_CACHE_TTL)
+            return text
 
         except Exception as e:
             logger.error(
@@ -105,15 +257,123 @@ class OpenAIClient:
             )
             return None
 
+    @retry(
+        retry=retry_if_exception_type(RETRYABLE_ERRORS),
+        wait=wait_exponential_jitter(initial=1, max=30),
+        stop=stop_after_attempt(MAX_ATTEMPTS),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
+    async def _create_response(self, body: Dict[str, Any]) -> Response:
+        """
+        Llama a responses.create reintentando los errores transitorios.
+        
+        Tras MAX_ATTEMPTS intentos se relanza el ultimo error.
+        """
+        return await self.client.responses.create(**body)
+
+    async def generate_analysis_stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        max_completion_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Genera analisis emitiendo el texto a medida que llega.
+        
+        Igual que generate_analysis pero con responses.stream: el primer
+        fragmento llega en cientos de ms en lugar de esperar la respuesta
+        completa. Si el prompt esta en cache se emite de una vez, y el texto
+        completo se guarda en cache al terminar.
+        
+        Args:
+            prompt: texto del prompt para el analisis
+            model: modelo a usar, por defecto gpt-5-mini
+            max_completion_tokens: tokens maximos de respuesta, por defecto 5000
+            
+        Yields:
+            fragmentos de texto del analisis
+            
+        Raises:
+            OpenAIError: si falla la peticion a mitad del stream
+        """
+        if not self.is_available():
+            logger.error("Cliente OpenAI no disponible.")
+            return
+
+        model = model or self.DEFAULT_MODEL
+        max_tokens = max_completion_tokens or self.MAX_COMPLETION_TOKENS
+
+        cache_key = self._prompt_cache_key(prompt, model, max_tokens)
+        cached = await api_cache.get_json(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        logger.info(f"Solicitando analisis (stream) a {model}...")
+        parts: List[str] = []
+        async with self.client.responses.stream(
+            **self._request_body(prompt, model, max_tokens)
+        ) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    parts.append(event.delta)
+                    yield event.delta
+
+        text = "".join(parts).strip()
+        if text:
+            await api_cache.set_json(cache_key, text, ttl=self.PROMPT_CACHE_TTL)
+
+    def _prompt_cache_key(self, prompt: str, model: str, max_tokens: int) -> str:
+        """
+        Clave de cache de un prompt.
+        
+        Los prompts se arman con valores ya formateados, asi que los mismos
+        datos producen el mismo prompt y la misma clave.
+        """
+        return "oai:" + hashlib.blake2b(
+            f"{model}|{max_tokens}|{prompt}".encode(), digest_size=16
+        ).hexdigest()
+
+    def _log_cached_tokens(self, response: Response) -> None:
+        """Registra cuantos tokens de entrada sirvio el cache de OpenAI."""
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "input_tokens_details", None)
+        if details is not None:
+            logger.debug(
+                "Tokens de entrada cacheados: %s de %s",
+                details.cached_tokens,
+                usage.input_tokens,
+            )
+
+    def _request_body(self, prompt: str, model: str, max_tokens: int) -> Dict[str, Any]:
+        """
+        Construye el body de Responses API para un prompt.
+        
+        prompt_cache_key agrupa en OpenAI los requests que comparten prefijo
+        (mensaje de sistema + encabezado de la plantilla) para que reutilice
+        el prefijo cacheado. Subir la version al cambiar SYSTEM_MESSAGE.
+        """
+        return {
+            "model": model,
+            "input": [
+                SYSTEM_MESSAGE,
+                {
+                    "role": "user",
+                    "content": prompt,
+                },
+            ],
+            "max_output_tokens": max_tokens,
+            "prompt_cache_key": f"fa-{model}-v1",
+        }
+
     def _extract_text_from_response(self, response: Any) -> Optional[str]:
         """
         Extrae el texto de la respuesta de OpenAI Responses API.
         
-        Intenta multiples estrategias para extraer el contenido:
-        1. Campo output_text directo
-        2. Campo reasoning.summary para modelos con razonamiento
-        3. Recorrido de output[].summary para items de tipo reasoning
-        4. Recorrido de output[].content[].text para items de tipo message
+        Casi siempre el SDK trae output_text (ya es str), asi que se usa
+        directamente; el resto de estrategias solo corre si viene vacio
+        (ver _extract_text_fallback).
         
         Args:
             response: objeto de respuesta de la API
@@ -122,57 +382,13 @@ class OpenAIClient:
             texto extraido o None si no se encuentra contenido
         """
         try:
-            # Estrategia 1: campo output_text directo
             output_text = getattr(response, "output_text", None)
             if output_text:
-                text_str = str(output_text).strip()
+                text_str = output_text.strip()
                 if text_str:
                     return text_str
 
-            # Estrategia 2: campo reasoning.summary a nivel de respuesta
-            reasoning = getattr(response, "reasoning", None)
-            if reasoning:
-                summary = None
-                if isinstance(reasoning, dict):
-                    summary = reasoning.get("summary")
-                else:
-                    summary = getattr(reasoning, "summary", None)
-                
-                if summary and isinstance(summary, str) and summary.strip():
-                    return summary.strip()
-
-            # Estrategia 3 y 4: recorrer items de output
-            parts: List[str] = []
-            output_items = getattr(response, "output", None)
-            
-            if isinstance(output_items, dict):
-                output_items = output_items.get("output")
-
-            if not output_items:
-                logger.error("Respuesta de OpenAI sin campo 'output'.")
-                return None
-
-            for item in output_items:
-                item_type = self._get_item_type(item)
-                
-                # Extraer summary de items de tipo reasoning
-                if item_type == "reasoning":
-                    summary_text = self._extract_summary_from_item(item)
-                    if summary_text:
-                        parts.append(summary_text)
-                    continue
-                
-                # Extraer content de items de tipo message
-                content_text = self._extract_content_from_item(item)
-                if content_text:
-                    parts.append(content_text)
-
-            analysis_text = "\n".join(parts).strip()
-            if analysis_text:
-                return analysis_text
-
-            logger.error("Respuesta de OpenAI sin contenido de texto utilizable.")
-            return None
+            return self._extract_text_fallback(response)
 
         except Exception as parse_exc:
             logger.error(
@@ -181,6 +397,60 @@ class OpenAIClient:
             )
             return None
 
+    def _extract_text_fallback(self, response: Any) -> Optional[str]:
+        """
+        Extrae el texto cuando la respuesta no trae output_text.
+        
+        Estrategias, en orden:
+        1. Campo reasoning.summary para modelos con razonamiento
+        2. Recorrido de output[].summary para items de tipo reasoning
+        3. Recorrido de output[].content[].text para items de tipo message
+        """
+        # Estrategia 1: campo reasoning.summary a nivel de respuesta
+        reasoning = getattr(response, "reasoning", None)
+        if reasoning:
+            summary = None
+            if isinstance(reasoning, dict):
+                summary = reasoning.get("summary")
+            else:
+                summary = getattr(reasoning, "summary", None)
+            
+            if summary and isinstance(summary, str) and summary.strip():
+                return summary.strip()
+
+        # Estrategia 2 y 3: recorrer items de output
+        parts: List[str] = []
+        output_items = getattr(response, "output", None)
+        
+        if isinstance(output_items, dict):
+            output_items = output_items.get("output")
+
+        if not output_items:
+            logger.error("Respuesta de OpenAI sin campo 'output'.")
+            return None
+
+        for item in output_items:
+            item_type = self._get_item_type(item)
+            
+            # Extraer summary de items de tipo reasoning
+            if item_type == "reasoning":
+                summary_text = self._extract_summary_from_item(item)
+                if summary_text:
+                    parts.append(summary_text)
+                continue
+            
+            # Extraer content de items de tipo message
+            content_text = self._extract_content_from_item(item)
+            if content_text:
+                parts.append(content_text)
+
+        analysis_text = "\n".join(parts).strip()
+        if analysis_text:
+            return analysis_text
+
+        logger.error("Respuesta de OpenAI sin contenido de texto utilizable.")
+        return None
+
     def _get_item_type(self, item: Any) -> Optional[str]:
         """Obtiene el tipo de un item de output."""
         if isinstance(item, dict):
@@ -254,44 +524,57 @@ class OpenAIClient:
         - dict con clave segments (lista recursiva)
         - objeto con atributo value
         - lista de fragmentos
+        
+        Recorre la estructura con una pila en lugar de recursion: las hojas
+        no vacias se unen con espacios en el mismo orden en que aparecen.
         """
         if text_obj is None:
             return None
             
         if isinstance(text_obj, str):
             return text_obj
+        
+        parts: List[str] = []
+        stack = [text_obj]
+        while stack:
+            item = stack.pop()
+            if item is None:
+                continue
             
-        if isinstance(text_obj, dict):
-            if "value" in text_obj and text_obj["value"] is not None:
-                return str(text_obj["value"])
+            if isinstance(item, str):
+                if item:
+                    parts.append(item)
+                continue
             
-            if "segments" in text_obj and isinstance(text_obj["segments"], list):
-                seg_parts = []
-                for seg in text_obj["segments"]:
-                    v = self._extract_value(seg)
-                    if v:
-                        seg_parts.append(v)
-                return " ".join(seg_parts) if seg_parts else None
-        
-        if isinstance(text_obj, list):
-            sub_parts = []
-            for frag in text_obj:
-                v = self._extract_value(frag)
-                if v:
-                    sub_parts.append(v)
-            return " ".join(sub_parts) if sub_parts else None
-        
-        value = getattr(text_obj, "value", None)
-        if value is not None:
-            return str(value)
+            if isinstance(item, dict):
+                if item.get("value") is not None:
+                    text = str(item["value"])
+                    if text:
+                        parts.append(text)
+                    continue
+                
+                segments = item.get("segments")
+                if isinstance(segments, list):
+                    # invertidos para sacarlos de la pila en orden
+                    stack.extend(reversed(segments))
+                    continue
+            
+            elif isinstance(item, list):
+                stack.extend(reversed(item))
+                continue
+            
+            value = getattr(item, "value", None)
+            text = str(value) if value is not None else str(item)
+            if text:
+                parts.append(text)
         
-        return str(text_obj)
+        return " ".join(parts) if parts else None
 
-    def generate_asset_analysis(
+    async def generate_asset_analysis(
         self,
         symbol: str,
         indicators: Dict[str, Any],
-        price_history: List[Dict[str, float]],
+        closes: Sequence[float],
     ) -> Optional[str]:
         """
         Genera analisis tecnico de un activo especifico.
@@ -299,7 +582,7 @@ class OpenAIClient:
         Args:
             symbol: simbolo del activo
             indicators: diccionario con indicadores tecnicos calculados
-            price_history: historial de precios del activo
+            closes: precios de cierre (mas reciente primero), lista o ndarray
             
         Returns:
             texto del analisis o None si falla
@@ -307,10 +590,32 @@ class OpenAIClient:
         if not self.is_available():
             return None
 
-        prompt = self._build_asset_prompt(symbol, indicators, price_history)
-        return self.generate_analysis(prompt)
+        latest_close, week_ago_close = self._weekly_closes(closes)
+        prompt = self._build_asset_prompt(symbol, indicators, latest_close, week_ago_close)
+        return await self.generate_analysis(prompt)
 
-    def generate_portfolio_analysis(
+    def stream_asset_analysis(
+        self,
+        symbol: str,
+        indicators: Dict[str, Any],
+        closes: Sequence[float],
+    ) -> AsyncIterator[str]:
+        """
+        Version en streaming de generate_asset_analysis.
+        
+        Args:
+            symbol: simbolo del activo
+            indicators: diccionario con indicadores tecnicos calculados
+            closes: precios de cierre (mas reciente primero), lista o ndarray
+            
+        Returns:
+            iterador asincrono con los fragmentos del analisis
+        """
+        latest_close, week_ago_close = self._weekly_closes(closes)
+        prompt = self._build_asset_prompt(symbol, indicators, latest_close, week_ago_close)
+        return self.generate_analysis_stream(prompt)
+
+    async def generate_portfolio_analysis(
         self,
         portfolio_data: Dict[str, Any],
         positions: List[Dict[str, Any]],
@@ -329,79 +634,76 @@ class OpenAIClient:
             return None
 
         prompt = self._build_portfolio_prompt(portfolio_data, positions)
-        return self.generate_analysis(prompt)
+        return await self.generate_analysis(prompt)
+
+    @staticmethod
+    def _weekly_closes(closes: Sequence[float]) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Obtiene el ultimo cierre y el de hace 5 sesiones.
+        
+        Args:
+            closes: precios de cierre (mas reciente primero)
+            
+        Returns:
+            tupla (ultimo, hace una semana), o (None, None) con menos de 2 cierres
+        """
+        if len(closes) < 2:
+            return None, None
+        return closes[0], closes[min(5, len(closes) - 1)]
 
     def _build_asset_prompt(
         self,
         symbol: str,
         indicators: Dict[str, Any],
-        price_history: List[Dict[str, float]],
+        latest_close: Optional[float],
+        week_ago_close: Optional[float],
     ) -> str:
         """
         Construye el prompt para analisis de activo individual.
         
+        Recibe solo los dos cierres que usa (ver _weekly_closes), no la serie.
+        
         Args:
             symbol: simbolo del activo
             indicators: indicadores tecnicos calculados
-            price_history: historial de precios
+            latest_close: ultimo cierre (None si no hay historia suficiente)
+            week_ago_close: cierre de hace 5 sesiones
             
         Returns:
             prompt formateado para el modelo
         """
-        if len(price_history) >= 2:
-            latest_price = price_history[0]["close"]
-            week_ago_price = price_history[min(5, len(price_history) - 1)]["close"]
+        if latest_close is not None and week_ago_close is not None:
+            latest_price = latest_close
             price_change = (
-                (latest_price - week_ago_price) / week_ago_price
+                (latest_close - week_ago_close) / week_ago_close
             ) * 100
         else:
             latest_price = indicators.get("current_price", 0)
             price_change = 0
 
-        prompt = f"""ANALISIS TECNICO: {symbol}
-
-DATOS DE MERCADO:
-- Precio actual: ${latest_price:.2f}
-- Variacion semanal: {price_change:+.2f}%
-
-INDICADORES TECNICOS:"""
+        lines = [
+            ASSET_PROMPT_HEADER.format_map({
+                "symbol": symbol,
+                "latest_price": latest_price,
+                "price_change": price_change,
+            })
+        ]
 
         if indicators.get("rsi"):
-            prompt += f"\n- RSI(14): {indicators['rsi']:.2f}"
+            lines.append(f"- RSI(14): {indicators['rsi']:.2f}")
 
         if indicators.get("macd"):
             macd = indicators["macd"]
-            prompt += (
-                f"\n- MACD: {macd['macd']:.2f} | Signal: {macd['signal']:.2f} | "
+            lines.append(
+                f"- MACD: {macd['macd']:.2f} | Signal: {macd['signal']:.2f} | "
                 f"Histogram: {macd['macd'] - macd['signal']:.2f}"
             )
 
         if indicators.get("trend"):
-            prompt += f"\n- Tendencia identificada: {indicators['trend']}"
-
-        prompt += """
-
-REQUERIMIENTOS DEL ANALISIS (200 palabras):
-
-1. MOMENTUM Y DIRECCION
-   - Evalua la fuerza direccional basandote en RSI y variacion de precio
-   - Identifica si el momentum es sostenible o muestra senales de agotamiento
-
-2. ESTRUCTURA TECNICA
-   - Interpreta la relacion MACD/Signal y su divergencia
-   - Analiza la coherencia entre indicadores (convergencia/divergencia)
-
-3. NIVELES CRITICOS
-   - Identifica zonas de soporte/resistencia tecnica implicitas
-   - Establece rangos de volatilidad esperada
-
-4. CONTEXTO DE RIESGO
-   - Evalua condiciones de sobrecompra/sobreventa
-   - Describe el perfil riesgo/retorno actual del activo
+            lines.append(f"- Tendencia identificada: {indicators['trend']}")
 
-Utiliza terminologia tecnica profesional: momentum, volatilidad implicita, niveles tecnicos,
-presion compradora/vendedora, consolidacion, breakout potencial, rango operativo."""
-        return prompt
+        lines.append(ASSET_PROMPT_FOOTER)
+        return "\n".join(lines)
 
     def _build_portfolio_prompt(
         self,
@@ -421,46 +723,18 @@ presion compradora/vendedora, consolidacion, breakout potencial, rango operativo
         total_value = portfolio_data.get("total_value", 0)
         gain_loss_percent = portfolio_data.get("gain_loss_percent", 0)
 
-        prompt = f"""ANALISIS DE CARTERA
-
-METRICAS GENERALES:
-- Valor total bajo gestion: ${total_value:,.2f}
-- Performance acumulado: {gain_loss_percent:+.2f}%
-
-COMPOSICION TOP 10 POSICIONES:"""
+        lines = [
+            PORTFOLIO_PROMPT_HEADER.format_map({
+                "total_value": total_value,
+                "gain_loss_percent": gain_loss_percent,
+            })
+        ]
 
         for pos in positions[:10]:
             symbol = pos.get("symbol", "?")
             value = pos.get("value", 0)
             weight = (value / total_value * 100) if total_value > 0 else 0
-            prompt += (
-                f"\n- {symbol}: ${value:,.2f} ({weight:.1f}% del total)"
-            )
-
-        prompt += """
-
-REQUERIMIENTOS DEL ANALISIS (250 palabras):
-
-1. EVALUACION DE CONCENTRACION
-   - Analiza la distribucion de capital y concentracion en top holdings
-   - Identifica concentracion sectorial o por clase de activo si es evidente
-   - Evalua el impacto de las posiciones principales en el riesgo agregado
+            lines.append(f"- {symbol}: ${value:,.2f} ({weight:.1f}% del total)")
 
-2. PERFIL DE RIESGO ESTRUCTURAL
-   - Describe el balance entre posiciones de alta y baja capitalizacion
-   - Identifica exposicion implicita a factores de riesgo (growth/value, sectorial)
-   - Evalua la correlacion esperada entre holdings principales
-
-3. EFICIENCIA DE DIVERSIFICACION
-   - Analiza si el numero de posiciones y su ponderacion optimiza la diversificacion
-   - Identifica posibles redundancias o gaps en la cobertura de sectores
-   - Evalua la relacion riesgo idiosincratico vs. riesgo sistematico
-
-4. INTERPRETACION DE PERFORMANCE
-   - Contextualiza el rendimiento acumulado en terminos de volatilidad esperada
-   - Identifica drivers principales del retorno (concentracion en ganadores/perdedores)
-   - Describe la consistencia del performance y posibles fuentes de alpha/beta
-
-Utiliza terminologia institucional: diversificacion, concentracion de riesgo, beta implicito,
-correlacion de activos, tracking error, drawdown potential, factor exposure, capital allocation efficiency."""
-        return prompt
\ No newline at end of file
+        lines.append(PORTFOLIO_PROMPT_FOOTER)
+        return "\n".join(lines)
\ No newline at end of file
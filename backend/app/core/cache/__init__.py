@@ -0,0 +1,13 @@
+"""Response cache module."""
+from .locks import AsyncKeyedLocks, KeyedLocks, async_keyed_locks, keyed_locks
+from .responses import ResponseCache, cache_response, response_cache
+
+__all__ = [
+    "AsyncKeyedLocks",
+    "KeyedLocks",
+    "ResponseCache",
+    "async_keyed_locks",
+    "cache_response",
+    "keyed_locks",
+    "response_cache",
+]
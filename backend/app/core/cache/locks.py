@@ -0,0 +1,80 @@
+"""
+locks por clave para evitar peticiones duplicadas (single-flight).
+
+cuando llegan varias peticiones concurrentes por el mismo simbolo y el dato
+no esta en cache, solo la primera consulta alpha vantage; las demas esperan
+el lock y al entrar encuentran el cache ya poblado.
+
+los endpoints sync (threadpool) usan KeyedLocks (threading.Lock); los que
+consultan alpha vantage son async y usan AsyncKeyedLocks (asyncio.Lock), que
+no bloquean el event loop mientras esperan. los locks son por proceso: con
+varios workers cada uno hace como mucho una consulta por simbolo.
+
+los registros guardan referencias debiles: un lock vive mientras alguien lo
+tiene tomado o lo espera, y despues desaparece del registro. las claves
+vienen de simbolos arbitrarios en endpoints publicos, asi el registro no
+crece sin limite.
+"""
+import asyncio
+import threading
+import weakref
+
+
+class KeyedLocks:
+    """registro de locks creados bajo demanda, uno por clave."""
+    
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+        self._guard = threading.Lock()
+    
+    def get(self, key: str) -> threading.Lock:
+        """
+        obtiene el lock de una clave (lo crea si no existe).
+        
+        args:
+            key: clave del recurso (ej: "current_price:AAPL")
+            
+        returns:
+            lock asociado a la clave, el mismo para todos los threads
+            mientras alguno conserve la referencia
+        """
+        with self._guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[key] = lock
+            return lock
+
+
+class AsyncKeyedLocks:
+    """
+    version asyncio de KeyedLocks.
+    
+    todas las corrutinas corren en el mismo thread (event loop), asi que
+    el registro no necesita un lock de guarda.
+    """
+    
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+    
+    def get(self, key: str) -> asyncio.Lock:
+        """
+        obtiene el lock de una clave (lo crea si no existe).
+        
+        args:
+            key: clave del recurso (ej: "quote:AAPL")
+            
+        returns:
+            lock asociado a la clave, el mismo para todas las corrutinas
+            mientras alguna conserve la referencia
+        """
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+
+# instancias unicas - compartidas por el cache de respuestas y el servicio de mercado
+keyed_locks = KeyedLocks()
+async_keyed_locks = AsyncKeyedLocks()
@@ -0,0 +1,267 @@
+"""
+cache de respuestas de endpoints.
+
+guarda el json ya serializado de la respuesta con un ttl, asi una peticion
+repetida no toca la base de datos ni alpha vantage.
+
+- si REDIS_URL esta configurada se usa redis (compartido entre workers)
+- si no, o si redis no esta instalado, se usa un dict en memoria del proceso,
+  lru con MEMORY_CACHE_MAXSIZE entradas: las claves vienen de simbolos
+  arbitrarios en endpoints publicos y no pueden crecer sin limite
+
+los endpoints sync usan get/set (redis sync, desde el threadpool); los async
+usan aget/aset (redis.asyncio), que no bloquean el event loop.
+
+el decorador cache_response solo debe usarse en endpoints publicos: la clave
+depende unicamente del simbolo, nunca del usuario. las respuestas por usuario
+(ej: /users/me) usan response_cache directamente con el id en la clave.
+"""
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+from fastapi import Response
+
+from app.core.config import settings
+from .locks import async_keyed_locks, keyed_locks
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# entradas maximas del cache en memoria (las menos usadas salen primero)
+MEMORY_CACHE_MAXSIZE = 1024
+
+
+class ResponseCache:
+    """
+    almacen clave -> json con expiracion.
+    
+    usa redis cuando hay url configurada; si redis falla, la peticion sigue
+    sin cache en lugar de fallar.
+    """
+    
+    def __init__(self, redis_url: str = "", prefix: str = "cache"):
+        self.prefix = prefix
+        self._redis = None
+        self._aredis = None
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        if redis_url and REDIS_AVAILABLE:
+            self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+            self._aredis = aioredis.Redis.from_url(redis_url, decode_responses=True)
+        elif redis_url:
+            logger.warning("REDIS_URL configurada pero redis no esta instalado; usando cache en memoria")
+    
+    @property
+    def backend(self) -> str:
+        """nombre del backend en uso (redis o memory)."""
+        return "redis" if self._redis is not None else "memory"
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        obtiene el valor cacheado de una clave.
+        
+        args:
+            key: clave sin prefijo
+            
+        returns:
+            json cacheado o None si no existe o expiro
+        """
+        key = f"{self.prefix}:{key}"
+        
+        if self._redis is not None:
+            try:
+                return self._redis.get(key)
+            except redis.RedisError as e:
+                logger.warning(f"error leyendo cache redis: {e}")
+                return None
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: str, expire: int) -> None:
+        """
+        guarda un valor con expiracion.
+        
+        args:
+            key: clave sin prefijo
+            value: json a cachear
+            expire: segundos de vida
+        """
+        key = f"{self.prefix}:{key}"
+        
+        if self._redis is not None:
+            try:
+                self._redis.set(key, value, ex=expire)
+            except redis.RedisError as e:
+                logger.warning(f"error escribiendo cache redis: {e}")
+            return
+        
+        with self._lock:
+            self._memory[key] = (time.monotonic() + expire, value)
+            self._memory.move_to_end(key)
+            if len(self._memory) > MEMORY_CACHE_MAXSIZE:
+                self._memory.popitem(last=False)
+    
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        version async de get, para endpoints async.
+        
+        args:
+            key: clave sin prefijo
+            
+        returns:
+            json cacheado o None si no existe o expiro
+        """
+        if self._aredis is None:
+            # el dict en memoria no hace i/o
+            return self.get(key)
+        
+        try:
+            return await self._aredis.get(f"{self.prefix}:{key}")
+        except redis.RedisError as e:
+            logger.warning(f"error leyendo cache redis: {e}")
+            return None
+    
+    async def aset(self, key: str, value: str, expire: int) -> None:
+        """
+        version async de set, para endpoints async.
+        
+        args:
+            key: clave sin prefijo
+            value: json a cachear
+            expire: segundos de vida
+        """
+        if self._aredis is None:
+            self.set(key, value, expire)
+            return
+        
+        try:
+            await self._aredis.set(f"{self.prefix}:{key}", value, ex=expire)
+        except redis.RedisError as e:
+            logger.warning(f"error escribiendo cache redis: {e}")
+    
+    async def close(self) -> None:
+        """cierra las conexiones async a redis (si las hay)."""
+        if self._aredis is not None:
+            await self._aredis.aclose()
+    
+    def delete(self, key: str) -> None:
+        """
+        elimina una clave (invalidacion tras una escritura).
+        
+        args:
+            key: clave sin prefijo
+        """
+        key = f"{self.prefix}:{key}"
+        
+        if self._redis is not None:
+            try:
+                self._redis.delete(key)
+            except redis.RedisError as e:
+                logger.warning(f"error invalidando cache redis: {e}")
+            return
+        
+        with self._lock:
+            self._memory.pop(key, None)
+
+
+# instancia unica - compartida por todos los endpoints cacheados
+response_cache = ResponseCache(settings.REDIS_URL)
+
+
+def cache_response(namespace: str, expire: int, key_param: str = "symbol",
+                   cache_control: Optional[str] = None) -> Callable:
+    """
+    decorador que cachea la respuesta de un endpoint (sync o async).
+    
+    la clave es namespace + el parametro key_param en mayusculas, asi
+    /assets/aapl y /assets/AAPL comparten entrada. el resto de parametros
+    (como la sesion de db) no forman parte de la clave. las excepciones
+    (404, etc.) no se cachean.
+    
+    en un miss solo un thread (o corrutina) por clave ejecuta el endpoint;
+    los demas esperan y reutilizan el resultado que quedo en cache (single-flight).
+    
+    el endpoint debe retornar un modelo pydantic; en un hit se retorna el
+    json cacheado directamente, sin volver a validar.
+    
+    args:
+        namespace: prefijo de la clave (ej: "asset_info")
+        expire: segundos de vida de la entrada
+        key_param: nombre del parametro del endpoint que identifica el recurso
+        cache_control: valor del header Cache-Control para clientes/cdn
+            (ej: "public, max-age=3600"); None para no enviarlo
+        
+    example:
+        @router.get("/assets/{symbol}", response_model=AssetInfo)
+        @cache_response("asset_info", expire=3600)
+        def get_asset_info(symbol: str, db: Session = Depends(get_db)):
+            ...
+    """
+    headers = {"Cache-Control": cache_control} if cache_control else None
+    
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = f"{namespace}:{str(kwargs[key_param]).upper()}"
+                
+                cached = await response_cache.aget(key)
+                if cached is not None:
+                    return Response(content=cached, media_type="application/json", headers=headers)
+                
+                async with async_keyed_locks.get(key):
+                    cached = await response_cache.aget(key)
+                    if cached is not None:
+                        return Response(content=cached, media_type="application/json", headers=headers)
+                    
+                    body = (await func(*args, **kwargs)).model_dump_json()
+                    await response_cache.aset(key, body, expire)
+                
+                return Response(content=body, media_type="application/json", headers=headers)
+            
+            return async_wrapper
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = f"{namespace}:{str(kwargs[key_param]).upper()}"
+            
+            cached = response_cache.get(key)
+            if cached is not None:
+                return Response(content=cached, media_type="application/json", headers=headers)
+            
+            with keyed_locks.get(key):
+                # otro thread pudo poblar el cache mientras esperabamos el lock
+                cached = response_cache.get(key)
+                if cached is not None:
+                    return Response(content=cached, media_type="application/json", headers=headers)
+                
+                body = func(*args, **kwargs).model_dump_json()
+                response_cache.set(key, body, expire)
+            
+            return Response(content=body, media_type="application/json", headers=headers)
+        
+        return wrapper
+    
+    return decorator
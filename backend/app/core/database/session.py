@@ -11,6 +11,15 @@ el patron usado aqui (dependency injection con get_db) es fundamental para:
 1. asegurar que cada request tenga su propia sesion de bd
 2. cerrar automaticamente las sesiones al finalizar el request
 3. facilitar testing mediante mocking de la dependencia
+
+el motor es sincrono a proposito. pasar a create_async_engine + asyncpg
+obligaria a reescribir todos los repositorios (db.query -> await
+db.execute(select(...))), los servicios y los endpoints a la vez, y las
+relaciones lazy dejarian de funcionar fuera de await. en su lugar, los
+endpoints sync corren en el threadpool de anyio, del mismo tamaño que el
+pool de conexiones (settings.threadpool_max_workers, ver main.py), y los
+endpoints async esperan i/o de red (alpha vantage, openai) en el event loop
+y mandan las consultas a bd al mismo threadpool con run_in_threadpool.
 """
 from typing import Generator
 from sqlalchemy import create_engine
@@ -23,7 +32,10 @@ engine = create_engine(
     settings.DATABASE_URL,
     echo=False,  # desactivamos el logging de sql para mantener la salida limpia
     pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING
 )
 
 # fabrica de sesiones: cada vez que llamemos sessionlocal() obtenemos una nueva sesion
@@ -9,10 +9,11 @@ este paquete contiene todas las utilidades de seguridad:
 todos los componentes estan disenados para ser seguros y faciles de usar.
 """
 from app.core.security.password import password_hasher, PasswordHasher
-from app.core.security.jwt import jwt_handler, JWTHandler
+from app.core.security.jwt import get_jwt_handler, JWTHandler
 from app.core.security.tokens import (
     generate_verification_token,
     generate_reset_token,
+    generate_token_pair,
     verify_token_expiration,
     generate_token_with_expiration,
     EMAIL_VERIFICATION_TTL,
@@ -25,12 +26,21 @@ __all__ = [
     "PasswordHasher",
     # JWT
     "jwt_handler",
+    "get_jwt_handler",
     "JWTHandler",
     # Verification tokens
     "generate_verification_token",
     "generate_reset_token",
+    "generate_token_pair",
     "verify_token_expiration",
     "generate_token_with_expiration",
     "EMAIL_VERIFICATION_TTL",
     "PASSWORD_RESET_TTL",
 ]
+
+
+def __getattr__(name: str):
+    """jwt_handler se resuelve al primer acceso (ver get_jwt_handler)."""
+    if name == "jwt_handler":
+        return get_jwt_handler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,13 +10,33 @@ ventajas de jwt:
 - portable: funciona en distributed systems
 - seguro: firmado criptograficamente
 """
-from datetime import datetime, timedelta
-from typing import Dict, Optional
-from jose import JWTError, jwt
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import cache
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+import jwt
+from jwt import InvalidTokenError
 
 from app.core.config import settings
 
 
+# cache de payloads ya verificados por token: cada request autenticado
+# decodifica el mismo token varias veces en poco tiempo, y asi solo la
+# primera paga la verificacion hmac + el parseo. tambien se cachean los
+# tokens invalidos (payload None). una entrada nunca vive mas que el exp
+# del token, asi que un token expirado no se acepta desde el cache.
+# se accede desde el threadpool (dependencies sync), por eso el lock.
+# la clave es un digest blake2b del token: el cache no retiene los tokens
+# (credenciales) y cada entrada ocupa 16 bytes en lugar de ~200
+DECODE_CACHE_MAXSIZE = 10_000
+DECODE_CACHE_TTL = 60  # segundos
+_decode_cache: "OrderedDict[bytes, Tuple[float, Optional[Dict[str, any]]]]" = OrderedDict()
+_decode_cache_lock = threading.Lock()
+
+
 class JWTHandler:
     """
     maneja la creacion y validacion de tokens jwt.
@@ -31,6 +51,11 @@ class JWTHandler:
         self.algorithm = settings.ALGORITHM
         self.access_token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
         self.refresh_token_expire_days = settings.REFRESH_TOKEN_EXPIRE_DAYS
+        
+        # vida de cada tipo de token en segundos, calculada una sola vez: el exp
+        # se codifica como timestamp unix entero (time.time() + vida)
+        self._access_ttl = int(timedelta(minutes=self.access_token_expire_minutes).total_seconds())
+        self._refresh_ttl = int(timedelta(days=self.refresh_token_expire_days).total_seconds())
     
     def create_access_token(self, data: Dict[str, any]) -> str:
         """
@@ -52,9 +77,8 @@ class JWTHandler:
             >>> token = handler.create_access_token({"sub": "user123"})
         """
         to_encode = data.copy()
-        expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
         to_encode.update({
-            "exp": expire,
+            "exp": int(time.time()) + self._access_ttl,
             "type": "access"
         })
         return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
@@ -73,9 +97,8 @@ class JWTHandler:
             str: token jwt codificado
         """
         to_encode = data.copy()
-        expire = datetime.utcnow() + timedelta(days=self.refresh_token_expire_days)
         to_encode.update({
-            "exp": expire,
+            "exp": int(time.time()) + self._refresh_ttl,
             "type": "refresh"
         })
         return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
@@ -89,6 +112,9 @@ class JWTHandler:
         - expiracion
         - formato correcto
         
+        el resultado se cachea hasta DECODE_CACHE_TTL segundos (nunca mas
+        alla del exp del token), ver _decode_cache.
+        
         args:
             token: token jwt a decodificar
             
@@ -101,12 +127,35 @@ class JWTHandler:
             >>> payload = handler.decode_token(token)
             >>> payload["sub"]  # "user123"
         """
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        now = time.monotonic()
+        with _decode_cache_lock:
+            entry = _decode_cache.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    _decode_cache.move_to_end(key)
+                    return payload
+                del _decode_cache[key]
+        
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
-        except JWTError:
+        except InvalidTokenError:
             # token invalido, expirado o firma incorrecta
-            return None
+            payload = None
+        
+        ttl = DECODE_CACHE_TTL
+        if payload is not None and "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        
+        if ttl > 0:
+            with _decode_cache_lock:
+                _decode_cache[key] = (now + ttl, payload)
+                _decode_cache.move_to_end(key)
+                if len(_decode_cache) > DECODE_CACHE_MAXSIZE:
+                    _decode_cache.popitem(last=False)
+        
+        return payload
     
     def verify_token(self, token: str, token_type: str = "access") -> bool:
         """
@@ -145,6 +194,21 @@ class JWTHandler:
         return payload.get("sub")
 
 
-# instancia singleton para usar en toda la aplicacion
-# uso: from app.core.security.jwt import jwt_handler
-jwt_handler = JWTHandler()
+@cache
+def get_jwt_handler() -> JWTHandler:
+    """
+    obtiene la instancia compartida del handler.
+    
+    se crea en el primer uso y no al importar el modulo.
+    
+    returns:
+        JWTHandler compartido por toda la aplicacion
+    """
+    return JWTHandler()
+
+
+def __getattr__(name: str):
+    """mantiene `from app.core.security.jwt import jwt_handler` (creado al primer acceso)."""
+    if name == "jwt_handler":
+        return get_jwt_handler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
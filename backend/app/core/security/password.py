@@ -6,8 +6,32 @@ caracteristicas de bcrypt:
 - salt aleatorio automatico (previene rainbow tables)
 - cost factor ajustable (resistencia a brute force)
 - disenado especificamente para passwords (lento intencionalmente)
+
+se llama directamente al modulo bcrypt, sin la capa de passlib: los hashes
+son los mismos ($2b$, 60 caracteres) y los generados antes con passlib se
+siguen verificando.
 """
-from passlib.context import CryptContext
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+
+# cache de verificaciones correctas: un usuario que repite login en poco
+# tiempo no vuelve a pagar bcrypt. la clave es un hmac (con un secreto
+# aleatorio del proceso) de hash + password, asi el cache no guarda material
+# de la contrasena. solo se cachean aciertos: los intentos fallidos siempre
+# pasan por bcrypt y no pueden desplazar entradas validas. cambiar la
+# contrasena cambia el hash, y con el la clave
+VERIFY_CACHE_MAXSIZE = 4096
+VERIFY_CACHE_TTL = 60  # segundos
 
 
 class PasswordHasher:
@@ -19,21 +43,31 @@ class PasswordHasher:
     - no tan lento como para afectar la experiencia en desarrollo
     
     en produccion enterprise se podria aumentar a 13-14.
+    
+    los metodos *_async ejecutan bcrypt en un pool propio de tantos hilos
+    como cpus: no bloquean el event loop desde endpoints async y limitan
+    los hashes simultaneos a los nucleos disponibles (bcrypt libera el gil).
     """
     
     def __init__(self, cost_factor: int = 12):
         """
-        inicializa el contexto de bcrypt.
+        inicializa el hasher con el cost factor indicado.
         
         args:
             cost_factor: numero de rondas de bcrypt (default 12).
                         cada aumento duplica el tiempo de procesamiento.
         """
-        self.pwd_context = CryptContext(
-            schemes=["bcrypt"],
-            deprecated="auto",
-            bcrypt__rounds=cost_factor
+        self.rounds = cost_factor
+        # los hilos se crean con el primer submit, no al importar
+        self._executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="bcrypt"
         )
+        
+        # cache local del proceso, ver VERIFY_CACHE_TTL
+        self._verify_key = secrets.token_bytes(32)
+        self._verify_cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self._verify_lock = threading.Lock()
     
     def hash_password(self, password: str) -> str:
         """
@@ -54,13 +88,16 @@ class PasswordHasher:
             >>> hash2 = hasher.hash_password("securepass123")
             >>> hash1 != hash2  # true - diferentes salts
         """
-        return self.pwd_context.hash(password)
+        return bcrypt.hashpw(
+            password.encode("utf-8"), bcrypt.gensalt(self.rounds)
+        ).decode("ascii")
     
     def verify_password(self, password: str, password_hash: str) -> bool:
         """
         verifica si una contrasena coincide con un hash.
         
         es resistente a timing attacks gracias a la implementacion de bcrypt.
+        las verificaciones correctas se cachean VERIFY_CACHE_TTL segundos.
         
         args:
             password: contrasena en texto plano a verificar
@@ -75,7 +112,64 @@ class PasswordHasher:
             >>> hasher.verify_password("securepass123", hash_val)  # true
             >>> hasher.verify_password("wrongpassword", hash_val)  # false
         """
-        return self.pwd_context.verify(password, password_hash)
+        password_bytes = password.encode("utf-8")
+        hash_bytes = password_hash.encode("utf-8")
+        key = hmac.new(
+            self._verify_key, hash_bytes + b"\0" + password_bytes, hashlib.sha256
+        ).digest()
+        
+        now = time.monotonic()
+        with self._verify_lock:
+            expires_at = self._verify_cache.get(key)
+            if expires_at is not None:
+                if expires_at > now:
+                    self._verify_cache.move_to_end(key)
+                    return True
+                del self._verify_cache[key]
+        
+        if not bcrypt.checkpw(password_bytes, hash_bytes):
+            return False
+        
+        with self._verify_lock:
+            self._verify_cache[key] = now + VERIFY_CACHE_TTL
+            self._verify_cache.move_to_end(key)
+            if len(self._verify_cache) > VERIFY_CACHE_MAXSIZE:
+                self._verify_cache.popitem(last=False)
+        return True
+    
+    def clear_verify_cache(self) -> None:
+        """vacia el cache de verificaciones (ej: al cerrar todas las sesiones)."""
+        with self._verify_lock:
+            self._verify_cache.clear()
+    
+    async def hash_password_async(self, password: str) -> str:
+        """
+        version async de hash_password: ejecuta bcrypt en el pool del hasher.
+        
+        args:
+            password: contrasena en texto plano
+            
+        returns:
+            str: hash bcrypt (60 caracteres)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.hash_password, password)
+    
+    async def verify_password_async(self, password: str, password_hash: str) -> bool:
+        """
+        version async de verify_password: ejecuta bcrypt en el pool del hasher.
+        
+        args:
+            password: contrasena en texto plano a verificar
+            password_hash: hash bcrypt almacenado
+            
+        returns:
+            bool: true si la contrasena es correcta, false en caso contrario
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.verify_password, password, password_hash
+        )
 
 
 # instancia singleton para usar en toda la aplicacion
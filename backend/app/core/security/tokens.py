@@ -8,10 +8,18 @@ estos tokens son diferentes a jwt:
 - son url-safe para enviar por email
 
 usamos secrets module de python que es criptograficamente seguro.
+
+las expiraciones se manejan como timestamps unix enteros (segundos): la
+comprobacion es una comparacion de enteros, sin crear datetimes ni timedeltas.
 """
+import base64
 import secrets
-from datetime import datetime, timedelta
-from typing import Tuple
+import time
+from datetime import datetime, timezone
+from typing import Tuple, Union
+
+# segundos por hora, para convertir los ttl (en horas) a segundos
+SECONDS_PER_HOUR = 3600
 
 
 def generate_verification_token(length: int = 32) -> str:
@@ -50,29 +58,54 @@ def generate_reset_token(length: int = 32) -> str:
     return secrets.token_urlsafe(length)
 
 
-def verify_token_expiration(created_at: datetime, ttl_hours: int) -> bool:
+def generate_token_pair(length: int = 32) -> Tuple[str, str]:
+    """
+    genera un token de verificacion y uno de reset en una sola llamada.
+    
+    lee los bytes de ambos tokens con una unica llamada a os.urandom (via
+    secrets) en lugar de una por token. cada mitad se codifica por separado,
+    asi cada token tiene el mismo formato y longitud que secrets.token_urlsafe.
+    
+    args:
+        length: numero de bytes de cada token
+        
+    returns:
+        tuple[str, str]: (verification_token, reset_token)
+    """
+    raw = secrets.token_bytes(length * 2)
+    return (
+        base64.urlsafe_b64encode(raw[:length]).rstrip(b"=").decode("ascii"),
+        base64.urlsafe_b64encode(raw[length:]).rstrip(b"=").decode("ascii"),
+    )
+
+
+def verify_token_expiration(created_at: Union[int, float, datetime], ttl_hours: int) -> bool:
     """
     verifica si un token ha expirado.
     
     args:
-        created_at: timestamp de cuando se creo el token
+        created_at: timestamp unix de cuando se creo el token. tambien
+                    acepta un datetime (naive = utc), que se convierte
+                    una vez a timestamp
         ttl_hours: tiempo de vida en horas
         
     returns:
         bool: true si el token aun es valido, false si expiro
         
     example:
-        >>> from datetime import datetime
-        >>> created = datetime.utcnow()
+        >>> import time
+        >>> created = int(time.time())
         >>> verify_token_expiration(created, 24)  # true (recien creado)
-        >>> old_time = datetime.utcnow() - timedelta(hours=25)
-        >>> verify_token_expiration(old_time, 24)  # false (expirado)
+        >>> verify_token_expiration(created - 25 * 3600, 24)  # false (expirado)
     """
-    expiration_time = created_at + timedelta(hours=ttl_hours)
-    return datetime.utcnow() <= expiration_time
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        created_at = created_at.timestamp()
+    return time.time() <= created_at + ttl_hours * SECONDS_PER_HOUR
 
 
-def generate_token_with_expiration(ttl_hours: int = 24, length: int = 32) -> Tuple[str, datetime]:
+def generate_token_with_expiration(ttl_hours: int = 24, length: int = 32) -> Tuple[str, int]:
     """
     genera un token y calcula su tiempo de expiracion.
     
@@ -83,14 +116,15 @@ def generate_token_with_expiration(ttl_hours: int = 24, length: int = 32) -> Tup
         length: longitud del token
         
     returns:
-        tuple[str, datetime]: (token, expiration_datetime)
+        tuple[str, int]: (token, expiracion como timestamp unix)
         
     example:
         >>> token, expires_at = generate_token_with_expiration(24)
         >>> # almacenar en bd: {token: token, expires_at: expires_at}
+        >>> # (columna BigInteger; datetime.fromtimestamp(expires_at, timezone.utc) para mostrarla)
     """
     token = secrets.token_urlsafe(length)
-    expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
+    expires_at = int(time.time()) + ttl_hours * SECONDS_PER_HOUR
     return token, expires_at
 
 
@@ -4,11 +4,14 @@ middleware y dependencias para fastapi.
 este paquete contiene:
 - dependencies.py: dependencias de inyeccion (get_current_user, etc)
 - error_handler.py: manejo centralizado de excepciones
+- http_cache.py: etag y respuestas 304 para GET cacheables
 
 nota: usamos dependencias de fastapi en lugar de middleware tradicional
 porque son mas flexibles y faciles de testear.
 """
 from app.middleware.dependencies import (
+    CommonDeps,
+    get_asset_cache,
     get_current_user,
     get_current_active_user,
     get_optional_user,
@@ -26,9 +29,12 @@ from app.middleware.error_handler import (
     ExternalServiceError,
     register_exception_handlers
 )
+from app.middleware.http_cache import HTTPCacheMiddleware
 
 __all__ = [
     # dependencies
+    "CommonDeps",
+    "get_asset_cache",
     "get_current_user",
     "get_current_active_user",
     "get_optional_user",
@@ -44,4 +50,6 @@ __all__ = [
     "InsufficientFundsError",
     "ExternalServiceError",
     "register_exception_handlers",
+    # middleware
+    "HTTPCacheMiddleware",
 ]
@@ -5,19 +5,27 @@ proporciona:
 - get_db: sesion de base de datos
 - get_current_user: usuario autenticado desde jwt
 - get_current_active_user: usuario autenticado y activo
+- get_asset_cache: cache de activos por simbolo durante el request
+- CommonDeps: sesion de base de datos + usuario activo en un solo parametro
 
 uso en endpoints:
     @router.get("/me")
     def get_profile(current_user: User = Depends(get_current_active_user)):
         return current_user
+    
+    @router.get("/")
+    def list_portfolios(deps: CommonDeps):
+        db, current_user = deps
 """
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from typing import Annotated, Dict, Generator, Tuple
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.core.database.session import SessionLocal
-from app.core.security import jwt_handler
+from app.core.security import get_jwt_handler
+from app.models.asset import Asset
 from app.models.user import User
 from app.repositories.user import UserRepository
 
@@ -44,28 +52,53 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+def get_asset_cache(request: Request) -> Dict[str, Asset]:
+    """
+    dependency que proporciona un cache simbolo -> activo por request.
+    
+    se guarda en request.state para que todos los repositorios del mismo
+    request compartan los activos ya resueltos y no repitan el SELECT.
+    
+    args:
+        request: request actual
+        
+    returns:
+        diccionario simbolo (en mayusculas) -> activo
+    """
+    if not hasattr(request.state, "asset_cache"):
+        request.state.asset_cache = {}
+    return request.state.asset_cache
+
+
+def _resolve_user(
+    credentials: HTTPAuthorizationCredentials,
+    db: Session,
+    require_active: bool
 ) -> User:
     """
-    dependency que extrae y valida el usuario del token jwt.
+    extrae y valida el usuario del token jwt.
     
     flujo:
     1. extrae el token del header authorization
     2. decodifica y valida el jwt
     3. busca el usuario en la bd
-    4. verifica que el usuario existe
+    4. verifica que el usuario existe (y que esta activo si require_active)
+    
+    get_current_user y get_current_active_user la llaman directamente, asi
+    fastapi resuelve una sola dependency por request en lugar de la cadena
+    get_current_active_user -> get_current_user.
     
     args:
         credentials: token bearer del header
         db: sesion de base de datos
+        require_active: si es true, un usuario desactivado da 403
         
     returns:
         usuario autenticado
         
     raises:
         HTTPException 401: si el token es invalido o el usuario no existe
+        HTTPException 403: si require_active y el usuario esta desactivado
     """
     # definir excepcion una vez para reusar
     credentials_exception = HTTPException(
@@ -78,7 +111,7 @@ def get_current_user(
     token = credentials.credentials
     
     # decodificar jwt
-    payload = jwt_handler.decode_token(token)
+    payload = get_jwt_handler().decode_token(token)
     if payload is None:
         raise credentials_exception
     
@@ -94,7 +127,6 @@ def get_current_user(
     # buscar usuario
     user_repo = UserRepository(db)
     try:
-        from uuid import UUID
         user_id = UUID(user_id_str)
         user = user_repo.get_by_id(user_id)
     except (ValueError, TypeError):
@@ -103,33 +135,81 @@ def get_current_user(
     if user is None:
         raise credentials_exception
     
+    if require_active and not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="usuario desactivado"
+        )
+    
     return user
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    dependency que extrae y valida el usuario del token jwt.
+    
+    args:
+        credentials: token bearer del header
+        db: sesion de base de datos
+        
+    returns:
+        usuario autenticado
+        
+    raises:
+        HTTPException 401: si el token es invalido o el usuario no existe
+    """
+    return _resolve_user(credentials, db, require_active=False)
+
+
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
 ) -> User:
     """
     dependency que verifica que el usuario esta activo.
     
-    extiende get_current_user agregando validacion de is_active.
+    igual que get_current_user agregando validacion de is_active.
     usar esta dependency en endpoints que requieren usuario activo.
     
     args:
-        current_user: usuario del token
+        credentials: token bearer del header
+        db: sesion de base de datos
         
     returns:
         usuario activo
         
     raises:
+        HTTPException 401: si el token es invalido o el usuario no existe
         HTTPException 403: si el usuario esta desactivado
     """
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="usuario desactivado"
-        )
-    return current_user
+    return _resolve_user(credentials, db, require_active=True)
+
+
+async def get_db_and_user(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Tuple[Session, User]:
+    """
+    dependency que agrupa la sesion y el usuario autenticado y activo.
+    
+    es async porque solo arma la tupla (no hace i/o), asi fastapi la
+    resuelve en el event loop sin pasar por el threadpool.
+    
+    args:
+        db: sesion de base de datos
+        current_user: usuario autenticado y activo
+        
+    returns:
+        tupla (db, current_user)
+    """
+    return db, current_user
+
+
+# parametro unico para los endpoints autenticados que usan bd
+CommonDeps = Annotated[Tuple[Session, User], Depends(get_db_and_user)]
 
 
 def get_optional_user(
@@ -154,7 +234,7 @@ def get_optional_user(
     
     try:
         token = credentials.credentials
-        payload = jwt_handler.decode_token(token)
+        payload = get_jwt_handler().decode_token(token)
         
         if payload is None or payload.get("type") != "access":
             return None
@@ -163,7 +243,6 @@ def get_optional_user(
         if not user_id_str:
             return None
         
-        from uuid import UUID
         user_repo = UserRepository(db)
         user = user_repo.get_by_id(UUID(user_id_str))
         
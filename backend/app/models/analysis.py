@@ -17,13 +17,17 @@ import enum
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum, Text, JSON, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Boolean, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
 
+# disclaimer legal estandar para analisis financieros: es el que devuelve la
+# api (AnalysisResponse.disclaimer) y el de Analysis.get_disclaimer
+DISCLAIMER = "Este análisis es generado por IA y no constituye asesoramiento financiero."
+
 class AnalysisType(str, enum.Enum):
     """
     tipo de analisis solicitado.
@@ -72,8 +76,13 @@ class Analysis(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
-    # tipo de analisis
-    analysis_type = Column(SQLEnum(AnalysisType), nullable=False, index=True)
+    # tipo de analisis: varchar + check en lugar de un tipo enum de postgres
+    # (agregar un valor no requiere ALTER TYPE); en python sigue siendo AnalysisType
+    analysis_type = Column(
+        SQLEnum(AnalysisType, native_enum=False, create_constraint=True, length=16, name="ck_analyses_type"),
+        nullable=False,
+        index=True
+    )
     
     # referencias (solo una debe estar presente segun el tipo)
     portfolio_id = Column(UUID(as_uuid=True), ForeignKey("portfolios.id", ondelete="CASCADE"), nullable=True, index=True)
@@ -84,8 +93,9 @@ class Analysis(Base):
     analysis_text = Column(Text, nullable=False)
     
     # indicadores tecnicos calculados (rsi, sma, volatilidad, etc)
-    # almacenamos como json para flexibilidad
-    technical_indicators = Column(JSON, default=dict, nullable=False)
+    # almacenamos como jsonb para flexibilidad: formato binario, postgres no
+    # vuelve a parsear el texto en cada lectura
+    technical_indicators = Column(JSONB, default=dict, nullable=False)
     
     # control de cache
     generated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -98,6 +108,20 @@ class Analysis(Base):
     # relacion con Portfolio (si aplica)
     portfolio = relationship("Portfolio")
     
+    # indices parciales para la busqueda de cache (get_cached_analysis): cada
+    # tipo filtra por su referencia y por expires_at, asi la consulta es un
+    # solo recorrido del indice sin combinar los indices de una columna
+    __table_args__ = (
+        Index(
+            'idx_analyses_asset_lookup', asset_symbol, expires_at,
+            postgresql_where=text("analysis_type = 'ASSET'")
+        ),
+        Index(
+            'idx_analyses_portfolio_lookup', portfolio_id, expires_at,
+            postgresql_where=text("analysis_type = 'PORTFOLIO'")
+        ),
+    )
+    
     def is_expired(self) -> bool:
         """
         verifica si el analisis ha expirado.
@@ -110,6 +134,23 @@ class Analysis(Base):
         """
         return datetime.utcnow() > self.expires_at
     
+    @classmethod
+    def filter_valid(cls, analyses: list["Analysis"]) -> list["Analysis"]:
+        """
+        filtra los analisis que aun no expiraron.
+        
+        equivale a llamar is_expired en cada uno, pero toma la hora actual
+        una sola vez para todo el lote.
+        
+        args:
+            analyses: analisis a filtrar
+            
+        returns:
+            lista con los analisis vigentes, en el mismo orden
+        """
+        now = datetime.utcnow()
+        return [analysis for analysis in analyses if analysis.expires_at >= now]
+    
     @staticmethod
     def get_disclaimer() -> str:
         """
@@ -121,14 +162,7 @@ class Analysis(Base):
         returns:
             str: texto del disclaimer
         """
-        return (
-            "DISCLAIMER: Este analisis es generado por inteligencia artificial "
-            "con fines informativos unicamente. No constituye asesoria financiera, "
-            "de inversion o recomendacion de compra/venta. Las inversiones implican "
-            "riesgos y el rendimiento pasado no garantiza resultados futuros. "
-            "Consulte con un asesor financiero certificado antes de tomar decisiones "
-            "de inversion."
-        )
+        return DISCLAIMER
     
     def __repr__(self) -> str:
         return f"<Analysis(type={self.analysis_type}, generated_at='{self.generated_at}')>"
@@ -161,13 +195,21 @@ class AnalysisRequest(Base):
     # usuario que solicito
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
-    # que se solicito
-    analysis_type = Column(SQLEnum(AnalysisType), nullable=False)
+    # que se solicito (varchar + check, igual que Analysis.analysis_type)
+    analysis_type = Column(
+        SQLEnum(AnalysisType, native_enum=False, create_constraint=True, length=16, name="ck_analysis_requests_type"),
+        nullable=False
+    )
     portfolio_id = Column(UUID(as_uuid=True), ForeignKey("portfolios.id", ondelete="CASCADE"), nullable=True)
     asset_symbol = Column(String(20), nullable=True)
     
     # estado del request
-    status = Column(SQLEnum(AnalysisStatus), default=AnalysisStatus.PENDING, nullable=False, index=True)
+    status = Column(
+        SQLEnum(AnalysisStatus, native_enum=False, create_constraint=True, length=16, name="ck_analysis_requests_status"),
+        default=AnalysisStatus.PENDING,
+        nullable=False,
+        index=True
+    )
     
     # si fallo, el mensaje de error
     error_message = Column(Text, nullable=True)
@@ -39,6 +39,22 @@ class AssetType(str, enum.Enum):
     CRYPTO = "CRYPTO"
 
 
+def norm_symbol(symbol: str) -> str:
+    """
+    normaliza un simbolo a mayusculas.
+    
+    los simbolos casi siempre llegan ya en mayusculas (el frontend los
+    envia asi), en ese caso se retorna el mismo string sin crear uno nuevo.
+    
+    args:
+        symbol: simbolo del activo (ej: "aapl", "AAPL")
+        
+    returns:
+        simbolo en mayusculas
+    """
+    return symbol if symbol.isascii() and symbol.isupper() else symbol.upper()
+
+
 class Asset(Base):
     """
     catalogo de activos financieros disponibles.
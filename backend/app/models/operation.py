@@ -15,7 +15,7 @@ import enum
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum as SQLEnum, Text, CheckConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum as SQLEnum, Text, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -99,10 +99,13 @@ class Operation(Base):
     portfolio = relationship("Portfolio", back_populates="operations")
     
     # constraints: valores deben ser positivos (validacion a nivel de bd)
+    # indice compuesto: el listado filtra por portfolio (y opcionalmente simbolo) y
+    # ordena por fecha descendente, asi las filas salen del indice ya ordenadas
     __table_args__ = (
         CheckConstraint('quantity > 0', name='check_quantity_positive'),
         CheckConstraint('price > 0', name='check_price_positive'),
         CheckConstraint('fees >= 0', name='check_fees_non_negative'),
+        Index('idx_ops_portfolio_date_symbol', portfolio_id, operation_date.desc(), asset_symbol),
     )
     
     def calculate_total(self) -> Decimal:
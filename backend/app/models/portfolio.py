@@ -13,7 +13,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Text, UniqueConstraint
+from sqlalchemy import Column, Computed, String, DateTime, ForeignKey, Numeric, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -125,6 +125,9 @@ class PortfolioAsset(Base):
         quantity: cantidad de unidades del activo
         average_price: precio promedio de adquisicion
         current_price: ultimo precio conocido del mercado
+        position_value: valor de la posicion (columna generada)
+        gain_loss: ganancia/perdida de la posicion (columna generada)
+        gain_loss_percent: porcentaje de ganancia/perdida (columna generada)
     """
     __tablename__ = "portfolio_assets"
     
@@ -143,6 +146,16 @@ class PortfolioAsset(Base):
     average_price = Column(Numeric(15, 2), nullable=False)  # precio promedio de compra
     current_price = Column(Numeric(15, 2), default=0, nullable=False)  # precio actual de mercado
     
+    # metricas derivadas: columnas generadas (STORED) que postgres recalcula al
+    # escribir quantity/average_price/current_price, asi las lecturas no calculan nada
+    position_value = Column(Numeric(20, 2), Computed("quantity * current_price", persisted=True))
+    gain_loss = Column(Numeric(20, 2), Computed("quantity * (current_price - average_price)", persisted=True))
+    gain_loss_percent = Column(Numeric(12, 4), Computed(
+        "CASE WHEN average_price > 0 "
+        "THEN (current_price - average_price) / average_price * 100 ELSE 0 END",
+        persisted=True
+    ))
+    
     # timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
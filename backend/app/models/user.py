@@ -16,14 +16,9 @@ from typing import Optional
 from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from passlib.context import CryptContext
 
 from app.core.database import Base
-
-
-# contexto para hashing de passwords con bcrypt
-# rounds=12 es un buen balance entre seguridad y performance
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.security.password import password_hasher
 
 
 class User(Base):
@@ -66,6 +61,8 @@ class User(Base):
     
     # relaciones
     # one-to-one: cada usuario tiene un perfil
+    # carga lazy por defecto (la mayoria de endpoints no lo usan); /users/me lo
+    # trae en la misma query con UserRepository.get_with_profile (joinedload)
     profile = relationship("UserProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
     
     # one-to-many: un usuario puede tener multiples sesiones activas
@@ -86,7 +83,7 @@ class User(Base):
         returns:
             true si la password es correcta, false en caso contrario
         """
-        return pwd_context.verify(password, self.password_hash)
+        return password_hasher.verify_password(password, self.password_hash)
     
     def __repr__(self) -> str:
         return f"<User(email='{self.email}', active={self.is_active})>"
@@ -1,26 +1,86 @@
 """
 repositorio para gestion de activos y precios.
 """
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.repositories.base import BaseRepository
-from app.models.asset import Asset, AssetPrice, AssetType
+from app.models.asset import Asset, AssetPrice, AssetType, norm_symbol
 
 
 class AssetRepository(BaseRepository[Asset]):
     """repositorio para activos financieros."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, symbol_cache: Optional[Dict[str, Asset]] = None):
+        """
+        inicializa el repositorio.
+        
+        args:
+            db: sesion de sqlalchemy
+            symbol_cache: cache simbolo -> activo compartido durante el request
+                (ver get_asset_cache); si es none cada repositorio usa el suyo
+        """
         super().__init__(Asset, db)
+        self.symbol_cache = symbol_cache if symbol_cache is not None else {}
     
     def get_by_symbol(self, symbol: str) -> Optional[Asset]:
-        """obtiene activo por simbolo."""
-        return self.db.query(Asset).filter(
-            Asset.symbol == symbol.upper()
-        ).first()
+        """obtiene activo por simbolo (consulta la bd solo la primera vez)."""
+        symbol = norm_symbol(symbol)
+        asset = self.symbol_cache.get(symbol)
+        if asset is None:
+            asset = self.db.query(Asset).filter(Asset.symbol == symbol).first()
+            if asset:
+                self.symbol_cache[symbol] = asset
+        return asset
+    
+    def get_many_by_symbols(self, symbols: Iterable[str]) -> Dict[str, Asset]:
+        """
+        obtiene varios activos por simbolo en una sola consulta.
+        
+        solo se consultan los simbolos que no estan en cache (WHERE symbol IN ...).
+        
+        args:
+            symbols: simbolos a resolver
+            
+        returns:
+            diccionario simbolo -> activo (los simbolos inexistentes no aparecen)
+        """
+        wanted = {norm_symbol(symbol) for symbol in symbols}
+        missing = [symbol for symbol in wanted if symbol not in self.symbol_cache]
+        
+        if missing:
+            for asset in self.db.query(Asset).filter(Asset.symbol.in_(missing)):
+                self.symbol_cache[asset.symbol] = asset
+        
+        return {symbol: self.symbol_cache[symbol] for symbol in wanted if symbol in self.symbol_cache}
+    
+    def insert_returning(self, **values) -> Asset:
+        """
+        inserta un activo en un solo round-trip (INSERT ... RETURNING).
+        
+        a diferencia de create (add + commit + refresh), la fila insertada
+        vuelve en la misma sentencia. el activo se desasocia de la sesion
+        antes del commit para que no se expire y no haga falta recargarlo.
+        
+        args:
+            **values: columnas del activo (symbol, name, asset_type, ...)
+            
+        returns:
+            activo insertado (desasociado de la sesion)
+        """
+        try:
+            asset = self.db.execute(
+                insert(Asset).values(**values).returning(Asset)
+            ).scalar_one()
+            self.db.expunge(asset)
+            self.db.commit()
+            return asset
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise e
     
     def search_assets(self, query: str, limit: int = 20) -> List[Asset]:
         """
@@ -61,7 +121,7 @@ class AssetRepository(BaseRepository[Asset]):
             return asset
         
         asset = Asset(
-            symbol=symbol.upper(),
+            symbol=norm_symbol(symbol),
             name=name,
             asset_type=asset_type,
             currency=currency
@@ -69,6 +129,7 @@ class AssetRepository(BaseRepository[Asset]):
         self.db.add(asset)
         self.db.commit()
         self.db.refresh(asset)
+        self.symbol_cache[asset.symbol] = asset
         return asset
     
     def add_price(self, asset_symbol: str, timestamp: datetime, 
@@ -86,7 +147,7 @@ class AssetRepository(BaseRepository[Asset]):
         
         # buscar si ya existe
         existing = self.db.query(AssetPrice).filter(
-            AssetPrice.asset_symbol == asset_symbol.upper(),
+            AssetPrice.asset_symbol == norm_symbol(asset_symbol),
             AssetPrice.timestamp == timestamp_normalized
         ).first()
         
@@ -103,7 +164,7 @@ class AssetRepository(BaseRepository[Asset]):
         
         # crear nuevo registro
         price = AssetPrice(
-            asset_symbol=asset_symbol.upper(),
+            asset_symbol=norm_symbol(asset_symbol),
             timestamp=timestamp_normalized,
             open_price=open_price,
             high_price=high_price,
@@ -129,6 +190,6 @@ class AssetRepository(BaseRepository[Asset]):
         """
         date_from = datetime.utcnow() - timedelta(days=days)
         return self.db.query(AssetPrice).filter(
-            AssetPrice.asset_symbol == symbol.upper(),
+            AssetPrice.asset_symbol == norm_symbol(symbol),
             AssetPrice.timestamp >= date_from
         ).order_by(AssetPrice.timestamp.asc()).all()
@@ -77,13 +77,16 @@ class BaseRepository(Generic[ModelType]):
         """
         obtiene una entidad por su id.
         
+        usa session.get: si la entidad ya esta cargada en la sesion (identity
+        map) se retorna sin volver a consultar la bd.
+        
         args:
             id: uuid de la entidad
             
         returns:
             la entidad si existe, none en caso contrario
         """
-        return self.db.query(self.model).filter(self.model.id == id).first()
+        return self.db.get(self.model, id)
     
     def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
         """
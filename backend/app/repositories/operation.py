@@ -1,21 +1,46 @@
 """
 repositorio para gestion de operaciones financieras.
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime, date
+from sqlalchemy import func
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.repositories.base import BaseRepository
 from app.models.operation import Operation, OperationType
+from app.models.portfolio import Portfolio
 
 
 class OperationRepository(BaseRepository[Operation]):
     """repositorio para operaciones de compra/venta."""
     
+    # columnas de OperationResponse, en el mismo orden
+    RESPONSE_COLUMNS = (
+        Operation.id,
+        Operation.portfolio_id,
+        Operation.asset_symbol,
+        Operation.operation_type,
+        Operation.quantity,
+        Operation.price,
+        Operation.fees,
+        Operation.total_amount,
+        Operation.operation_date,
+        Operation.notes,
+        Operation.created_at,
+        Operation.updated_at,
+    )
+    
     def __init__(self, db: Session):
         super().__init__(Operation, db)
     
+    def get_with_owner(self, operation_id: UUID) -> Optional[Tuple[Operation, UUID]]:
+        """obtiene una operacion junto al user_id de su portfolio (una sola consulta con join)."""
+        return self.db.query(Operation, Portfolio.user_id).join(
+            Portfolio, Operation.portfolio_id == Portfolio.id
+        ).filter(Operation.id == operation_id).first()
+    
     def get_by_portfolio(self, portfolio_id: UUID, skip: int = 0, limit: int = 100) -> List[Operation]:
         """obtiene operaciones de un portfolio."""
         return self.db.query(Operation).filter(
@@ -56,12 +81,50 @@ class OperationRepository(BaseRepository[Operation]):
                           operation_type: Optional[OperationType] = None,
                           date_from: Optional[date] = None,
                           date_to: Optional[date] = None,
-                          skip: int = 0, limit: int = 100) -> List[Operation]:
-        """filtra operaciones por multiples criterios."""
-        query = self.db.query(Operation).filter(
-            Operation.portfolio_id == portfolio_id
+                          skip: int = 0, limit: int = 100,
+                          user_id: Optional[UUID] = None) -> List[Operation]:
+        """
+        filtra operaciones por multiples criterios.
+        
+        si se pasa user_id, la consulta hace join con portfolios y solo
+        retorna operaciones de un portfolio de ese usuario.
+        """
+        query = self._apply_filters(
+            self.db.query(Operation), portfolio_id, asset_symbol,
+            operation_type, date_from, date_to, user_id
         )
+        return query.offset(skip).limit(limit).all()
+    
+    def filter_operation_rows(self, portfolio_id: UUID,
+                              asset_symbol: Optional[str] = None,
+                              operation_type: Optional[OperationType] = None,
+                              date_from: Optional[date] = None,
+                              date_to: Optional[date] = None,
+                              skip: int = 0, limit: int = 100,
+                              user_id: Optional[UUID] = None) -> List[Dict[str, Any]]:
+        """
+        igual que filter_operations pero selecciona solo las columnas de la
+        respuesta y retorna dicts, sin materializar objetos orm.
+        """
+        query = self._apply_filters(
+            self.db.query(*self.RESPONSE_COLUMNS), portfolio_id, asset_symbol,
+            operation_type, date_from, date_to, user_id
+        )
+        return [row._asdict() for row in query.offset(skip).limit(limit)]
+    
+    def _apply_filters(self, query, portfolio_id: UUID,
+                       asset_symbol: Optional[str],
+                       operation_type: Optional[OperationType],
+                       date_from: Optional[date],
+                       date_to: Optional[date],
+                       user_id: Optional[UUID]):
+        """aplica los filtros y el orden (fecha descendente) de filter_operations."""
+        query = query.filter(Operation.portfolio_id == portfolio_id)
         
+        if user_id:
+            query = query.join(Portfolio, Operation.portfolio_id == Portfolio.id).filter(
+                Portfolio.user_id == user_id
+            )
         if asset_symbol:
             query = query.filter(Operation.asset_symbol == asset_symbol.upper())
         if operation_type:
@@ -71,7 +134,27 @@ class OperationRepository(BaseRepository[Operation]):
         if date_to:
             query = query.filter(Operation.operation_date <= datetime.combine(date_to, datetime.max.time()))
         
-        return query.order_by(Operation.operation_date.desc()).offset(skip).limit(limit).all()
+        return query.order_by(Operation.operation_date.desc())
+    
+    def get_statistics(self, portfolio_id: UUID) -> Row:
+        """
+        calcula los agregados de operaciones de un portfolio en una sola consulta.
+        
+        usa FILTER (WHERE ...) para separar compras y ventas dentro del mismo
+        recorrido; las sumas vacias se normalizan a 0 con coalesce.
+        """
+        is_buy = Operation.operation_type == OperationType.BUY
+        is_sell = Operation.operation_type == OperationType.SELL
+        
+        return self.db.query(
+            func.count().label("total_operations"),
+            func.count().filter(is_buy).label("total_buys"),
+            func.count().filter(is_sell).label("total_sells"),
+            func.coalesce(func.sum(Operation.total_amount).filter(is_buy), 0).label("total_invested"),
+            func.coalesce(func.sum(Operation.total_amount).filter(is_sell), 0).label("total_withdrawn"),
+            func.coalesce(func.sum(Operation.fees), 0).label("total_fees"),
+            func.count(Operation.asset_symbol.distinct()).label("unique_assets")
+        ).filter(Operation.portfolio_id == portfolio_id).one()
     
     def count_by_portfolio(self, portfolio_id: UUID) -> int:
         """cuenta operaciones de un portfolio."""
@@ -6,7 +6,8 @@ maneja operaciones relacionadas con carteras de inversion y sus activos.
 from typing import List, Optional
 from uuid import UUID
 from decimal import Decimal
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, selectinload
 
 from app.repositories.base import BaseRepository
 from app.models.portfolio import Portfolio, PortfolioAsset
@@ -38,6 +39,9 @@ class PortfolioRepository(BaseRepository[Portfolio]):
         """
         obtiene portfolio con todas sus posiciones cargadas (eager loading).
         
+        usa selectinload: una consulta para el portfolio y otra (IN) para
+        todas sus posiciones, sin repetir las columnas del portfolio por fila.
+        
         args:
             portfolio_id: id del portfolio
             
@@ -45,9 +49,36 @@ class PortfolioRepository(BaseRepository[Portfolio]):
             portfolio con posiciones cargadas
         """
         return self.db.query(Portfolio).options(
-            joinedload(Portfolio.assets)
+            selectinload(Portfolio.assets)
         ).filter(Portfolio.id == portfolio_id).first()
     
+    def get_positions_with_metrics(self, portfolio_id: UUID) -> List[Row]:
+        """
+        obtiene las posiciones de un portfolio con sus metricas calculadas.
+        
+        el valor, la ganancia y el porcentaje son columnas generadas de
+        portfolio_assets (se calculan al escribir), asi que la consulta solo
+        las lee. se retornan filas planas, sin materializar objetos orm.
+        
+        args:
+            portfolio_id: id del portfolio
+            
+        returns:
+            filas con id, asset_symbol, quantity, average_price, current_price,
+            updated_at, position_value, gain_loss y gain_loss_percent
+        """
+        return self.db.query(
+            PortfolioAsset.id,
+            PortfolioAsset.asset_symbol,
+            PortfolioAsset.quantity,
+            PortfolioAsset.average_price,
+            PortfolioAsset.current_price,
+            PortfolioAsset.updated_at,
+            PortfolioAsset.position_value,
+            PortfolioAsset.gain_loss,
+            PortfolioAsset.gain_loss_percent
+        ).filter(PortfolioAsset.portfolio_id == portfolio_id).all()
+    
     def get_by_user_and_name(self, user_id: UUID, name: str) -> Optional[Portfolio]:
         """
         busca portfolio por usuario y nombre.
@@ -9,7 +9,7 @@ extiende baserepository con metodos especificos del dominio de usuarios:
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, raiseload
 
 from app.repositories.base import BaseRepository
 from app.models.user import User, UserProfile, UserSession
@@ -38,21 +38,29 @@ class UserRepository(BaseRepository[User]):
             User.email.ilike(email)  # ilike = case-insensitive
         ).first()
     
-    def get_with_profile(self, user_id: UUID) -> Optional[User]:
+    def get_with_profile(self, user_id: UUID, raise_on_lazy: bool = False) -> Optional[User]:
         """
         obtiene usuario con su perfil cargado (eager loading).
         
         evita el problema n+1 al cargar el perfil en la misma query.
+        se usa joinedload y no selectinload: la relacion es one-to-one
+        (user_profiles.user_id es unique), asi que el LEFT JOIN trae una
+        sola fila y selectinload solo agregaria un segundo SELECT.
         
         args:
             user_id: id del usuario
+            raise_on_lazy: si es true, cualquier otra relacion del usuario
+                lanza error al accederse en lugar de hacer lazy load
+                (detecta consultas n+1 nuevas en los tests)
             
         returns:
             usuario con perfil cargado
         """
-        return self.db.query(User).options(
-            joinedload(User.profile)
-        ).filter(User.id == user_id).first()
+        options = [joinedload(User.profile)]
+        if raise_on_lazy:
+            options.append(raiseload("*"))
+        
+        return self.db.query(User).options(*options).filter(User.id == user_id).first()
     
     def create_with_profile(self, user: User, profile_data: dict) -> User:
         """
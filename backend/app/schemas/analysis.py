@@ -10,7 +10,7 @@ from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
 from pydantic import BaseModel, Field, model_validator
-from app.models.analysis import AnalysisType, AnalysisStatus
+from app.models.analysis import DISCLAIMER, AnalysisType, AnalysisStatus
 
 
 class TechnicalIndicators(BaseModel):
@@ -84,7 +84,8 @@ class AnalysisResponse(BaseModel):
     response con analisis generado por ia.
     
     incluye el texto del analisis, indicadores tecnicos y disclaimer legal.
-    el disclaimer siempre se incluye para proteccion legal.
+    el disclaimer siempre se incluye para proteccion legal. tiene valor por
+    defecto para poder validar directamente desde el modelo orm.
     """
     id: UUID
     analysis_type: AnalysisType
@@ -94,7 +95,7 @@ class AnalysisResponse(BaseModel):
     technical_indicators: TechnicalIndicators
     generated_at: datetime
     expires_at: datetime
-    disclaimer: str  # disclaimer legal siempre incluido
+    disclaimer: str = DISCLAIMER  # disclaimer legal siempre incluido
     
     model_config = {
         "from_attributes": True,
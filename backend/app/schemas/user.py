@@ -2,11 +2,14 @@
 modelos pydantic para usuarios.
 nunca exponemos password_hash en las responses.
 """
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
+if TYPE_CHECKING:
+    from app.models.user import User
+
 
 class UserProfileData(BaseModel):
     """datos del perfil del usuario (preferencias, config, etc)"""
@@ -102,6 +105,40 @@ class UserProfileResponse(BaseModel):
             }
         }
     }
+    
+    @classmethod
+    def from_orm_user(cls, user: "User") -> "UserProfileResponse":
+        """
+        construye la respuesta desde el usuario orm y su perfil.
+        
+        los datos vienen de la bd (ya validados al guardarse), asi que se usa
+        model_construct sin validacion por campo. si el usuario no tiene
+        perfil se usan los valores por defecto de UserProfileData.
+        
+        args:
+            user: usuario con el perfil cargado
+            
+        returns:
+            UserProfileResponse del usuario
+        """
+        p = user.profile
+        profile = UserProfileData.model_construct(
+            currency=p.currency if p else "USD",
+            timezone=p.timezone if p else "UTC",
+            language=p.language if p else "en",
+            preferences=(p.preferences if p else None) or {}
+        )
+        
+        return cls.model_construct(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            profile=profile
+        )
 
 
 class UserUpdate(BaseModel):
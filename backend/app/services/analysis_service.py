@@ -3,19 +3,27 @@ servicio de analisis con inteligencia artificial.
 
 coordina la generacion de analisis usando openai y datos de mercado.
 cachea resultados para optimizar costos de api.
+
+la sesion de bd es sincrona: los metodos async esperan a openai y alpha
+vantage en el event loop y mandan las consultas y commits al threadpool
+con run_in_threadpool.
 """
 import sys
 import os
 import logging
-from typing import Optional, Dict, Any, List
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
 from datetime import datetime, timedelta
 from uuid import UUID
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 # agregar el directorio padre al path para importar ai_module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
 from app.clients.openai_client import OpenAIClient
+from app.core.database.session import SessionLocal
 from app.services.market_service import MarketDataService
 # FIX: agregados AnalysisType y AnalysisStatus para usar enums en lugar de strings
 # problema: se usaban strings como "completed", "failed", "asset_technical" que causaban
@@ -23,12 +31,50 @@ from app.services.market_service import MarketDataService
 from app.models.analysis import Analysis, AnalysisRequest, AnalysisType, AnalysisStatus
 from app.repositories.analysis import AnalysisRepository
 from app.repositories.portfolio import PortfolioRepository
-from ai_module.src.processors.technical_indicators import TechnicalIndicators
+from ai_module.src.processors.technical_indicators import TechnicalIndicators, PreparedPrices
 
 
 logger = logging.getLogger(__name__)
 
 
+# cache lru de precios preparados por simbolo, compartido entre requests.
+# la clave (simbolo, largo, primer y ultimo precio) identifica la serie sin
+# recorrerla; si llega una barra nueva cambia el primer precio y se recalcula
+PREPARED_CACHE_MAXSIZE = 128
+_prepared_cache: "OrderedDict[Tuple[str, int, float, float], PreparedPrices]" = OrderedDict()
+_prepared_cache_lock = threading.Lock()
+
+
+def get_prepared_prices(symbol: str, prices: List[float]) -> PreparedPrices:
+    """
+    obtiene los arrays preparados de una serie, usando el cache lru.
+    
+    args:
+        symbol: simbolo del activo
+        prices: lista de precios de cierre (mas reciente primero)
+        
+    returns:
+        PreparedPrices de la serie
+    """
+    key = (symbol, len(prices), prices[0], prices[-1])
+    
+    with _prepared_cache_lock:
+        prepared = _prepared_cache.get(key)
+        if prepared is not None:
+            _prepared_cache.move_to_end(key)
+            return prepared
+    
+    prepared = TechnicalIndicators.prepare_prices(prices)
+    
+    with _prepared_cache_lock:
+        _prepared_cache[key] = prepared
+        _prepared_cache.move_to_end(key)
+        if len(_prepared_cache) > PREPARED_CACHE_MAXSIZE:
+            _prepared_cache.popitem(last=False)
+    
+    return prepared
+
+
 class AnalysisService:
     """
     servicio para generacion de analisis con ia.
@@ -56,7 +102,7 @@ class AnalysisService:
         self.market_service = MarketDataService(db)
         self.openai_client = OpenAIClient()
     
-    def generate_asset_analysis(
+    async def generate_asset_analysis(
         self,
         user_id: UUID,
         symbol: str,
@@ -90,7 +136,8 @@ class AnalysisService:
         # buscar en cache si no es force_regenerate
         if not force_regenerate:
             # FIX: agregado analysis_type=AnalysisType.ASSET para filtrar correctamente
-            cached = self.analysis_repo.get_cached_analysis(
+            cached = await run_in_threadpool(
+                self.analysis_repo.get_cached_analysis,
                 asset_symbol=symbol,
                 analysis_type=AnalysisType.ASSET
             )
@@ -100,80 +147,301 @@ class AnalysisService:
         
         # crear solicitud de analisis
         # FIX: agregado analysis_type y usando AnalysisStatus.PENDING en lugar de "processing"
-        request = AnalysisRequest(
+        request = await run_in_threadpool(
+            self._create_request,
             user_id=user_id,
             analysis_type=AnalysisType.ASSET,
-            asset_symbol=symbol,
-            portfolio_id=None,
-            status=AnalysisStatus.PENDING
+            asset_symbol=symbol
         )
-        self.db.add(request)
-        self.db.commit()
         
         try:
-            # obtener datos historicos (ultimos 100 dias)
-            logger.info(f"obteniendo datos historicos para {symbol}")
-            price_history = self.market_service.get_historical_prices(symbol, days=100)
-            
-            if not price_history or len(price_history) < 30:
-                logger.warning(f"insuficientes datos historicos para {symbol}")
-                request.status = AnalysisStatus.FAILED
-                self.db.commit()
+            inputs = await self._prepare_asset_inputs(symbol)
+            if inputs is None:
+                await run_in_threadpool(self._mark_failed, request)
                 return None
-            
-            # extraer precios de cierre para indicadores
-            close_prices = [p["close"] for p in price_history]
-            
-            # calcular indicadores tecnicos
-            logger.info(f"calculando indicadores tecnicos para {symbol}")
-            indicators = TechnicalIndicators.calculate_all_indicators(close_prices)
+            close_prices, indicators = inputs
             
             # generar analisis con openai
             logger.info(f"generando analisis con ia para {symbol}")
-            analysis_text = self.openai_client.generate_asset_analysis(
+            analysis_text = await self.openai_client.generate_asset_analysis(
                 symbol=symbol,
                 indicators=indicators,
-                price_history=price_history[:30]  # ultimos 30 dias para contexto
+                # el prompt solo usa el ultimo cierre y el de hace 5 sesiones
+                closes=close_prices[:6]
             )
             
             if not analysis_text:
                 logger.error(f"fallo la generacion de analisis para {symbol}")
-                request.status = AnalysisStatus.FAILED
-                self.db.commit()
+                await run_in_threadpool(self._mark_failed, request)
                 return None
             
-            # crear objeto analysis
-            expires_at = datetime.utcnow() + timedelta(hours=self.CACHE_TTL_HOURS)
+            return await run_in_threadpool(
+                self._save_asset_analysis, request, symbol, analysis_text, indicators
+            )
+            
+        except Exception as e:
+            logger.error(f"error generando analisis para {symbol}: {e}")
+            await run_in_threadpool(self._mark_failed, request)
+            return None
+    
+    async def stream_asset_analysis(
+        self,
+        user_id: UUID,
+        symbol: str,
+        force_regenerate: bool = False
+    ) -> Optional[AsyncIterator[str]]:
+        """
+        genera analisis de un activo emitiendo el texto a medida que llega.
+        
+        la preparacion (cache, historicos, indicadores) se hace antes de
+        retornar, asi los errores se reportan antes de empezar la respuesta.
+        el analisis se guarda cuando termina el stream.
+        
+        args:
+            user_id: id del usuario solicitante
+            symbol: simbolo del activo
+            force_regenerate: forzar regeneracion (ignorar cache)
             
-            # FIX: removido cached=True (el campo no existe en el modelo)
-            # FIX: usando AnalysisType.ASSET enum en lugar de "asset_technical"
-            analysis = Analysis(
-                portfolio_id=None,
+        returns:
+            iterador asincrono con los fragmentos del analisis o none si falla
+        """
+        symbol = symbol.upper()
+        
+        if not self.openai_client.is_available():
+            logger.error("openai no disponible - api key no configurada")
+            return None
+        
+        if not force_regenerate:
+            cached = await run_in_threadpool(
+                self.analysis_repo.get_cached_analysis,
                 asset_symbol=symbol,
-                analysis_type=AnalysisType.ASSET,
-                analysis_text=analysis_text,
-                technical_indicators=indicators,
-                generated_at=datetime.utcnow(),
-                expires_at=expires_at
+                analysis_type=AnalysisType.ASSET
             )
+            if cached:
+                logger.info(f"usando analisis cacheado para {symbol}")
+                return self._single_chunk(cached.analysis_text)
+        
+        request = await run_in_threadpool(
+            self._create_request,
+            user_id=user_id,
+            analysis_type=AnalysisType.ASSET,
+            asset_symbol=symbol
+        )
+        
+        try:
+            inputs = await self._prepare_asset_inputs(symbol)
+        except Exception as e:
+            logger.error(f"error preparando analisis para {symbol}: {e}")
+            inputs = None
+        
+        if inputs is None:
+            await run_in_threadpool(self._mark_failed, request)
+            return None
+        
+        close_prices, indicators = inputs
+        return self._stream_and_save(request.id, symbol, indicators, close_prices)
+    
+    async def _stream_and_save(
+        self,
+        request_id: UUID,
+        symbol: str,
+        indicators: Dict[str, Any],
+        close_prices: List[float]
+    ) -> AsyncIterator[str]:
+        """
+        emite los fragmentos de openai y guarda el analisis al terminar.
+        
+        el iterador se consume despues de que el endpoint retorno, cuando la
+        sesion del request ya no es utilizable: el resultado se guarda con una
+        sesion propia (ver _finish_stream).
+        """
+        parts = []
+        analysis_text = None
+        try:
+            logger.info(f"generando analisis (stream) con ia para {symbol}")
+            async for chunk in self.openai_client.stream_asset_analysis(
+                symbol=symbol,
+                indicators=indicators,
+                closes=close_prices[:6]
+            ):
+                parts.append(chunk)
+                yield chunk
             
-            self.db.add(analysis)
+            analysis_text = "".join(parts).strip()
+            if not analysis_text:
+                logger.error(f"fallo la generacion de analisis para {symbol}")
+        except Exception as e:
+            # la respuesta ya empezo: solo se puede cortar el stream
+            logger.error(f"error en stream de analisis para {symbol}: {e}")
+        
+        await run_in_threadpool(
+            self._finish_stream, request_id, symbol, analysis_text, indicators
+        )
+    
+    def _finish_stream(
+        self,
+        request_id: UUID,
+        symbol: str,
+        analysis_text: Optional[str],
+        indicators: Dict[str, Any]
+    ) -> None:
+        """
+        guarda el resultado de un stream con una sesion dedicada.
+        
+        args:
+            request_id: id de la solicitud de analisis
+            symbol: simbolo del activo
+            analysis_text: texto generado o none si el stream fallo
+            indicators: indicadores tecnicos usados en el prompt
+        """
+        db = SessionLocal()
+        try:
+            request = db.get(AnalysisRequest, request_id)
+            if analysis_text:
+                db.add(self._build_asset_analysis(symbol, analysis_text, indicators))
+                status = AnalysisStatus.COMPLETED
+                logger.info(f"analisis generado correctamente para {symbol}")
+            else:
+                status = AnalysisStatus.FAILED
             
-            # actualizar solicitud
-            request.status = AnalysisStatus.COMPLETED
+            if request is not None:
+                request.status = status
+            db.commit()
+        except Exception as e:
+            logger.error(f"error guardando analisis (stream) para {symbol}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+    
+    @staticmethod
+    async def _single_chunk(text: str) -> AsyncIterator[str]:
+        """iterador de un solo fragmento (analisis ya cacheado)."""
+        yield text
+    
+    async def _prepare_asset_inputs(
+        self,
+        symbol: str
+    ) -> Optional[Tuple[List[float], Dict[str, Any]]]:
+        """
+        obtiene historicos y calcula indicadores de un activo.
+        
+        args:
+            symbol: simbolo del activo (en mayusculas)
             
-            self.db.commit()
+        returns:
+            tupla (close_prices, indicators) con los cierres mas reciente primero,
+            o none si no hay datos suficientes
+        """
+        # obtener datos historicos (ultimos 100 dias)
+        logger.info(f"obteniendo datos historicos para {symbol}")
+        price_history = await self.market_service.get_historical_prices(symbol, days=100)
+        
+        if not price_history or len(price_history) < 30:
+            logger.warning(f"insuficientes datos historicos para {symbol}")
+            return None
+        
+        # extraer precios de cierre para indicadores
+        close_prices = [p["close"] for p in price_history]
+        
+        # calcular indicadores tecnicos
+        logger.info(f"calculando indicadores tecnicos para {symbol}")
+        prepared = get_prepared_prices(symbol, close_prices)
+        indicators = TechnicalIndicators.calculate_all_indicators(close_prices, prepared=prepared)
+        
+        return close_prices, indicators
+    
+    def _create_request(
+        self,
+        user_id: UUID,
+        analysis_type: AnalysisType,
+        asset_symbol: Optional[str] = None,
+        portfolio_id: Optional[UUID] = None
+    ) -> AnalysisRequest:
+        """
+        registra una solicitud de analisis pendiente.
+        
+        args:
+            user_id: id del usuario solicitante
+            analysis_type: tipo de analisis
+            asset_symbol: simbolo del activo (analisis de activo)
+            portfolio_id: id del portfolio (analisis de portfolio)
             
-            logger.info(f"analisis generado correctamente para {symbol}")
-            return analysis
+        returns:
+            solicitud guardada
+        """
+        request = AnalysisRequest(
+            user_id=user_id,
+            analysis_type=analysis_type,
+            asset_symbol=asset_symbol,
+            portfolio_id=portfolio_id,
+            status=AnalysisStatus.PENDING
+        )
+        self.db.add(request)
+        self.db.commit()
+        # el id se lee fuera del threadpool (stream): se recarga aqui como en BaseRepository.create
+        self.db.refresh(request)
+        return request
+    
+    def _mark_failed(self, request: AnalysisRequest) -> None:
+        """marca la solicitud como fallida."""
+        request.status = AnalysisStatus.FAILED
+        self.db.commit()
+    
+    @classmethod
+    def _build_asset_analysis(
+        cls,
+        symbol: str,
+        analysis_text: str,
+        indicators: Dict[str, Any]
+    ) -> Analysis:
+        """crea (sin guardar) el analisis de un activo con la expiracion del cache."""
+        expires_at = datetime.utcnow() + timedelta(hours=cls.CACHE_TTL_HOURS)
+        
+        # FIX: removido cached=True (el campo no existe en el modelo)
+        # FIX: usando AnalysisType.ASSET enum en lugar de "asset_technical"
+        return Analysis(
+            portfolio_id=None,
+            asset_symbol=symbol,
+            analysis_type=AnalysisType.ASSET,
+            analysis_text=analysis_text,
+            technical_indicators=indicators,
+            generated_at=datetime.utcnow(),
+            expires_at=expires_at
+        )
+    
+    def _save_asset_analysis(
+        self,
+        request: AnalysisRequest,
+        symbol: str,
+        analysis_text: str,
+        indicators: Dict[str, Any]
+    ) -> Analysis:
+        """
+        guarda el analisis de un activo y marca la solicitud como completada.
+        
+        args:
+            request: solicitud de analisis en curso
+            symbol: simbolo del activo
+            analysis_text: texto generado
+            indicators: indicadores tecnicos usados en el prompt
             
-        except Exception as e:
-            logger.error(f"error generando analisis para {symbol}: {e}")
-            request.status = AnalysisStatus.FAILED
-            self.db.commit()
-            return None
+        returns:
+            analisis guardado
+        """
+        analysis = self._build_asset_analysis(symbol, analysis_text, indicators)
+        self.db.add(analysis)
+        
+        # actualizar solicitud
+        request.status = AnalysisStatus.COMPLETED
+        
+        self.db.commit()
+        # recargar aqui (en el threadpool) y no al serializar la respuesta en el event loop
+        self.db.refresh(analysis)
+        
+        logger.info(f"analisis generado correctamente para {symbol}")
+        return analysis
     
-    def generate_portfolio_analysis(
+    async def generate_portfolio_analysis(
         self,
         user_id: UUID,
         portfolio_id: UUID,
@@ -205,7 +473,8 @@ class AnalysisService:
         
         # buscar en cache
         if not force_regenerate:
-            cached = self.analysis_repo.get_cached_analysis(
+            cached = await run_in_threadpool(
+                self.analysis_repo.get_cached_analysis,
                 portfolio_id=portfolio_id,
                 analysis_type=AnalysisType.PORTFOLIO
             )
@@ -214,110 +483,149 @@ class AnalysisService:
                 return cached
         
         # crear solicitud de analisis
-        request = AnalysisRequest(
+        request = await run_in_threadpool(
+            self._create_request,
             user_id=user_id,
             analysis_type=AnalysisType.PORTFOLIO,
-            asset_symbol=None,
-            portfolio_id=portfolio_id,
-            status=AnalysisStatus.PENDING
+            portfolio_id=portfolio_id
         )
-        self.db.add(request)
-        self.db.commit()
         
         try:
             # obtener portfolio con posiciones
-            portfolio = self.portfolio_repo.get_with_positions(portfolio_id)
+            portfolio = await run_in_threadpool(self.portfolio_repo.get_with_positions, portfolio_id)
             
             if not portfolio:
                 logger.error(f"portfolio {portfolio_id} no encontrado")
-                request.status = AnalysisStatus.FAILED
-                self.db.commit()
+                await run_in_threadpool(self._mark_failed, request)
                 return None
             
             # verificar que haya posiciones
             if not portfolio.assets or len(portfolio.assets) == 0:
                 logger.warning(f"portfolio {portfolio_id} no tiene posiciones")
-                request.status = AnalysisStatus.FAILED
-                self.db.commit()
+                await run_in_threadpool(self._mark_failed, request)
                 return None
             
             # actualizar precios de activos
             logger.info(f"actualizando precios para portfolio {portfolio_id}")
-            self.market_service.update_portfolio_prices(portfolio_id)
+            await self.market_service.update_portfolio_prices(portfolio_id)
             
-            # refrescar portfolio
-            self.db.refresh(portfolio)
-            
-            # preparar datos del portfolio
-            portfolio_data = {
-                "name": portfolio.name,
-                "total_value": float(portfolio.total_value),
-                "total_cost": float(portfolio.total_cost),
-                "gain_loss": float(portfolio.total_gain_loss),
-                "gain_loss_percent": float(portfolio.total_gain_loss_percent)
-            }
-            
-            # preparar datos de posiciones
-            positions = []
-            for position in portfolio.assets:
-                if position.quantity <= 0:
-                    continue
-                
-                positions.append({
-                    "symbol": position.asset_symbol,
-                    "quantity": float(position.quantity),
-                    "value": float(position.current_value),
-                    "cost": float(position.total_cost),
-                    "gain_loss": float(position.gain_loss),
-                    "gain_loss_percent": float(position.gain_loss_percent)
-                })
+            # refrescar portfolio y preparar datos
+            portfolio_data, positions = await run_in_threadpool(
+                self._collect_portfolio_data, portfolio
+            )
             
             # generar analisis con openai
             logger.info(f"generando analisis de portfolio {portfolio_id} con ia")
-            analysis_text = self.openai_client.generate_portfolio_analysis(
+            analysis_text = await self.openai_client.generate_portfolio_analysis(
                 portfolio_data=portfolio_data,
                 positions=positions
             )
             
             if not analysis_text:
                 logger.error(f"fallo la generacion de analisis para portfolio {portfolio_id}")
-                request.status = AnalysisStatus.FAILED
-                self.db.commit()
+                await run_in_threadpool(self._mark_failed, request)
                 return None
             
-            # crear objeto analysis
-            expires_at = datetime.utcnow() + timedelta(hours=self.CACHE_TTL_HOURS)
-            
-            analysis = Analysis(
-                portfolio_id=portfolio_id,
-                asset_symbol=None,
-                analysis_type=AnalysisType.PORTFOLIO,
-                analysis_text=analysis_text,
-                technical_indicators={
-                    "total_positions": len(positions),
-                    "total_value": portfolio_data["total_value"],
-                    "performance": portfolio_data["gain_loss_percent"]
-                },
-                generated_at=datetime.utcnow(),
-                expires_at=expires_at
+            analysis = await run_in_threadpool(
+                self._save_portfolio_analysis,
+                request, portfolio_id, analysis_text, portfolio_data, positions
             )
             
-            self.db.add(analysis)
-            
-            # actualizar solicitud
-            request.status = AnalysisStatus.COMPLETED
-            
-            self.db.commit()
-            
             logger.info(f"analisis de portfolio generado correctamente")
             return analysis
             
         except Exception as e:
             logger.error(f"error generando analisis de portfolio {portfolio_id}: {e}")
-            request.status = AnalysisStatus.FAILED
-            self.db.commit()
+            await run_in_threadpool(self._mark_failed, request)
             return None
     
+    def _collect_portfolio_data(
+        self,
+        portfolio
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        refresca el portfolio y arma los datos que usa el prompt.
+        
+        args:
+            portfolio: portfolio con posiciones
+            
+        returns:
+            tupla (portfolio_data, positions)
+        """
+        self.db.refresh(portfolio)
+        
+        # preparar datos del portfolio
+        portfolio_data = {
+            "name": portfolio.name,
+            "total_value": float(portfolio.total_value),
+            "total_cost": float(portfolio.total_cost),
+            "gain_loss": float(portfolio.total_gain_loss),
+            "gain_loss_percent": float(portfolio.total_gain_loss_percent)
+        }
+        
+        # preparar datos de posiciones
+        positions = []
+        for position in portfolio.assets:
+            if position.quantity <= 0:
+                continue
+            
+            positions.append({
+                "symbol": position.asset_symbol,
+                "quantity": float(position.quantity),
+                "value": float(position.current_value),
+                "cost": float(position.total_cost),
+                "gain_loss": float(position.gain_loss),
+                "gain_loss_percent": float(position.gain_loss_percent)
+            })
+        
+        return portfolio_data, positions
+    
+    def _save_portfolio_analysis(
+        self,
+        request: AnalysisRequest,
+        portfolio_id: UUID,
+        analysis_text: str,
+        portfolio_data: Dict[str, Any],
+        positions: List[Dict[str, Any]]
+    ) -> Analysis:
+        """
+        guarda el analisis de un portfolio y marca la solicitud como completada.
+        
+        args:
+            request: solicitud de analisis en curso
+            portfolio_id: id del portfolio
+            analysis_text: texto generado
+            portfolio_data: resumen del portfolio usado en el prompt
+            positions: posiciones usadas en el prompt
+            
+        returns:
+            analisis guardado
+        """
+        expires_at = datetime.utcnow() + timedelta(hours=self.CACHE_TTL_HOURS)
+        
+        analysis = Analysis(
+            portfolio_id=portfolio_id,
+            asset_symbol=None,
+            analysis_type=AnalysisType.PORTFOLIO,
+            analysis_text=analysis_text,
+            technical_indicators={
+                "total_positions": len(positions),
+                "total_value": portfolio_data["total_value"],
+                "performance": portfolio_data["gain_loss_percent"]
+            },
+            generated_at=datetime.utcnow(),
+            expires_at=expires_at
+        )
+        
+        self.db.add(analysis)
+        
+        # actualizar solicitud
+        request.status = AnalysisStatus.COMPLETED
+        
+        self.db.commit()
+        self.db.refresh(analysis)
+        return analysis
+    
     def get_analysis_history(
         self,
         user_id: UUID,
@@ -371,19 +679,18 @@ class AnalysisService:
         returns:
             numero de analisis invalidados
         """
-        count = 0
-        
+        analyses: List[Analysis] = []
         if portfolio_id:
-            analyses = self.analysis_repo.get_by_portfolio(portfolio_id)
-            for analysis in analyses:
-                analysis.expires_at = datetime.utcnow()
-                count += 1
-        
+            analyses.extend(self.analysis_repo.get_by_portfolio(portfolio_id))
         if asset_symbol:
-            analyses = self.analysis_repo.get_by_asset(asset_symbol.upper())
-            for analysis in analyses:
-                analysis.expires_at = datetime.utcnow()
-                count += 1
+            analyses.extend(self.analysis_repo.get_by_asset(asset_symbol.upper()))
+        
+        # solo se cuentan (y se tocan) los que aun estaban vigentes
+        now = datetime.utcnow()
+        count = 0
+        for analysis in Analysis.filter_valid(analyses):
+            analysis.expires_at = now
+            count += 1
         
         self.db.commit()
         logger.info(f"invalidados {count} analisis del cache")
@@ -18,11 +18,14 @@ from typing import Optional, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 
 from app.models.user import User, UserSession
 from app.repositories.user import UserRepository
-from app.core.security import password_hasher, jwt_handler
+from app.core.security import password_hasher, get_jwt_handler
 from app.core.config import settings
+from app.core.cache import response_cache
+from app.services.user_service import profile_cache_key
 
 
 class AuthService:
@@ -101,7 +104,7 @@ class AuthService:
         
         return created_user
     
-    def authenticate(self, email: str, password: str) -> Optional[User]:
+    async def authenticate(self, email: str, password: str) -> Optional[User]:
         """
         autentica un usuario por email y password.
         
@@ -110,6 +113,9 @@ class AuthService:
         - que el password es correcto
         - que el usuario esta activo
         
+        la consulta va al threadpool y bcrypt al pool del password_hasher,
+        asi el event loop no se bloquea durante la verificacion.
+        
         args:
             email: email del usuario
             password: password en texto plano
@@ -118,7 +124,7 @@ class AuthService:
             usuario autenticado o none si falla
         """
         # buscar usuario
-        user = self.user_repo.get_by_email(email.lower().strip())
+        user = await run_in_threadpool(self.user_repo.get_by_email, email.lower().strip())
         
         if not user:
             return None
@@ -128,12 +134,12 @@ class AuthService:
             return None
         
         # verificar password
-        if not user.verify_password(password):
+        if not await password_hasher.verify_password_async(password, user.password_hash):
             return None
         
         return user
     
-    def login(self, email: str, password: str) -> Optional[Tuple[User, str, str]]:
+    async def login(self, email: str, password: str) -> Optional[Tuple[User, str, str]]:
         """
         realiza login completo y genera tokens.
         
@@ -151,20 +157,20 @@ class AuthService:
             tupla (user, access_token, refresh_token) o none si falla
         """
         # autenticar
-        user = self.authenticate(email, password)
+        user = await self.authenticate(email, password)
         if not user:
             return None
         
         # generar tokens
         token_data = {"sub": str(user.id)}
-        access_token = jwt_handler.create_access_token(token_data)
-        refresh_token = jwt_handler.create_refresh_token(token_data)
+        access_token = get_jwt_handler().create_access_token(token_data)
+        refresh_token = get_jwt_handler().create_refresh_token(token_data)
         
         # calcular expiracion del refresh token
         expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         
         # crear sesion
-        self.user_repo.create_session(user.id, refresh_token, expires_at)
+        await run_in_threadpool(self.user_repo.create_session, user.id, refresh_token, expires_at)
         
         return user, access_token, refresh_token
     
@@ -185,7 +191,7 @@ class AuthService:
             tupla (new_access_token, new_refresh_token) o none si falla
         """
         # decodificar token
-        payload = jwt_handler.decode_token(refresh_token)
+        payload = get_jwt_handler().decode_token(refresh_token)
         if not payload:
             return None
         
@@ -215,8 +221,8 @@ class AuthService:
         
         # generar nuevos tokens
         token_data = {"sub": str(user.id)}
-        new_access_token = jwt_handler.create_access_token(token_data)
-        new_refresh_token = jwt_handler.create_refresh_token(token_data)
+        new_access_token = get_jwt_handler().create_access_token(token_data)
+        new_refresh_token = get_jwt_handler().create_refresh_token(token_data)
         
         # actualizar sesion
         self.user_repo.update_session_token(session.id, new_refresh_token)
@@ -254,6 +260,8 @@ class AuthService:
         returns:
             numero de sesiones cerradas
         """
+        # el proximo login de cualquier usuario vuelve a pasar por bcrypt
+        password_hasher.clear_verify_cache()
         return self.user_repo.invalidate_all_sessions(user_id)
     
     def get_user_from_token(self, access_token: str) -> Optional[User]:
@@ -269,7 +277,7 @@ class AuthService:
             usuario o none si token invalido
         """
         # decodificar token
-        payload = jwt_handler.decode_token(access_token)
+        payload = get_jwt_handler().decode_token(access_token)
         if not payload:
             return None
         
@@ -294,13 +302,14 @@ class AuthService:
         
         return user
     
-    def change_password(self, user_id: UUID, current_password: str, 
-                        new_password: str) -> bool:
+    async def change_password(self, user_id: UUID, current_password: str, 
+                              new_password: str) -> bool:
         """
         cambia la password de un usuario.
         
         verifica el password actual antes de cambiar.
         invalida todas las sesiones existentes por seguridad.
+        la verificacion y el nuevo hash corren en el pool del password_hasher.
         
         args:
             user_id: id del usuario
@@ -310,23 +319,26 @@ class AuthService:
         returns:
             true si se cambio, false si el password actual es incorrecto
         """
-        user = self.user_repo.get_by_id(user_id)
+        user = await run_in_threadpool(self.user_repo.get_by_id, user_id)
         if not user:
             return False
         
         # verificar password actual
-        if not user.verify_password(current_password):
+        if not await password_hasher.verify_password_async(current_password, user.password_hash):
             return False
         
         # actualizar password
-        user.password_hash = password_hasher.hash_password(new_password)
-        self.user_repo.update(user)
-        
-        # invalidar todas las sesiones por seguridad
-        self.user_repo.invalidate_all_sessions(user_id)
+        password_hash = await password_hasher.hash_password_async(new_password)
+        await run_in_threadpool(self._save_password, user, password_hash)
         
         return True
     
+    def _save_password(self, user: User, password_hash: str) -> None:
+        """guarda el nuevo hash e invalida todas las sesiones por seguridad."""
+        user.password_hash = password_hash
+        self.user_repo.update(user)
+        self.user_repo.invalidate_all_sessions(user.id)
+    
     def verify_email(self, user_id: UUID) -> bool:
         """
         marca el email de un usuario como verificado.
@@ -346,5 +358,6 @@ class AuthService:
         
         user.is_verified = True
         self.user_repo.update(user)
+        response_cache.delete(profile_cache_key(user_id))
         return True
 
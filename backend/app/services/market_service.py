@@ -1,11 +1,13 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import logging
 
 from app.clients.alpha_vantage_client import AlphaVantageClient
-from app.models.asset import Asset, AssetPrice
+from app.core.cache import async_keyed_locks
+from app.models.asset import Asset, AssetPrice, norm_symbol
 from app.repositories.asset import AssetRepository
 
 logger = logging.getLogger(__name__)
@@ -30,30 +32,55 @@ DEFAULT_ASSET_TYPE = "STOCK"
 
 
 class MarketDataService:
-    """Servicio para gestión de datos de mercado."""
+    """Servicio para gestión de datos de mercado.
+    
+    Los métodos async esperan a Alpha Vantage en el event loop; las consultas a BD (sesión
+    síncrona) se mandan al threadpool con run_in_threadpool para no bloquear el loop.
+    """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, asset_cache: Optional[Dict[str, Asset]] = None):
         self.db = db
-        self.asset_repo = AssetRepository(db)
-        self.alpha_client = AlphaVantageClient()
+        self.asset_repo = AssetRepository(db, asset_cache)
+        self._alpha_client: Optional[AlphaVantageClient] = None
 
-    def get_current_price(self, symbol: str) -> Optional[Decimal]:
+    @property
+    def alpha_client(self) -> AlphaVantageClient:
+        """Cliente de Alpha Vantage, creado al primer uso.
+        
+        AlphaVantageClient valida la API key al construirse; creándolo aquí en lugar de en
+        __init__, los flujos que solo leen de la BD (o AnalysisService) siguen funcionando
+        sin key y el ValueError solo aparece cuando de verdad hay que consultar la API.
+        """
+        if self._alpha_client is None:
+            self._alpha_client = AlphaVantageClient()
+        return self._alpha_client
+
+    async def get_current_price(self, symbol: str) -> Optional[Decimal]:
         """Obtiene el precio actual de un activo, registrándolo automáticamente si no existe."""
-        symbol = symbol.upper()
+        symbol = norm_symbol(symbol)
+        
+        # Single-flight por símbolo: con N peticiones concurrentes solo una consulta Alpha Vantage,
+        # el resto espera (sin bloquear el event loop) y lee el precio que quedó guardado en BD.
+        async with async_keyed_locks.get(f"quote:{symbol}"):
+            return await self._fetch_current_price(symbol)
+
+    async def _fetch_current_price(self, symbol: str) -> Optional[Decimal]:
+        """Resuelve el precio actual (BD o Alpha Vantage). Se llama con el lock del símbolo tomado."""
         quote = None  # inicializar quote
         
         # Priorizamos fetch directo del quote sobre search_symbol para no quemar el rate-limit tan rápido.
         # Sino cambiábamos esto así, se agotaba el rate-limit de Alpha Vantage en minutos por llamadas
         # innecesarias a búsqueda.
-        asset = self.asset_repo.get_by_symbol(symbol)
+        asset = await run_in_threadpool(self.asset_repo.get_by_symbol, symbol)
         if not asset:
             # intentar obtener quote directamente (evita search que consume rate limit)
             logger.info(f"Consultando quote directo para {symbol}")
-            quote = self.alpha_client.get_quote(symbol)
+            quote = await self.alpha_client.get_quote(symbol)
             
             if quote and "price" in quote:
                 # crear asset con info basica del quote
-                asset = self.asset_repo.get_or_create(
+                asset = await run_in_threadpool(
+                    self.asset_repo.get_or_create,
                     symbol=symbol,
                     name=symbol,  # usamos el simbolo como nombre
                     asset_type=DEFAULT_ASSET_TYPE,
@@ -62,13 +89,14 @@ class MarketDataService:
                 logger.info(f"Asset {symbol} registrado desde quote directo")
             else:
                 # fallback: intentar search solo si quote falla
-                search_results = self.alpha_client.search_symbol(symbol)
+                search_results = await self.alpha_client.search_symbol(symbol)
                 if not search_results:
                     logger.error(f"Símbolo {symbol} no encontrado en Alpha Vantage")
                     return None
                 
                 match = search_results[0]
-                asset = self.asset_repo.get_or_create(
+                asset = await run_in_threadpool(
+                    self.asset_repo.get_or_create,
                     symbol=symbol,
                     name=match.get("name", symbol),
                     asset_type=ALPHA_VANTAGE_TYPE_MAPPING.get(match.get("type", ""), DEFAULT_ASSET_TYPE),
@@ -79,19 +107,14 @@ class MarketDataService:
                 # resetear quote para forzar nueva consulta
                 quote = None
         
-        # Unificamos todo bajo get_historical_prices. Antes teníamos código duplicado con diferentes
-        # nombres para lo mismo (get_price_history vs get_historical_prices).
-        cached_prices = self.asset_repo.get_historical_prices(symbol, days=1)
-        if cached_prices:
-            latest = cached_prices[-1]
-            if self._is_price_fresh(latest.timestamp):
-                logger.info(f"Precio en cache para {symbol}: ${latest.close_price}")
-                return latest.close_price
+        cached_price = await run_in_threadpool(self._fresh_cached_price, symbol)
+        if cached_price is not None:
+            return cached_price
         
         # solo consultar si no lo hicimos arriba
         if quote is None:
             logger.info(f"Consultando Alpha Vantage para {symbol}")
-            quote = self.alpha_client.get_quote(symbol)
+            quote = await self.alpha_client.get_quote(symbol)
         
         if not quote or "price" not in quote:
             logger.error(
@@ -100,49 +123,41 @@ class MarketDataService:
             )
             return None
         
-        try:
-            price = Decimal(str(quote["price"]))
-            if price <= 0:
-                logger.warning(f"Precio inválido para {symbol}: {price}")
-                return None
-        except (ValueError, TypeError) as e:
-            logger.error(f"Error al parsear precio para {symbol}: {e}")
+        price = self._parse_quote_price(symbol, quote)
+        if price is None:
             return None
         
-        # Alpha Vantage a veces no devuelve todos los campos, así que usamos .get() con defaults.
-        # Sino cambiábamos esto así, el servicio se caía con KeyError cuando faltaban datos.
-        self._save_price(
-            symbol=symbol,
-            price=price,
-            open_price=Decimal(str(quote.get("open", "0"))),
-            high=Decimal(str(quote.get("high", "0"))),
-            low=Decimal(str(quote.get("low", "0"))),
-            volume=int(float(quote.get("volume", 0))),
-            date=quote.get("timestamp", datetime.utcnow().strftime("%Y-%m-%d"))
-        )
+        await run_in_threadpool(self._save_quote, symbol, price, quote)
         
         logger.info(f"Precio actualizado para {symbol}: ${price}")
         return price
 
-    def get_historical_prices(
+    async def get_historical_prices(
         self,
         symbol: str,
         days: int = 30
     ) -> List[Dict[str, Any]]:
         """Obtiene datos históricos, registrando automáticamente el asset si no existe."""
-        symbol = symbol.upper()
+        symbol = norm_symbol(symbol)
         
+        # Mismo single-flight que get_current_price: los que esperan encuentran los históricos en BD.
+        async with async_keyed_locks.get(f"historical:{symbol}"):
+            return await self._fetch_historical_prices(symbol, days)
+
+    async def _fetch_historical_prices(self, symbol: str, days: int) -> List[Dict[str, Any]]:
+        """Resuelve los históricos (BD o Alpha Vantage). Se llama con el lock del símbolo tomado."""
         # Registramos automáticamente el asset si no existe. Antes fallaba silenciosamente y el
         # frontend no podía mostrar gráficos para símbolos nuevos.
-        asset = self.asset_repo.get_by_symbol(symbol)
+        asset = await run_in_threadpool(self.asset_repo.get_by_symbol, symbol)
         if not asset:
-            search_results = self.alpha_client.search_symbol(symbol)
+            search_results = await self.alpha_client.search_symbol(symbol)
             if not search_results:
                 logger.error(f"Símbolo {symbol} no encontrado en Alpha Vantage")
                 return []
             
             match = search_results[0]
-            asset = self.asset_repo.get_or_create(
+            asset = await run_in_threadpool(
+                self.asset_repo.get_or_create,
                 symbol=symbol,
                 name=match.get("name", symbol),
                 asset_type=ALPHA_VANTAGE_TYPE_MAPPING.get(match.get("type", ""), DEFAULT_ASSET_TYPE),
@@ -150,7 +165,7 @@ class MarketDataService:
             )
             logger.info(f"Asset {symbol} registrado automáticamente")
         
-        cached_prices = self.asset_repo.get_historical_prices(symbol, days)
+        cached_prices = await run_in_threadpool(self.asset_repo.get_historical_prices, symbol, days)
         
         if cached_prices and len(cached_prices) >= days:
             logger.info(f"Usando {len(cached_prices)} precios en cache para {symbol}")
@@ -158,31 +173,22 @@ class MarketDataService:
         
         logger.info(f"Consultando historicos para {symbol}")
         outputsize = "compact" if days <= 100 else "full"
-        prices_data = self.alpha_client.get_daily_prices(symbol, outputsize)
+        prices_data = await self.alpha_client.get_daily_prices(symbol, outputsize)
         
         if not prices_data:
             logger.warning(f"Sin datos históricos para {symbol}")
             return self._format_price_history(cached_prices) if cached_prices else []
         
-        for price_data in prices_data[:days]:
-            self._save_price(
-                symbol=symbol,
-                price=Decimal(str(price_data["close"])),
-                open_price=Decimal(str(price_data["open"])),
-                high=Decimal(str(price_data["high"])),
-                low=Decimal(str(price_data["low"])),
-                volume=int(float(price_data.get("volume", 0))),
-                date=price_data["date"]
-            )
-        
-        updated_prices = self.asset_repo.get_historical_prices(symbol, days)
+        updated_prices = await run_in_threadpool(
+            self._save_price_history, symbol, prices_data[:days], days
+        )
         logger.info(f"Historicos actualizados para {symbol}: {len(updated_prices)} registros")
         
         return self._format_price_history(updated_prices)
 
-    def search_assets(self, keywords: str) -> List[Dict[str, Any]]:
+    async def search_assets(self, keywords: str) -> List[Dict[str, Any]]:
         """Busca activos: primero BD local, luego Alpha Vantage."""
-        local_results = self.asset_repo.search_assets(keywords)
+        local_results = await run_in_threadpool(self.asset_repo.search_assets, keywords)
         
         if local_results:
             logger.info(f"Encontrados {len(local_results)} assets locales para '{keywords}'")
@@ -198,7 +204,7 @@ class MarketDataService:
             ]
         
         logger.info(f"Buscando en Alpha Vantage: '{keywords}'")
-        av_results = self.alpha_client.search_symbol(keywords)
+        av_results = await self.alpha_client.search_symbol(keywords)
         
         if not av_results:
             return []
@@ -227,7 +233,7 @@ class MarketDataService:
     ) -> Asset:
         """Registra explícitamente un nuevo asset en BD."""
         asset = self.asset_repo.get_or_create(
-            symbol=symbol.upper(),
+            symbol=norm_symbol(symbol),
             name=name,
             asset_type=asset_type.upper(),
             currency=currency.upper()
@@ -236,33 +242,107 @@ class MarketDataService:
         logger.info(f"Asset registrado: {asset.symbol} - {asset.name}")
         return asset
 
-    def update_portfolio_prices(self, portfolio_id: int) -> int:
+    async def update_portfolio_prices(self, portfolio_id: int) -> int:
         """Actualiza precios de assets en un portfolio."""
         from app.repositories.portfolio import PortfolioRepository
         
         portfolio_repo = PortfolioRepository(self.db)
-        portfolio = portfolio_repo.get_with_positions(portfolio_id)
+        portfolio = await run_in_threadpool(portfolio_repo.get_with_positions, portfolio_id)
         
         if not portfolio:
             logger.warning(f"Portfolio {portfolio_id} no encontrado")
             return 0
         
-        updated_count = 0
-        for position in portfolio.assets:
-            if position.quantity <= 0:
-                continue
+        # Leemos los símbolos antes de las consultas: guardar precios hace commits que
+        # expiran las posiciones, y recargarlas desde aquí sería I/O en el event loop.
+        symbols = list(dict.fromkeys(
+            norm_symbol(p.asset_symbol) for p in portfolio.assets if p.quantity > 0
+        ))
+        
+        # Los precios frescos salen de BD; el resto se piden en una sola tanda con get_quotes
+        # (en paralelo, limitado por QUOTES_CONCURRENCY) en lugar de un quote tras otro.
+        prices = await run_in_threadpool(self._fresh_cached_prices, symbols)
+        missing = [s for s in symbols if s not in prices]
+        if missing:
+            logger.info(f"Consultando {len(missing)} quotes en Alpha Vantage para portfolio {portfolio_id}")
+            quotes = await self.alpha_client.get_quotes(missing)
+            fetched = {}
+            for symbol in missing:
+                quote = quotes.get(symbol)
+                if not quote or "price" not in quote:
+                    logger.warning(f"Sin quote de Alpha Vantage para {symbol}")
+                    continue
+                price = self._parse_quote_price(symbol, quote)
+                if price is not None:
+                    fetched[symbol] = (price, quote)
             
-            price = self.get_current_price(position.asset_symbol)
-            if price:
-                position.current_price = price
-                updated_count += 1
+            await run_in_threadpool(self._save_quotes, fetched)
+            prices.update({symbol: price for symbol, (price, _) in fetched.items()})
         
-        portfolio.calculate_metrics()
-        self.db.commit()
+        await run_in_threadpool(self._apply_portfolio_prices, portfolio, prices)
+        updated_count = len(prices)
         
         logger.info(f"Actualizados {updated_count} precios para portfolio {portfolio_id}")
         return updated_count
 
+    def _fresh_cached_price(self, symbol: str) -> Optional[Decimal]:
+        """Último precio guardado en BD si todavía está fresco (ver _is_price_fresh)."""
+        # Unificamos todo bajo get_historical_prices. Antes teníamos código duplicado con diferentes
+        # nombres para lo mismo (get_price_history vs get_historical_prices).
+        cached_prices = self.asset_repo.get_historical_prices(symbol, days=1)
+        if cached_prices:
+            latest = cached_prices[-1]
+            if self._is_price_fresh(latest.timestamp):
+                logger.info(f"Precio en cache para {symbol}: ${latest.close_price}")
+                return latest.close_price
+        return None
+
+    def _fresh_cached_prices(self, symbols: List[str]) -> Dict[str, Decimal]:
+        """Precios frescos en BD de varios símbolos; los que no aparecen hay que consultarlos."""
+        prices = {}
+        for symbol in symbols:
+            price = self._fresh_cached_price(symbol)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
+    def _parse_quote_price(self, symbol: str, quote: Dict[str, Any]) -> Optional[Decimal]:
+        """Extrae el precio de un quote de Alpha Vantage, o None si no es válido."""
+        try:
+            price = Decimal(str(quote["price"]))
+            if price <= 0:
+                logger.warning(f"Precio inválido para {symbol}: {price}")
+                return None
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error al parsear precio para {symbol}: {e}")
+            return None
+        return price
+
+    def _save_quote(self, symbol: str, price: Decimal, quote: Dict[str, Any]) -> None:
+        """Guarda un quote como precio del día. El asset debe existir en BD."""
+        # Alpha Vantage a veces no devuelve todos los campos, así que usamos .get() con defaults.
+        # Sino cambiábamos esto así, el servicio se caía con KeyError cuando faltaban datos.
+        self._save_price(
+            symbol=symbol,
+            price=price,
+            open_price=Decimal(str(quote.get("open", "0"))),
+            high=Decimal(str(quote.get("high", "0"))),
+            low=Decimal(str(quote.get("low", "0"))),
+            volume=int(float(quote.get("volume", 0))),
+            date=quote.get("timestamp", datetime.utcnow().strftime("%Y-%m-%d"))
+        )
+
+    def _save_quotes(self, quotes: Dict[str, Tuple[Decimal, Dict[str, Any]]]) -> None:
+        """Guarda los quotes de un portfolio, registrando los assets que falten."""
+        for symbol, (price, quote) in quotes.items():
+            self.asset_repo.get_or_create(
+                symbol=symbol,
+                name=symbol,
+                asset_type=DEFAULT_ASSET_TYPE,
+                currency="USD"
+            )
+            self._save_quote(symbol, price, quote)
+
     def _is_price_fresh(self, timestamp: datetime, max_age_minutes: int = 5) -> bool:
         """Verifica si un precio está actualizado."""
         age = datetime.utcnow() - timestamp
@@ -286,7 +366,7 @@ class MarketDataService:
         # El repositorio ahora usa open_price, high_price, low_price, close_price explícitamente.
         # Antes había mismatch entre el modelo AssetPrice y lo que guardábamos.
         try:
-            timestamp = datetime.strptime(date, "%Y-%m-%d")
+            timestamp = datetime.fromisoformat(date)
             self.asset_repo.add_price(
                 asset_symbol=symbol,
                 timestamp=timestamp,
@@ -299,6 +379,36 @@ class MarketDataService:
         except Exception as e:
             logger.error(f"Error guardando precio para {symbol}: {e}")
 
+    def _save_price_history(
+        self,
+        symbol: str,
+        prices_data: List[Dict[str, Any]],
+        days: int
+    ) -> List[AssetPrice]:
+        """Guarda los históricos de Alpha Vantage y devuelve los que quedaron en BD."""
+        for price_data in prices_data:
+            self._save_price(
+                symbol=symbol,
+                price=Decimal(str(price_data["close"])),
+                open_price=Decimal(str(price_data["open"])),
+                high=Decimal(str(price_data["high"])),
+                low=Decimal(str(price_data["low"])),
+                volume=int(float(price_data.get("volume", 0))),
+                date=price_data["date"]
+            )
+        
+        return self.asset_repo.get_historical_prices(symbol, days)
+
+    def _apply_portfolio_prices(self, portfolio, prices: Dict[str, Decimal]) -> None:
+        """Asigna los precios nuevos a las posiciones y recalcula las métricas del portfolio."""
+        for position in portfolio.assets:
+            price = prices.get(norm_symbol(position.asset_symbol))
+            if price:
+                position.current_price = price
+        
+        portfolio.calculate_metrics()
+        self.db.commit()
+
     def _format_price_history(self, prices: List[AssetPrice]) -> List[Dict[str, Any]]:
         """Formatea precios para respuesta API."""
         # AssetPrice ya no tiene 'price', ahora es 'close_price'. Sino cambiábamos esto así,
@@ -314,7 +424,3 @@ class MarketDataService:
             }
             for price in prices
         ]
-
-    def __del__(self) -> None:
-        if hasattr(self, 'alpha_client'):
-            self.alpha_client.close()
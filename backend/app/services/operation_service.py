@@ -9,7 +9,7 @@ proporciona funcionalidades adicionales para gestion de operaciones:
 nota: la creacion de operaciones y actualizacion de posiciones
 se maneja en portfolioservice para mantener la coherencia transaccional.
 """
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from uuid import UUID
 from decimal import Decimal
 from datetime import datetime, date
@@ -51,6 +51,29 @@ class OperationService:
         """
         return self.operation_repo.get_by_id(operation_id)
     
+    def get_operation_for_user(self, operation_id: UUID,
+                               user_id: UUID) -> Tuple[Optional[Operation], bool]:
+        """
+        obtiene una operacion y verifica que pertenezca al usuario.
+        
+        la operacion y el dueño de su portfolio se leen en una sola consulta
+        (join con portfolios), sin cargar el portfolio por separado.
+        
+        args:
+            operation_id: id de la operacion
+            user_id: id del usuario autenticado
+            
+        returns:
+            tupla (operacion, owned): operacion o none si no existe, y si
+            el portfolio de la operacion pertenece al usuario
+        """
+        row = self.operation_repo.get_with_owner(operation_id)
+        if row is None:
+            return None, False
+        
+        operation, owner_id = row
+        return operation, owner_id == user_id
+    
     def get_operations_by_portfolio(self, portfolio_id: UUID, 
                                      skip: int = 0, 
                                      limit: int = 100) -> List[Operation]:
@@ -145,6 +168,49 @@ class OperationService:
             limit=limit
         )
     
+    def filter_operations_authorized(self, portfolio_id: UUID,
+                                     user_id: UUID,
+                                     asset_symbol: Optional[str] = None,
+                                     operation_type: Optional[OperationType] = None,
+                                     date_from: Optional[date] = None,
+                                     date_to: Optional[date] = None,
+                                     skip: int = 0,
+                                     limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        filtra operaciones verificando ownership en la misma consulta.
+        
+        igual que filter_operations pero con join a portfolios filtrando por
+        user_id: si hay resultados el usuario es dueño del portfolio. una
+        lista vacia no distingue entre portfolio ajeno, inexistente o sin
+        operaciones; en ese caso el llamador debe verificar el portfolio.
+        
+        solo se seleccionan las columnas de OperationResponse y se retornan
+        dicts listos para serializar, sin objetos orm ni modelos pydantic.
+        
+        args:
+            portfolio_id: id del portfolio
+            user_id: id del usuario autenticado
+            asset_symbol: filtrar por activo
+            operation_type: filtrar por tipo
+            date_from: fecha inicio
+            date_to: fecha fin
+            skip: offset para paginacion
+            limit: maximo de resultados
+            
+        returns:
+            lista de dicts con los campos de OperationResponse
+        """
+        return self.operation_repo.filter_operation_rows(
+            portfolio_id=portfolio_id,
+            asset_symbol=asset_symbol.upper() if asset_symbol else None,
+            operation_type=operation_type,
+            date_from=date_from,
+            date_to=date_to,
+            skip=skip,
+            limit=limit,
+            user_id=user_id
+        )
+    
     def update_operation_notes(self, operation_id: UUID, 
                                 notes: Optional[str]) -> Optional[Operation]:
         """
@@ -182,6 +248,9 @@ class OperationService:
         """
         obtiene estadisticas de operaciones de un portfolio.
         
+        todos los agregados se calculan en una sola consulta sql
+        (ver OperationRepository.get_statistics).
+        
         args:
             portfolio_id: id del portfolio
             
@@ -195,34 +264,17 @@ class OperationService:
             - total_fees: suma de comisiones
             - unique_assets: numero de activos distintos
         """
-        operations = self.operation_repo.get_by_portfolio(portfolio_id, skip=0, limit=10000)
+        row = self.operation_repo.get_statistics(portfolio_id)
         
-        stats = {
-            "total_operations": 0,
-            "total_buys": 0,
-            "total_sells": 0,
-            "total_invested": Decimal("0"),
-            "total_withdrawn": Decimal("0"),
-            "total_fees": Decimal("0"),
-            "unique_assets": set()
+        return {
+            "total_operations": row.total_operations,
+            "total_buys": row.total_buys,
+            "total_sells": row.total_sells,
+            "total_invested": Decimal(row.total_invested),
+            "total_withdrawn": Decimal(row.total_withdrawn),
+            "total_fees": Decimal(row.total_fees),
+            "unique_assets": row.unique_assets
         }
-        
-        for op in operations:
-            stats["total_operations"] += 1
-            stats["total_fees"] += op.fees
-            stats["unique_assets"].add(op.asset_symbol)
-            
-            if op.operation_type == OperationType.BUY:
-                stats["total_buys"] += 1
-                stats["total_invested"] += op.total_amount
-            else:
-                stats["total_sells"] += 1
-                stats["total_withdrawn"] += op.total_amount
-        
-        # convertir set a count
-        stats["unique_assets"] = len(stats["unique_assets"])
-        
-        return stats
     
     def get_asset_statistics(self, portfolio_id: UUID, asset_symbol: str) -> dict:
         """
@@ -5,6 +5,7 @@ coordina operaciones complejas de portfolios, validaciones de permisos,
 y actualizacion de metricas financieras.
 """
 from typing import Optional, List
+from sqlalchemy.engine import Row
 from uuid import UUID
 from decimal import Decimal
 from sqlalchemy.orm import Session
@@ -81,16 +82,30 @@ class PortfolioService:
     
     def get_portfolio(self, portfolio_id: UUID) -> Optional[Portfolio]:
         """
-        obtiene un portfolio con todas sus posiciones.
+        obtiene un portfolio sin cargar sus posiciones.
+        
+        suficiente para verificar existencia y ownership; las posiciones
+        se cargan de forma lazy si se acceden.
+        
+        args:
+            portfolio_id: id del portfolio
+            
+        returns:
+            portfolio o none
+        """
+        return self.portfolio_repo.get_by_id(portfolio_id)
+    
+    def get_portfolio_positions_computed(self, portfolio_id: UUID) -> List[Row]:
+        """
+        obtiene las posiciones del portfolio con metricas calculadas en sql.
         
         args:
             portfolio_id: id del portfolio
             
         returns:
-            portfolio con posiciones cargadas o none
+            filas con datos de la posicion, valor, ganancia y porcentaje
         """
-        portfolio = self.portfolio_repo.get_with_positions(portfolio_id)
-        return portfolio
+        return self.portfolio_repo.get_positions_with_metrics(portfolio_id)
     
     def update_portfolio(self, portfolio_id: UUID, name: Optional[str] = None,
                         description: Optional[str] = None) -> Optional[Portfolio]:
@@ -4,15 +4,27 @@ servicio de usuarios - logica de negocio para gestion de usuarios.
 este servicio coordina las operaciones relacionadas con usuarios,
 aplicando validaciones y reglas de negocio antes de usar los repositorios.
 """
-from typing import Optional
+from typing import Any, Dict, Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
 
-from app.models.user import User
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.models.user import User, UserProfile
 from app.repositories.user import UserRepository
 from app.core.security import password_hasher
 
 
+# json de GET /users/me cacheado por usuario; cualquier escritura sobre el
+# usuario o su perfil debe invalidarlo (o reescribirlo)
+PROFILE_CACHE_TTL = 300  # segundos
+
+
+def profile_cache_key(user_id: UUID) -> str:
+    """clave de cache del perfil serializado de un usuario."""
+    return f"user:profile:{user_id}"
+
+
 class UserService:
     """
     servicio para operaciones de usuarios.
@@ -92,13 +104,20 @@ class UserService:
         """
         obtiene un usuario por su id con su perfil cargado.
         
+        en el entorno de testing el resto de relaciones quedan con raiseload:
+        si /users/me empieza a leer otra relacion sin cargarla, el test falla
+        en lugar de agregar una query n+1. en produccion se mantiene el lazy load.
+        
         args:
             user_id: id del usuario
             
         returns:
             usuario con perfil o none si no existe
         """
-        user = self.user_repo.get_with_profile(user_id)
+        user = self.user_repo.get_with_profile(
+            user_id,
+            raise_on_lazy=settings.ENVIRONMENT == "testing"
+        )
         return user
     
     def get_user_by_email(self, email: str) -> Optional[User]:
@@ -132,12 +151,55 @@ class UserService:
         
         # actualizar perfil
         updated_profile = self.user_repo.update_profile(user_id, profile_data)
+        response_cache.delete(profile_cache_key(user_id))
         if updated_profile:
             # recargar usuario con perfil actualizado
             return self.user_repo.get_with_profile(user_id)
         
         return None
     
+    def apply_updates(self, user: User, user_fields: Dict[str, Any],
+                      profile_fields: Dict[str, Any]) -> User:
+        """
+        aplica cambios de usuario y perfil en una sola transaccion.
+        
+        trabaja sobre el usuario ya cargado (ej: current_user) en lugar de
+        buscarlo por id: solo se emiten los UPDATE (o el INSERT del perfil si
+        no existia) y el objeto retornado ya tiene los valores nuevos, sin
+        volver a consultarlo.
+        
+        args:
+            user: usuario a actualizar (asociado a la sesion del servicio)
+            user_fields: campos del usuario (full_name)
+            profile_fields: campos del perfil (currency, timezone, language, preferences)
+            
+        returns:
+            el mismo usuario con los cambios aplicados
+        """
+        if "full_name" in user_fields:
+            user.full_name = user_fields["full_name"].strip()
+        
+        if profile_fields:
+            if user.profile is None:
+                user.profile = UserProfile(**profile_fields)
+            else:
+                for key, value in profile_fields.items():
+                    setattr(user.profile, key, value)
+        
+        # flush antes del commit: los defaults (updated_at, etc.) quedan en el objeto
+        self.db.flush()
+        
+        # tras el commit los valores en memoria ya son los confirmados; sin expirarlos
+        # construir la respuesta no dispara otro SELECT de usuario y perfil
+        expire_on_commit = self.db.expire_on_commit
+        self.db.expire_on_commit = False
+        try:
+            self.db.commit()
+        finally:
+            self.db.expire_on_commit = expire_on_commit
+        
+        return user
+    
     def update_user_info(self, user_id: UUID, full_name: Optional[str] = None,
                         is_active: Optional[bool] = None) -> Optional[User]:
         """
@@ -163,6 +225,7 @@ class UserService:
         
         # guardar cambios
         updated_user = self.user_repo.update(user)
+        response_cache.delete(profile_cache_key(user_id))
         return updated_user
     
     def delete_user(self, user_id: UUID) -> bool:
@@ -182,6 +245,7 @@ class UserService:
         # en lugar de borrar, desactivamos (soft delete)
         user.is_active = False
         self.user_repo.update(user)
+        response_cache.delete(profile_cache_key(user_id))
         return True
     
     def verify_user_email(self, user_id: UUID) -> bool:
@@ -200,6 +264,7 @@ class UserService:
         
         user.is_verified = True
         self.user_repo.update(user)
+        response_cache.delete(profile_cache_key(user_id))
         return True
     
     def list_all_users(self, skip: int = 0, limit: int = 100) -> list[User]:
@@ -24,13 +24,19 @@ Institucion: Universidad
 Fecha: Diciembre 2025
 """
 import logging
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 
+from app.api.responses import ORJSONResponse
 from app.api.v1 import api_router
+from app.clients.cache import api_cache
+from app.clients.http_client import close_http_client, get_http_client
+from app.core.cache import response_cache
 from app.core.config import settings
 from app.middleware.error_handler import register_exception_handlers
+from app.middleware.http_cache import HTTPCacheMiddleware
 
 # Configuracion del sistema de logging
 # El logging centralizado facilita el debugging y el monitoreo en produccion
@@ -90,7 +96,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    # Serializacion con orjson (C) para todas las respuestas json
+    default_response_class=ORJSONResponse
 )
 
 
@@ -109,6 +117,15 @@ app.add_middleware(
 )
 
 
+# ============================================================================
+# CACHE HTTP (ETag / 304)
+# ============================================================================
+# Las respuestas GET con Cache-Control reciben un ETag; si el cliente revalida
+# con If-None-Match y el contenido no cambio, se responde 304 sin body
+
+app.add_middleware(HTTPCacheMiddleware)
+
+
 # ============================================================================
 # REGISTRO DE MANEJADORES DE EXCEPCIONES
 # ============================================================================
@@ -223,6 +240,15 @@ async def startup_event():
     - Conexion a servicios de mensajeria (RabbitMQ, Kafka)
     - Calentamiento de cache con datos frecuentes
     """
+    # Los endpoints sync y las consultas de los async se ejecutan en el threadpool
+    # de anyio (40 hilos por defecto). Se ajusta a las conexiones del pool de BD:
+    # las llamadas a Alpha Vantage y OpenAI se esperan en el event loop, no en hilos
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_max_workers
+    
+    # Cliente HTTP compartido por todo el proceso: las conexiones a Alpha Vantage
+    # se reutilizan entre requests en lugar de repetir el handshake TLS
+    get_http_client()
+    
     print("=" * 70)
     print("Portfolio & Market Insight Platform API - Iniciando")
     print("=" * 70)
@@ -246,6 +272,10 @@ async def shutdown_event():
     Garantiza un shutdown graceful que permite completar requests en curso
     y cerrar conexiones de manera ordenada.
     """
+    await close_http_client()
+    await api_cache.close()
+    await response_cache.close()
+    
     print("=" * 70)
     print("Portfolio & Market Insight Platform API - Cerrando")
     print("=" * 70)
@@ -12,6 +12,7 @@ ejecutar desde backend/:
 """
 import sys
 import os
+import asyncio
 import logging
 
 # configurar logging para ver errores
@@ -24,10 +25,50 @@ logging.basicConfig(
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from app.clients.alpha_vantage_client import AlphaVantageClient
+from app.clients.http_client import close_http_client
 from app.clients.openai_client import OpenAIClient
 from ai_module.src.processors.technical_indicators import TechnicalIndicators
 
 
+async def _alpha_vantage_checks():
+    """consultas de prueba con el cliente async de alpha vantage."""
+    client = AlphaVantageClient()
+    try:
+        # probar quote
+        print("\nObteniendo cotización de AAPL...")
+        quote = await client.get_quote("AAPL")
+        
+        if quote:
+            print(f"Quote obtenido correctamente:")
+            print(f"   Simbolo: {quote['symbol']}")
+            print(f"   Precio: ${quote['price']:.2f}")
+            print(f"   Volumen: {quote['volume']:,}")
+            print(f"   Cambio: {quote['change_percent']}")
+        else:
+            print("No se pudo obtener quote (verifica API key)")
+        
+        # probar búsqueda
+        print("\nBuscando 'Apple'...")
+        results = await client.search_symbol("Apple")
+        
+        if results:
+            print(f"Encontrados {len(results)} resultados:")
+            for i, result in enumerate(results[:3], 1):
+                print(f"   {i}. {result['symbol']} - {result['name']}")
+        else:
+            print("No se encontraron resultados")
+    finally:
+        await close_http_client()
+
+
+async def _openai_check(client, prompt):
+    """genera un analisis de prueba con el cliente async de openai."""
+    try:
+        return await client.generate_analysis(prompt, max_completion_tokens=500)
+    finally:
+        await close_http_client()
+
+
 def test_alpha_vantage():
     """prueba el cliente de alpha vantage."""
     print("\n" + "="*32)
@@ -35,31 +76,7 @@ def test_alpha_vantage():
     print("="*32)
     
     try:
-        with AlphaVantageClient() as client:
-            # probar quote
-            print("\nObteniendo cotización de AAPL...")
-            quote = client.get_quote("AAPL")
-            
-            if quote:
-                print(f"Quote obtenido correctamente:")
-                print(f"   Simbolo: {quote['symbol']}")
-                print(f"   Precio: ${quote['price']:.2f}")
-                print(f"   Volumen: {quote['volume']:,}")
-                print(f"   Cambio: {quote['change_percent']}")
-            else:
-                print("No se pudo obtener quote (verifica API key)")
-            
-            # probar búsqueda
-            print("\nBuscando 'Apple'...")
-            results = client.search_symbol("Apple")
-            
-            if results:
-                print(f"Encontrados {len(results)} resultados:")
-                for i, result in enumerate(results[:3], 1):
-                    print(f"   {i}. {result['symbol']} - {result['name']}")
-            else:
-                print("No se encontraron resultados")
-                
+        asyncio.run(_alpha_vantage_checks())
     except ValueError as e:
         print(f"Error: {e}")
         print("   Verifica que ALPHA_VANTAGE_API_KEY este configurada en config/.env")
@@ -90,7 +107,7 @@ def test_openai():
         Proporciona un análisis de 50 palabras máximo.
         """
         
-        analysis = client.generate_analysis(prompt, max_completion_tokens=500)
+        analysis = asyncio.run(_openai_check(client, prompt))
         
         if analysis:
             print(f"Analisis generado correctamente:")
@@ -0,0 +1,148 @@
+"""
+tests de TechnicalIndicators contra valores de referencia calculados con pandas.
+
+cada caso corre dos veces: con los kernels compilados (numba o aot) y con
+las versiones en python/numpy que se usan cuando numba no esta instalado.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai_module.src.processors import _kernels
+from ai_module.src.processors import technical_indicators as ti
+from ai_module.src.processors.technical_indicators import TechnicalIndicators
+
+
+# kernels que numba compila; sin numba el decorador los deja en python
+JIT_KERNELS = ["macd_kernel", "rsi_from_averages", "rsi_wilder_kernel", "mean_std_kernel", "batch_kernel"]
+
+
+@pytest.fixture(params=["compiled", "python"])
+def kernels(request, monkeypatch):
+    """selecciona la ruta de calculo: kernels compilados o fallback sin numba."""
+    if request.param == "compiled":
+        if not ti.COMPILED_KERNELS:
+            pytest.skip("numba no disponible")
+        return request.param
+
+    # misma ruta que sin numba: fallbacks numpy/scipy y kernels como python puro
+    monkeypatch.setattr(ti, "COMPILED_KERNELS", False)
+    monkeypatch.setattr(ti, "USE_TALIB", False)
+    for name in JIT_KERNELS:
+        func = getattr(_kernels, name)
+        func = getattr(func, "py_func", func)
+        monkeypatch.setattr(_kernels, name, func)
+        if hasattr(ti, name):
+            monkeypatch.setattr(ti, name, func)
+    return request.param
+
+
+def random_walk(n, seed=0):
+    """serie de precios positiva (mas reciente primero, como la api)."""
+    rng = np.random.default_rng(seed)
+    chrono = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, n)))
+    return chrono[::-1].tolist()
+
+
+def reference(prices):
+    """indicadores calculados con pandas sobre la serie cronologica."""
+    s = pd.Series(prices[::-1], dtype=np.float64)
+
+    # rsi de wilder: semilla sma de 14 cambios y luego ewm con alpha = 1/14
+    diff = s.diff().dropna()
+    gain = diff.clip(lower=0.0)
+    loss = (-diff).clip(lower=0.0)
+    seed_gain = pd.concat([pd.Series([gain.iloc[:14].mean()]), gain.iloc[14:]], ignore_index=True)
+    seed_loss = pd.concat([pd.Series([loss.iloc[:14].mean()]), loss.iloc[14:]], ignore_index=True)
+    avg_gain = seed_gain.ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    avg_loss = seed_loss.ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    macd_line = s.ewm(span=12, adjust=False).mean() - s.ewm(span=26, adjust=False).mean()
+    signal_line = macd_line.ewm(span=9, adjust=False).mean()
+
+    middle = s.rolling(20).mean().iloc[-1]
+    std = s.rolling(20).std().iloc[-1]
+
+    return {
+        "rsi": rsi,
+        "macd": macd_line.iloc[-1],
+        "signal": signal_line.iloc[-1],
+        "histogram": macd_line.iloc[-1] - signal_line.iloc[-1],
+        "volatility": np.log(s).diff().std() * np.sqrt(252) * 100,
+        "upper": middle + 2 * std,
+        "middle": middle,
+        "lower": middle - 2 * std,
+        "ma": {p: s.iloc[-p:].mean() for p in (20, 50, 200) if len(s) >= p},
+        "price_change_30d": (s.iloc[-1] / s.iloc[-30] - 1.0) * 100.0,
+    }
+
+
+def assert_matches(indicators, ref, rtol):
+    """compara el diccionario de calculate_all_indicators con la referencia."""
+    assert indicators["rsi"] == pytest.approx(ref["rsi"], rel=rtol)
+    assert indicators["macd"]["macd"] == pytest.approx(ref["macd"], rel=rtol, abs=1e-6)
+    assert indicators["macd"]["signal"] == pytest.approx(ref["signal"], rel=rtol, abs=1e-6)
+    assert indicators["macd"]["histogram"] == pytest.approx(ref["histogram"], rel=rtol, abs=1e-6)
+    assert indicators["volatility"] == pytest.approx(ref["volatility"], rel=rtol)
+    for band in ("upper", "middle", "lower"):
+        assert indicators["bollinger_bands"][band] == pytest.approx(ref[band], rel=rtol)
+    assert indicators["moving_averages"].keys() == ref["ma"].keys()
+    for period, value in ref["ma"].items():
+        assert indicators["moving_averages"][period] == pytest.approx(value, rel=rtol)
+    assert indicators["price_change_30d"] == pytest.approx(ref["price_change_30d"], rel=rtol, abs=1e-6)
+
+
+@pytest.mark.parametrize("n", [60, 250])
+def test_all_indicators_match_pandas(kernels, n):
+    prices = random_walk(n)
+
+    indicators = TechnicalIndicators.calculate_all_indicators(prices)
+
+    assert_matches(indicators, reference(prices), rtol=1e-9)
+    assert indicators["current_price"] == prices[0]
+
+
+def test_all_indicators_float32_long_history(kernels):
+    n = TechnicalIndicators.FLOAT32_MIN_LENGTH + 250
+    prices = random_walk(n, seed=1)
+
+    prepared = TechnicalIndicators.prepare_prices(prices)
+    if not ti.AOT_KERNELS:
+        assert prepared.chrono.dtype == np.float32
+
+    indicators = TechnicalIndicators.calculate_all_indicators(prices, prepared=prepared)
+
+    # float32 redondea los precios (~1e-7 relativo); la referencia es float64
+    assert_matches(indicators, reference(prices), rtol=1e-4)
+    # el precio actual sale de la lista, sin el redondeo de float32
+    assert indicators["current_price"] == prices[0]
+
+
+def test_batch_matches_single_series(kernels):
+    series = [
+        random_walk(40, seed=2),
+        random_walk(120, seed=3),
+        random_walk(TechnicalIndicators.FLOAT32_MIN_LENGTH + 100, seed=4),
+    ]
+
+    batch = TechnicalIndicators.calculate_all_indicators_batch(series)
+
+    for i, prices in enumerate(series):
+        ref = reference(prices)
+        rtol = 1e-4 if len(prices) >= TechnicalIndicators.FLOAT32_MIN_LENGTH else 1e-9
+        assert batch["rsi"][i] == pytest.approx(ref["rsi"], rel=rtol)
+        assert batch["macd"][i, 0] == pytest.approx(ref["macd"], rel=rtol, abs=1e-6)
+        assert batch["macd"][i, 1] == pytest.approx(ref["signal"], rel=rtol, abs=1e-6)
+        assert batch["macd"][i, 2] == pytest.approx(ref["histogram"], rel=rtol, abs=1e-6)
+        assert batch["volatility"][i] == pytest.approx(ref["volatility"], rel=rtol)
+
+
+def test_batch_short_series_are_nan(kernels):
+    # 20 precios: alcanza para rsi pero no para macd (35) ni volatilidad (31)
+    batch = TechnicalIndicators.calculate_all_indicators_batch([random_walk(20), []])
+
+    assert np.isfinite(batch["rsi"][0])
+    assert np.isnan(batch["macd"][0]).all()
+    assert np.isnan(batch["volatility"][0])
+    assert np.isnan(batch["rsi"][1])
@@ -0,0 +1,158 @@
+"""
+tests de los endpoints de usuario con ENVIRONMENT == "testing".
+
+en testing UserService.get_user_by_id carga el perfil con joinedload y deja
+el resto de relaciones con raiseload("*"): si el endpoint leyera otra
+relacion sin cargarla, la peticion fallaria con InvalidRequestError en
+lugar de hacer una consulta extra.
+
+el cambio de password y el login deben ejecutar bcrypt en el pool del
+password_hasher (hilos "bcrypt"), no en el event loop ni en el threadpool.
+
+los modelos usan tipos de postgresql (UUID, JSONB); aqui se compilan para
+una base sqlite en memoria.
+"""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database.session import Base
+from app.core.security import password as password_module
+from app.core.security import password_hasher
+from app.core.security.jwt import get_jwt_handler
+from app.middleware.dependencies import get_db
+from app.models.user import User, UserProfile
+from app.services.user_service import UserService
+from main import app
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def user(session_factory):
+    db = session_factory()
+    user = User(email="ana@example.com", password_hash="x", full_name="Ana")
+    user.profile = UserProfile(currency="EUR", timezone="Europe/Madrid", language="es", preferences={})
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    return user
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "testing")
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+def test_get_me_with_raiseload(client, user):
+    token = get_jwt_handler().create_access_token({"sub": str(user.id)})
+
+    response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["email"] == "ana@example.com"
+    assert body["profile"]["currency"] == "EUR"
+    assert body["profile"]["language"] == "es"
+
+
+def test_get_user_by_id_raises_on_other_relationships(session_factory, user, monkeypatch):
+    # comprueba que el guard esta activo: una relacion no cargada no hace lazy load
+    monkeypatch.setattr(settings, "ENVIRONMENT", "testing")
+    db = session_factory()
+    queries = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+    loaded = UserService(db).get_user_by_id(user.id)
+
+    assert loaded.profile.currency == "EUR"
+    assert len(queries) == 1
+    with pytest.raises(InvalidRequestError):
+        loaded.portfolios
+    db.close()
+
+
+@pytest.fixture
+def bcrypt_threads(monkeypatch):
+    """registra el hilo en el que corre cada llamada a bcrypt."""
+    threads = []
+    checkpw = password_module.bcrypt.checkpw
+    hashpw = password_module.bcrypt.hashpw
+
+    def recording_checkpw(password, hashed):
+        threads.append(threading.current_thread().name)
+        return checkpw(password, hashed)
+
+    def recording_hashpw(password, salt):
+        threads.append(threading.current_thread().name)
+        return hashpw(password, salt)
+
+    monkeypatch.setattr(password_module.bcrypt, "checkpw", recording_checkpw)
+    monkeypatch.setattr(password_module.bcrypt, "hashpw", recording_hashpw)
+    return threads
+
+
+def test_change_password_runs_bcrypt_on_hasher_pool(client, session_factory, bcrypt_threads):
+    db = session_factory()
+    user = User(email="luis@example.com", password_hash=password_hasher.hash_password("Password123"), full_name="Luis")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    bcrypt_threads.clear()
+    token = get_jwt_handler().create_access_token({"sub": str(user.id)})
+
+    response = client.put(
+        "/api/v1/users/me/password",
+        json={"current_password": "Password123", "new_password": "NewPassword456"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 204
+
+    login = client.post("/api/v1/auth/login", json={"email": "luis@example.com", "password": "NewPassword456"})
+    assert login.status_code == 200
+    old_login = client.post("/api/v1/auth/login", json={"email": "luis@example.com", "password": "Password123"})
+    assert old_login.status_code == 401
+
+    assert bcrypt_threads
+    assert all(name.startswith("bcrypt") for name in bcrypt_threads)
@@ -0,0 +1,146 @@
+"""
+tests del cache de decode_token en JWTHandler.
+
+el reloj del modulo jwt se reemplaza por uno falso, y jwt.decode por una
+version que valida el exp con ese mismo reloj, para simular el paso del
+tiempo sin esperar.
+"""
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import jwt
+import pytest
+
+from app.core.security import jwt as jwt_module
+from app.core.security.jwt import JWTHandler
+
+
+class FakeClock:
+    """reemplazo de time.time y time.monotonic que se avanza a mano."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(jwt_module, "_decode_cache", OrderedDict())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(jwt_module, "time", SimpleNamespace(time=fake.time, monotonic=fake.monotonic))
+    return fake
+
+
+@pytest.fixture
+def decode_calls(clock, monkeypatch):
+    """cuenta las llamadas a jwt.decode y valida el exp con el reloj falso."""
+    calls = []
+    decode = jwt.decode
+
+    def fake_decode(token, key, algorithms):
+        calls.append(token)
+        payload = decode(token, key, algorithms=algorithms, options={"verify_exp": False})
+        if payload["exp"] <= clock.now:
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return payload
+
+    monkeypatch.setattr(jwt_module.jwt, "decode", fake_decode)
+    return calls
+
+
+@pytest.fixture
+def handler():
+    return JWTHandler()
+
+
+def make_token(handler, clock, lifetime, sub="user-1"):
+    """token firmado con el secreto del handler que expira en `lifetime` segundos."""
+    payload = {"sub": sub, "type": "access", "exp": int(clock.now + lifetime)}
+    return jwt.encode(payload, handler.secret_key, algorithm=handler.algorithm)
+
+
+def test_valid_token_is_cached(handler, clock, decode_calls):
+    token = handler.create_access_token({"sub": "user-1"})
+
+    assert handler.decode_token(token)["sub"] == "user-1"
+    assert handler.decode_token(token)["sub"] == "user-1"
+
+    assert len(decode_calls) == 1
+
+
+def test_cache_entry_expires_after_ttl(handler, clock, decode_calls):
+    token = handler.create_access_token({"sub": "user-1"})
+    handler.decode_token(token)
+
+    clock.now += jwt_module.DECODE_CACHE_TTL
+    assert handler.decode_token(token)["sub"] == "user-1"
+
+    assert len(decode_calls) == 2
+
+
+def test_ttl_capped_at_token_exp(handler, clock, decode_calls):
+    # expira antes que DECODE_CACHE_TTL: la entrada no puede durar mas que el token
+    token = make_token(handler, clock, lifetime=10)
+
+    assert handler.decode_token(token) is not None
+    clock.now += 5
+    assert handler.decode_token(token) is not None
+    assert len(decode_calls) == 1
+
+    clock.now += 5
+    assert handler.decode_token(token) is None
+    assert len(decode_calls) == 2
+
+
+def test_expired_token_never_returned_from_cache(handler, clock, decode_calls):
+    token = make_token(handler, clock, lifetime=1)
+    assert handler.decode_token(token) is not None
+
+    clock.now += 1
+    for _ in range(3):
+        assert handler.decode_token(token) is None
+        assert not handler.verify_token(token)
+
+
+def test_invalid_token_cached_as_none(handler, clock, decode_calls):
+    assert handler.decode_token("not-a-jwt") is None
+    assert handler.decode_token("not-a-jwt") is None
+    assert len(decode_calls) == 1
+
+    # firma incorrecta: tambien None, y tambien cacheado
+    forged = jwt.encode({"sub": "user-1", "exp": int(clock.now + 600)}, "other-secret", algorithm="HS256")
+    assert handler.decode_token(forged) is None
+    assert handler.decode_token(forged) is None
+    assert len(decode_calls) == 2
+
+    clock.now += jwt_module.DECODE_CACHE_TTL
+    assert handler.decode_token("not-a-jwt") is None
+    assert len(decode_calls) == 3
+
+
+def test_lru_eviction_at_maxsize(handler, clock, decode_calls, monkeypatch):
+    monkeypatch.setattr(jwt_module, "DECODE_CACHE_MAXSIZE", 2)
+    tokens = [handler.create_access_token({"sub": f"user-{i}"}) for i in range(3)]
+
+    handler.decode_token(tokens[0])
+    handler.decode_token(tokens[1])
+    # usar tokens[0] lo deja como el mas reciente: el siguiente en salir es tokens[1]
+    handler.decode_token(tokens[0])
+    handler.decode_token(tokens[2])
+    assert len(jwt_module._decode_cache) == 2
+    assert len(decode_calls) == 3
+
+    handler.decode_token(tokens[0])
+    assert len(decode_calls) == 3
+
+    assert handler.decode_token(tokens[1])["sub"] == "user-1"
+    assert len(decode_calls) == 4
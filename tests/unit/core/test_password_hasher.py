@@ -0,0 +1,125 @@
+"""
+tests del cache de verificaciones de PasswordHasher.
+
+bcrypt.checkpw se envuelve para contar las llamadas: una verificacion
+servida desde el cache no llega a bcrypt.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.security import password as password_module
+from app.core.security.password import PasswordHasher
+
+
+class FakeClock:
+    """reemplazo de time.monotonic que se avanza a mano."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    # solo el modulo password ve el reloj falso
+    monkeypatch.setattr(password_module, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+@pytest.fixture
+def checkpw_calls(monkeypatch):
+    """cuenta las verificaciones que pasan por bcrypt."""
+    calls = []
+    checkpw = password_module.bcrypt.checkpw
+
+    def counting_checkpw(password, hashed):
+        calls.append(password)
+        return checkpw(password, hashed)
+
+    monkeypatch.setattr(password_module.bcrypt, "checkpw", counting_checkpw)
+    return calls
+
+
+@pytest.fixture
+def hasher():
+    # cost factor minimo: los tests miden el cache, no bcrypt
+    return PasswordHasher(cost_factor=4)
+
+
+def test_correct_password_is_cached(hasher, clock, checkpw_calls):
+    hashed = hasher.hash_password("Password123")
+
+    assert hasher.verify_password("Password123", hashed)
+    assert hasher.verify_password("Password123", hashed)
+
+    assert len(checkpw_calls) == 1
+
+
+def test_wrong_password_never_served_from_cache(hasher, clock, checkpw_calls):
+    hashed = hasher.hash_password("Password123")
+    assert hasher.verify_password("Password123", hashed)
+
+    assert not hasher.verify_password("Password124", hashed)
+    assert not hasher.verify_password("Password124", hashed)
+
+    # los fallos siempre van a bcrypt y no se guardan
+    assert len(checkpw_calls) == 3
+    assert len(hasher._verify_cache) == 1
+
+
+def test_changed_hash_misses_cache(hasher, clock, checkpw_calls):
+    old_hash = hasher.hash_password("Password123")
+    assert hasher.verify_password("Password123", old_hash)
+
+    new_hash = hasher.hash_password("NewPassword456")
+
+    assert not hasher.verify_password("Password123", new_hash)
+    assert hasher.verify_password("NewPassword456", new_hash)
+    assert len(checkpw_calls) == 3
+
+
+def test_entries_expire_after_ttl(hasher, clock, checkpw_calls):
+    hashed = hasher.hash_password("Password123")
+    assert hasher.verify_password("Password123", hashed)
+
+    clock.now += password_module.VERIFY_CACHE_TTL - 1
+    assert hasher.verify_password("Password123", hashed)
+    assert len(checkpw_calls) == 1
+
+    clock.now += 1
+    assert hasher.verify_password("Password123", hashed)
+    assert len(checkpw_calls) == 2
+
+
+def test_clear_verify_cache(hasher, clock, checkpw_calls):
+    hashed = hasher.hash_password("Password123")
+    assert hasher.verify_password("Password123", hashed)
+
+    hasher.clear_verify_cache()
+
+    assert len(hasher._verify_cache) == 0
+    assert hasher.verify_password("Password123", hashed)
+    assert len(checkpw_calls) == 2
+
+
+def test_lru_eviction_at_maxsize(hasher, clock, checkpw_calls, monkeypatch):
+    monkeypatch.setattr(password_module, "VERIFY_CACHE_MAXSIZE", 2)
+    hashes = {p: hasher.hash_password(p) for p in ("Password1", "Password2", "Password3")}
+
+    assert hasher.verify_password("Password1", hashes["Password1"])
+    assert hasher.verify_password("Password2", hashes["Password2"])
+    # usar Password1 la deja como la mas reciente: la siguiente en salir es Password2
+    assert hasher.verify_password("Password1", hashes["Password1"])
+    assert hasher.verify_password("Password3", hashes["Password3"])
+    assert len(hasher._verify_cache) == 2
+    assert len(checkpw_calls) == 3
+
+    assert hasher.verify_password("Password1", hashes["Password1"])
+    assert len(checkpw_calls) == 3
+
+    assert hasher.verify_password("Password2", hashes["Password2"])
+    assert len(checkpw_calls) == 4
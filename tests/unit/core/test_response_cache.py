@@ -0,0 +1,39 @@
+"""
+tests del cache de respuestas en memoria (sin REDIS_URL).
+"""
+from app.core.cache import responses
+from app.core.cache.responses import ResponseCache
+
+
+def test_memory_cache_roundtrip():
+    cache = ResponseCache()
+
+    cache.set("price:AAPL", '{"price": 1}', expire=60)
+
+    assert cache.backend == "memory"
+    assert cache.get("price:AAPL") == '{"price": 1}'
+    assert cache.get("price:MSFT") is None
+
+
+def test_memory_cache_expired_entry():
+    cache = ResponseCache()
+    cache.set("price:AAPL", "{}", expire=0)
+
+    assert cache.get("price:AAPL") is None
+    assert len(cache._memory) == 0
+
+
+def test_memory_cache_lru_eviction_at_maxsize(monkeypatch):
+    monkeypatch.setattr(responses, "MEMORY_CACHE_MAXSIZE", 2)
+    cache = ResponseCache()
+
+    cache.set("price:A", "a", expire=60)
+    cache.set("price:B", "b", expire=60)
+    # leer A la deja como la mas reciente: la siguiente en salir es B
+    assert cache.get("price:A") == "a"
+    cache.set("price:C", "c", expire=60)
+
+    assert len(cache._memory) == 2
+    assert cache.get("price:A") == "a"
+    assert cache.get("price:B") is None
+    assert cache.get("price:C") == "c"